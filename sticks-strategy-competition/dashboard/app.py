@@ -1,6 +1,6 @@
 from pathlib import Path
 import sys
-from flask import Flask, render_template
+from flask import Flask, make_response, render_template
 
 # Load .env if present (project root)
 try:  # lightweight optional
@@ -14,16 +14,18 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from dashboard.services.stats_service import get_statistics  # noqa: E402
-from dashboard.routes.stats import stats_bp  # noqa: E402
+from dashboard.services.stats_service import get_cached_statistics  # noqa: E402
+from dashboard.routes.stats import conditional, stats_bp  # noqa: E402
+from dashboard.routes.events import events_bp  # noqa: E402
 
 app = Flask(__name__)
 app.register_blueprint(stats_bp)
+app.register_blueprint(events_bp)
 
 @app.route('/')
 def index():
-    stats = get_statistics()
-    return render_template('index.html', stats=stats)
+    cached = get_cached_statistics()
+    return conditional(make_response(render_template('index.html', stats=cached.payload)), cached, '-index')
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,59 @@
+import json
+from flask import Blueprint, Response, stream_with_context
+from engine.events import TOURNAMENT_TOPIC, ensure_listener, get_bus
+
+events_bp = Blueprint('events', __name__)
+
+# Comment line sent when no event arrived for this long, so proxies keep the stream open
+HEARTBEAT_S = 15.0
+
+
+def progress_delta(prev, event):
+    """Fields of a progress snapshot that changed since prev; None when nothing did.
+
+    Strategies are diffed row by row, so a delta only carries the leaderboard
+    rows touched by the games played since the last push.
+    """
+    delta = {k: v for k, v in event.items() if k != 'strategies' and prev.get(k) != v}
+    old_rows = prev.get('strategies', {})
+    rows = {name: row for name, row in event.get('strategies', {}).items() if old_rows.get(name) != row}
+    if rows:
+        delta['strategies'] = rows
+    if not delta:
+        return None
+    delta['tournament_id'] = event.get('tournament_id')
+    return delta
+
+
+def _sse(kind, data):
+    return f"event: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def stream_progress(subscription, heartbeat_s=HEARTBEAT_S):
+    """SSE messages: a 'snapshot' for each new tournament, then 'delta' messages."""
+    prev = None
+    try:
+        while True:
+            event = subscription.get(timeout=heartbeat_s)
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            if prev is None or prev.get('tournament_id') != event.get('tournament_id'):
+                yield _sse('snapshot', event)
+            else:
+                delta = progress_delta(prev, event)
+                if delta is not None:
+                    yield _sse('delta', delta)
+            prev = event
+    finally:
+        subscription.close()
+
+
+@events_bp.route('/events/tournament', methods=['GET'])
+def tournament_events():
+    ensure_listener()  # picks up tournaments run from scripts/run_tournament.py --events
+    sub = get_bus().subscribe(TOURNAMENT_TOPIC)
+    response = Response(stream_with_context(stream_progress(sub)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
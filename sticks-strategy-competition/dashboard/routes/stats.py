@@ -1,9 +1,18 @@
-from flask import Blueprint, jsonify
-from dashboard.services.stats_service import get_statistics
+from flask import Blueprint, jsonify, request
+from dashboard.services.stats_service import get_cached_statistics
 
 stats_bp = Blueprint('stats', __name__)
 
+
+def conditional(response, cached, tag_suffix=''):
+    """Attach the cached payload's validators and answer 304 when the client is current."""
+    response.set_etag(cached.etag + tag_suffix)
+    response.last_modified = cached.last_modified
+    response.cache_control.no_cache = True  # always revalidate; a 304 is cheap
+    return response.make_conditional(request)
+
+
 @stats_bp.route('/stats', methods=['GET'])
 def stats():
-    statistics = get_statistics()
-    return jsonify(statistics)
\ No newline at end of file
+    cached = get_cached_statistics()
+    return conditional(jsonify(cached.payload), cached)
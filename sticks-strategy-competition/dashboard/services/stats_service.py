@@ -1,27 +1,50 @@
+import hashlib
+import json
+import logging
 import os
-from engine.file_stats import load_leaderboard, load_segmented_leaderboards
-from engine.singlestore_repo import get_repo as get_ss_repo
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+from engine.stats_backend import FILE_BACKEND, get_backend
+
+log = logging.getLogger(__name__)
+
+# Seconds a computed payload is served without even checking the backend's
+# stats_version(); after that a cheap version check decides whether to recompute.
+CACHE_TTL_S = float(os.getenv("SKIT_STATS_CACHE_TTL_S", "2"))
+
+
+@dataclass
+class CachedStatistics:
+    payload: dict
+    etag: str
+    last_modified: datetime
+    version: Any
+    checked_at: float
+
+
+_cache: Optional[CachedStatistics] = None
+_cache_lock = threading.Lock()
 
 
 def get_statistics():
-    """Return statistics, preferring DB; optionally force DB only.
+    """Return statistics from the configured stats backend, falling back to the file store.
 
     Env:
+      SKIT_STATS_BACKEND -> backend selection, see engine.stats_backend
       SKIT_FORCE_DB=1 -> if DB unavailable, raise (surface error to caller)
     """
     force_db = os.getenv("SKIT_FORCE_DB") == "1"
-    repo = None
     try:
-        repo = get_ss_repo()
+        backend = get_backend()
     except Exception:
-        repo = None
-    if repo:
+        log.exception("Could not select a stats backend; reading file stats")
+        backend = FILE_BACKEND
+    if backend is not FILE_BACKEND:
         try:
-            leaderboard = repo.fetch_leaderboard()
-            recent = repo.fetch_recent_games(limit=15)
-            # For now, segmented data only available from file backend
-            segmented = {}
-            return {"leaderboard": leaderboard, "segmented": segmented, "recent_games": recent, "source": "db"}
+            return _collect(backend)
         except Exception:
             if force_db:
                 raise
@@ -29,6 +52,52 @@ def get_statistics():
         # Explicitly forced DB but not available or failed
         return {"leaderboard": [], "segmented": {}, "source": "db_unavailable"}
     # Fallback to file
-    leaderboard = load_leaderboard()
-    segmented = load_segmented_leaderboards()
-    return {"leaderboard": leaderboard, "segmented": segmented, "recent_games": [], "source": "file"}
\ No newline at end of file
+    return _collect(FILE_BACKEND)
+
+
+def _collect(backend):
+    return {
+        "leaderboard": backend.fetch_leaderboard(),
+        "segmented": backend.fetch_segmented_leaderboards(),
+        "recent_games": backend.fetch_recent_games(limit=15),
+        "source": backend.source,
+    }
+
+
+def _stats_version():
+    try:
+        backend = get_backend()
+        return (backend.source, backend.stats_version())
+    except Exception:
+        return None  # unknown: recompute once the TTL has passed
+
+
+def get_cached_statistics() -> CachedStatistics:
+    """get_statistics() behind a shared cache, with an ETag and Last-Modified for the payload.
+
+    Concurrent requests wait on one recomputation instead of each querying the backend.
+    """
+    global _cache
+    with _cache_lock:
+        now = time.monotonic()
+        entry = _cache
+        if entry is not None and now - entry.checked_at < CACHE_TTL_S:
+            return entry
+        version = _stats_version()
+        if entry is not None and version is not None and version == entry.version:
+            entry.checked_at = now
+            return entry
+        payload = get_statistics()
+        etag = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        if entry is not None and entry.etag == etag:
+            last_modified = entry.last_modified
+        else:
+            last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        _cache = CachedStatistics(payload, etag, last_modified, version, now)
+        return _cache
+
+
+def clear_statistics_cache():
+    global _cache
+    with _cache_lock:
+        _cache = None
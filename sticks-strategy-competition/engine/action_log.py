@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+"""Minimal action logs and strategy-free re-simulation.
+
+A game is fully determined by its seed (Part1Engine.deal is the only source
+of engine randomness), the seating and the actions the strategies returned.
+ActionRecorder captures those actions as a byte stream while a game runs;
+replay_game() feeds them back into Part1Engine/Part2Engine through
+ScriptedActions instead of calling strategies, and checks the GameResult.
+
+Encoding, one entry per strategy call (which call comes next is known from
+the engine, so entries carry no tag):
+
+  part1_play   1 byte: 0xFF = deck top, else the hand index
+  part1_slough count byte + one byte per index
+  part2_move   0xFF = eat, else run length byte + one byte per index
+
+ActionLog.to_bytes() adds a small header (seating, expected result) and the
+seed as a zigzag varint, so any int seed round-trips; a typical game is a few
+hundred bytes. Logs can be appended to a file with
+append_action_log() and streamed back with iter_action_logs().
+"""
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .actions import Part1PlayAction, Part1PlayType, Part1SloughAction, Part2Action, Part2ActionType
+from .state import EngineError, GameResult, StrategyWrapper
+
+_SPECIAL = 0xFF
+_VERSION = 2
+# version, players, goat, turns_part1, wars, kills, eats, len(order_out + [loser]), len(actions); then the seed varint
+_HEADER = struct.Struct("<BBBHHHHBI")
+
+
+def _encode_seed(seed: int) -> bytes:
+    z = seed * 2 if seed >= 0 else -seed * 2 - 1
+    out = bytearray()
+    while z > 0x7F:
+        out.append(z & 0x7F | 0x80)
+        z >>= 7
+    out.append(z)
+    return bytes(out)
+
+
+def _decode_seed(data, pos: int):
+    z = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("truncated action log")
+        b = data[pos]
+        pos += 1
+        z |= (b & 0x7F) << shift
+        shift += 7
+        if not b & 0x80:
+            break
+    return (z >> 1 if not z & 1 else -(z >> 1) - 1), pos
+
+
+class ReplayMismatchError(EngineError):
+    """A re-simulated game diverged from its log (engine change or corrupt log)."""
+
+
+class ActionRecorder:
+    def __init__(self):
+        self.data = bytearray()
+        self.valid = True  # False once an action could not be encoded (the engine rejects it anyway)
+
+    def record(self, method: str, action):
+        try:
+            if method == "part1_play":
+                entry = [_SPECIAL] if action.type == Part1PlayType.PLAY_DECK_TOP else [action.card_index]
+            elif method == "part1_slough":
+                entry = [len(action.card_indices), *action.card_indices]
+            elif action.type == Part2ActionType.EAT:
+                entry = [_SPECIAL]
+            else:
+                entry = [len(action.run_card_indices), *action.run_card_indices]
+            if entry[0] != _SPECIAL and any(not 0 <= i < _SPECIAL for i in entry):
+                raise ValueError(entry)
+            self.data += bytes(entry)
+        except Exception:
+            self.valid = False
+
+
+class ScriptedActions:
+    """Serves recorded actions to the engines in place of strategy calls."""
+
+    def __init__(self, data: bytes):
+        self._data = bytes(data)
+        self._pos = 0
+
+    def _take(self, n: int) -> List[int]:
+        if self._pos + n > len(self._data):
+            raise ReplayMismatchError(f"action log exhausted at byte {self._pos}")
+        out = list(self._data[self._pos:self._pos + n])
+        self._pos += n
+        return out
+
+    def next(self, method: str):
+        (first,) = self._take(1)
+        if method == "part1_play":
+            if first == _SPECIAL:
+                return Part1PlayAction(Part1PlayType.PLAY_DECK_TOP)
+            return Part1PlayAction(Part1PlayType.PLAY_HAND_CARD, first)
+        if method == "part1_slough":
+            return Part1SloughAction(self._take(first))
+        if first == _SPECIAL:
+            return Part2Action(Part2ActionType.EAT)
+        return Part2Action(Part2ActionType.PLAY_RUN, self._take(first))
+
+    @property
+    def remaining(self) -> int:
+        return len(self._data) - self._pos
+
+
+@dataclass
+class ActionLog:
+    seed: int
+    num_players: int
+    goat_index: int
+    actions: bytes
+    result: Optional[GameResult] = None
+
+    def to_bytes(self) -> bytes:
+        r = self.result or GameResult(0, [], 0, 0, 0, 0)
+        order = bytes(r.order_out + [r.loser_index]) if self.result else b''
+        return (_HEADER.pack(_VERSION, self.num_players, self.goat_index, r.turns_part1, r.wars_part1,
+                             r.kills_part2, r.eats_part2, len(order), len(self.actions))
+                + _encode_seed(self.seed) + order + bytes(self.actions))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ActionLog":
+        log, _ = cls._unpack(memoryview(data), 0)
+        return log
+
+    @classmethod
+    def _unpack(cls, data, pos: int):
+        version = data[pos]
+        if version != _VERSION:
+            raise ValueError(f"unsupported action log version {version}")
+        players, goat, turns, wars, kills, eats, n_order, n_actions = _HEADER.unpack_from(data, pos)[1:]
+        seed, pos = _decode_seed(data, pos + _HEADER.size)
+        order = list(data[pos:pos + n_order])
+        pos += n_order
+        actions = bytes(data[pos:pos + n_actions])
+        if len(actions) != n_actions:
+            raise ValueError("truncated action log")
+        result = GameResult(order[-1], order[:-1], turns, wars, kills, eats) if order else None
+        return cls(seed, players, goat, actions, result), pos + n_actions
+
+
+def game_result(p1, p2, loser: int, order_out: List[int]) -> GameResult:
+    return GameResult(loser_index=loser, order_out=list(order_out), turns_part1=p1.trick_seq,
+                      wars_part1=p1.wars, kills_part2=p2.kills, eats_part2=p2.eats)
+
+
+def replay_game(seed: int, actions: bytes, num_players: int, goat_index: int = 0,
+                expected: Optional[GameResult] = None) -> GameResult:
+    """Re-run a game from its seed and action stream without any strategy.
+
+    Raises ReplayMismatchError if the actions do not fit the game (an engine
+    change made a recorded action illegal or changed whose turn it is) or if
+    the outcome differs from expected.
+    """
+    from .part1 import Part1Engine
+    from .part2 import Part2Engine
+
+    seats = [StrategyWrapper(name=f"seat{i}", module_name="", instance=None) for i in range(num_players)]
+    script = ScriptedActions(actions)
+    try:
+        p1 = Part1Engine(seats, goat_index, time_limit_ms=0, random_seed=seed, replay_enabled=False,
+                         scripted_actions=script)
+        collected, last_trick_winner, trump_card, _ = p1.run()
+        leader = last_trick_winner if last_trick_winner is not None else goat_index
+        p2 = Part2Engine(seats, collected, leader, trump_card.suit if trump_card else None, time_limit_ms=0,
+                         random_seed=seed, replay_enabled=False, scripted_actions=script)
+        loser, order_out, _, _ = p2.run()
+    except ReplayMismatchError:
+        raise
+    except EngineError as e:
+        raise ReplayMismatchError(f"recorded action rejected: {e}") from e
+    if script.remaining:
+        raise ReplayMismatchError(f"game ended with {script.remaining} action bytes left")
+    result = game_result(p1, p2, loser, order_out)
+    if expected is not None and result != expected:
+        raise ReplayMismatchError(f"result differs: expected {expected}, got {result}")
+    return result
+
+
+def verify_log(log: ActionLog) -> GameResult:
+    return replay_game(log.seed, log.actions, log.num_players, log.goat_index, expected=log.result)
+
+
+def append_action_log(path, log: ActionLog):
+    data = log.to_bytes()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)  # one append per game, so concurrent writers do not interleave
+    finally:
+        os.close(fd)
+
+
+def iter_action_logs(path) -> Iterator[ActionLog]:
+    """Stream the logs of a file written by append_action_log (memory-mapped)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while pos + _HEADER.size <= len(mm):
+                log, pos = ActionLog._unpack(mm, pos)
+                yield log
+
+
+__all__ = ["ActionLog", "ActionRecorder", "ScriptedActions", "ReplayMismatchError", "replay_game", "verify_log",
+           "append_action_log", "iter_action_logs", "game_result"]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+"""Baseline strategies ported to the batched policy interface (engine.batch_sim).
+
+Each port makes the same choice as its scalar strategy for every game in the
+view; only the random deck-top draws come from the batch's numpy Generator
+instead of the module-level random.
+"""
+
+import numpy as np
+
+from .batch_sim import HAND1, KEY_P1, KEY_P2, P2, SUIT, BatchPolicy, Part1View, Part2View, _P1X, masked_argmin
+
+
+def _part1_baseline(view: Part1View, rng: np.random.Generator, draw_prob: float):
+    """Follow the leading rank with the first match, else maybe draw, else the lowest part-1 card."""
+    valid = np.arange(HAND1)[None, :] < view.hand_size[:, None]
+    value = np.where(valid, _P1X[view.hand], 99)
+    match = valid & (value == view.trick_high[:, None]) & (view.trick_high >= 0)[:, None]
+    has_match = match.any(axis=1)
+    draw = ~has_match & (view.deck_remaining > 0) & (rng.random(len(view.games)) < draw_prob)
+    slot = np.where(has_match, match.argmax(axis=1), value.argmin(axis=1))
+    return draw, slot
+
+
+def _beating_singles(view: Part2View):
+    """Hand cards that beat the table's highest play as single cards: (is_trump [n, 52], candidates [n, 52])."""
+    is_trump = SUIT[None, :] == view.trump[:, None]
+    higher = P2[None, :] > view.high_top[:, None]
+    beats = (is_trump & ~view.high_trump[:, None]) | ((is_trump == view.high_trump[:, None]) & higher)
+    return is_trump, view.hand & beats
+
+
+class SimplePolicy(BatchPolicy):
+    """strategies/simple_strategy.py."""
+
+    name = "simple_strategy"
+
+    def __init__(self, draw_prob: float = 0.2):
+        self.draw_prob = draw_prob
+
+    def part1_play(self, view, rng):
+        return _part1_baseline(view, rng, self.draw_prob)
+
+    def part2_move(self, view, rng):
+        _, candidates = _beating_singles(view)
+        card = np.where(view.table_empty, masked_argmin(KEY_P1, view.hand), masked_argmin(KEY_P2, candidates))
+        return card, (card >= 0).astype(np.int64)
+
+
+class TrumpHoarderPolicy(BatchPolicy):
+    """strategies/trump_hoarder_strategy.py.
+
+    The scalar strategy only learns the trump suit in Part 2 and counts seen
+    trumps in Part 1, so within a game it never filters trumps in Part 1 and
+    always beats with its lowest trump; the port does the same.
+    """
+
+    name = "trump_hoarder_strategy"
+
+    def __init__(self, draw_prob: float = 0.25):
+        self.draw_prob = draw_prob
+
+    def part1_play(self, view, rng):
+        return _part1_baseline(view, rng, self.draw_prob)
+
+    def part2_move(self, view, rng):
+        is_trump, candidates = _beating_singles(view)
+        plain = view.hand & ~is_trump
+        lead = np.where(plain.any(axis=1), masked_argmin(KEY_P2, plain), masked_argmin(KEY_P2, view.hand))
+        plain_beat = candidates & ~is_trump
+        beat = np.where(plain_beat.any(axis=1), masked_argmin(KEY_P2, plain_beat), masked_argmin(KEY_P2, candidates))
+        card = np.where(view.table_empty, lead, beat)
+        return card, (card >= 0).astype(np.int64)
+
+
+POLICIES = {p.name: p for p in (SimplePolicy, TrumpHoarderPolicy)}
+
+__all__ = ["SimplePolicy", "TrumpHoarderPolicy", "POLICIES"]
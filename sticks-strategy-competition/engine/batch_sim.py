@@ -0,0 +1,626 @@
+from __future__ import annotations
+
+"""Batched Monte Carlo simulator.
+
+Runs many games in lockstep over NumPy arrays: every array has the game as
+its first axis, and one loop iteration advances every unfinished game by one
+engine step. Rules mirror Part1Engine/Part2Engine step for step (deal order,
+forced matches, slough rounds, wars, eats of the lowest touching span,
+kills, the Part 2 turn guard). With seeds, decks are shuffled exactly like
+Part1Engine.deal, and record_actions=True produces engine.action_log
+streams that replay_game() re-runs through the scalar engines, which is how
+the two implementations are kept in agreement.
+
+Strategies implement BatchPolicy: instead of one state view per call they
+get a view of all games where their seat is to act and answer with arrays.
+engine.batch_policies has ports of the baseline strategies.
+"""
+
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .cards import make_deck
+from .state import GameResult, IllegalActionError
+
+CARD_IDS = np.arange(52)
+SUIT = CARD_IDS // 13
+P2 = CARD_IDS % 13  # part-2 value (2 low, Ace high)
+P1 = (P2 + 1) % 13  # part-1 value (Ace low)
+_P1X = np.append(P1, 99)  # indexable with -1 (empty hand slot)
+KEY_P1 = P1 * 52 + CARD_IDS  # orderings with ties broken by hand position (= card id in part 2)
+KEY_P2 = P2 * 52 + CARD_IDS
+HAND1 = 3  # part-1 hand size
+MAX_TURNS = 5000  # Part2Engine.max_turns
+_DECK_IDS = [c.id for c in make_deck()]
+_BIG = np.int64(1) << 62
+
+_x = range(1 << 14)
+_LOWBIT = np.array([(v & -v).bit_length() - 1 if v else 13 for v in _x], dtype=np.int64)
+_HIGHBIT = np.array([v.bit_length() - 1 for v in _x], dtype=np.int64)
+_POPCNT = np.array([bin(v).count("1") for v in _x], dtype=np.int64)
+del _x
+
+
+def deal_decks(seeds: Sequence[int]) -> np.ndarray:
+    """Decks in Part1Engine order for the given seeds ([games, 52] card ids)."""
+    out = np.empty((len(seeds), 52), dtype=np.int64)
+    for i, seed in enumerate(seeds):
+        deck = list(_DECK_IDS)
+        random.Random(seed).shuffle(deck)
+        out[i] = deck
+    return out
+
+
+def random_decks(rng: np.random.Generator, games: int) -> np.ndarray:
+    """Uniformly shuffled decks without per-game seeds (fastest)."""
+    return rng.permuted(np.tile(np.array(_DECK_IDS), (games, 1)), axis=1)
+
+
+def masked_argmin(keys: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Column of the smallest key where mask is set, per row; -1 for rows with no set column."""
+    k = np.where(mask, keys, _BIG)
+    idx = k.argmin(axis=1)
+    return np.where(mask.any(axis=1), idx, -1)
+
+
+@dataclass
+class Part1View:
+    seat: int
+    games: np.ndarray  # batch rows asked
+    hand: np.ndarray  # [n, 3] card ids in hand order, -1 = empty slot
+    hand_size: np.ndarray
+    trick_high: np.ndarray  # highest part-1 value in the trick, -1 if empty
+    trick_size: np.ndarray
+    deck_remaining: np.ndarray
+    war_active: np.ndarray
+    allowed_slough: Optional[np.ndarray] = None  # [n, 3] bool, part1_slough only
+
+
+@dataclass
+class Part2View:
+    seat: int
+    games: np.ndarray
+    hand: np.ndarray  # [n, 52] bool by card id (the engine's hand is sorted by id)
+    trump: np.ndarray  # trump suit per game
+    table_empty: np.ndarray
+    high_trump: np.ndarray  # strength of the play to beat (undefined where table_empty)
+    high_top: np.ndarray
+    high_len: np.ndarray
+    out: np.ndarray  # [n, players]
+    hand_counts: np.ndarray  # [n, players]
+
+
+class BatchPolicy(ABC):
+    """Batched counterpart of BaseStrategy; rng is a numpy Generator shared by the batch."""
+
+    name = "batch_policy"
+
+    @abstractmethod
+    def part1_play(self, view: Part1View, rng: np.random.Generator):  # pragma: no cover - interface
+        """Return (draw, slot): draw[i] plays the deck top, else hand slot slot[i]."""
+
+    def part1_slough(self, view: Part1View, rng: np.random.Generator) -> np.ndarray:
+        """[n, 3] bool of hand slots to slough (subset of view.allowed_slough)."""
+        return np.zeros_like(view.allowed_slough)
+
+    @abstractmethod
+    def part2_move(self, view: Part2View, rng: np.random.Generator):  # pragma: no cover - interface
+        """Return (low_card, length): play the run of length cards starting at card id low_card; length 0 eats."""
+
+
+@dataclass
+class BatchResult:
+    seeds: Optional[np.ndarray]
+    goat_index: np.ndarray
+    loser: np.ndarray  # seat, -1 for aborted games
+    order_out: np.ndarray  # [games, players - 1]
+    tricks: np.ndarray
+    wars: np.ndarray
+    kills: np.ndarray
+    eats: np.ndarray
+    aborted: np.ndarray  # hit the Part 2 turn guard (the scalar engine raises there)
+    actions: Optional[List[bytes]] = None
+
+    def game_result(self, i: int) -> GameResult:
+        return GameResult(loser_index=int(self.loser[i]), order_out=[int(x) for x in self.order_out[i]],
+                          turns_part1=int(self.tricks[i]), wars_part1=int(self.wars[i]),
+                          kills_part2=int(self.kills[i]), eats_part2=int(self.eats[i]))
+
+    def loss_counts(self, players: int) -> np.ndarray:
+        return np.bincount(self.loser[~self.aborted], minlength=players)
+
+
+class _Batch:
+    def __init__(self, policies: Sequence[BatchPolicy], decks: np.ndarray, goat: np.ndarray,
+                 rng: np.random.Generator, record: bool):
+        self.policies = list(policies)
+        self.P = P = len(policies)
+        self.B = B = len(decks)
+        self.rng = rng
+        self.rows = np.arange(B)
+        self.actions = [bytearray() for _ in range(B)] if record else None
+        self.goat = goat
+        # ---- part 1 ----
+        self.deck = decks
+        self.hand = np.full((B, P, HAND1), -1, dtype=np.int64)
+        for r in range(HAND1):
+            for p in range(P):
+                self.hand[:, p, r] = decks[:, 51 - (r * P + p)]
+        self.hand_n = np.full((B, P), HAND1, dtype=np.int64)
+        self.set_aside = decks[:, 51 - HAND1 * P]
+        self.deck_n = np.full(B, 51 - HAND1 * P, dtype=np.int64)
+        self.collected = np.zeros((B, P, 52), dtype=bool)
+        self.t_card = np.zeros((B, 52), dtype=np.int64)
+        self.t_player = np.zeros((B, 52), dtype=np.int64)
+        self.t_n = np.zeros(B, dtype=np.int64)
+        self.trick_high = np.full(B, -1, dtype=np.int64)
+        self.rank_mask = np.zeros(B, dtype=np.int64)
+        self.played_any = np.zeros((B, P), dtype=bool)
+        self.played_main = np.zeros((B, P), dtype=bool)
+        self.war_active = np.zeros(B, dtype=bool)
+        self.war_part = np.zeros((B, 52), dtype=np.int64)
+        self.war_n = np.zeros(B, dtype=np.int64)
+        self.war_member = np.zeros((B, P), dtype=bool)  # seats in war_part
+        self.war_turn = np.zeros(B, dtype=np.int64)
+        self.leader = goat.copy()
+        self.trick_seq = np.zeros(B, dtype=np.int64)
+        self.wars = np.zeros(B, dtype=np.int64)
+        self.last_winner = np.full(B, -1, dtype=np.int64)
+
+    # ------------------------------------------------------------ helpers
+    def _record(self, games, entries):
+        for g, e in zip(games.tolist(), entries):
+            self.actions[g] += bytes(e)
+
+    def _deck_pop(self, games):
+        cards = self.deck[games, self.deck_n[games] - 1]
+        self.deck_n[games] -= 1
+        return cards
+
+    def _hand_remove(self, games, seat, slots):
+        """Pop hand slot per game, then refill from the deck like list.pop + append."""
+        h = self.hand[games, seat]
+        cards = h[np.arange(len(games)), slots]
+        idx = np.arange(HAND1)[None, :]
+        src = np.minimum(idx + (idx >= slots[:, None]), HAND1 - 1)
+        h = np.take_along_axis(h, src, axis=1)
+        n = self.hand_n[games, seat] - 1
+        h[np.arange(len(games)), n] = -1
+        refill = self.deck_n[games] > 0
+        if refill.any():
+            r = np.nonzero(refill)[0]
+            h[r, n[r]] = self._deck_pop(games[r])
+            n[r] += 1
+        self.hand[games, seat] = h
+        self.hand_n[games, seat] = n
+        return cards
+
+    def _trick_append(self, games, seat, cards, main: bool):
+        pos = self.t_n[games]
+        self.t_card[games, pos] = cards
+        self.t_player[games, pos] = seat
+        self.t_n[games] += 1
+        v = P1[cards]
+        self.rank_mask[games] |= 1 << v
+        self.trick_high[games] = np.maximum(self.trick_high[games], v)
+        self.played_any[games, seat] = True
+        if main:
+            self.played_main[games, seat] = True
+
+    def _trick_to(self, games, owners):
+        """Move the trick cards of games to collected[owners] (owners None: back to who played them)."""
+        k = np.arange(52)[None, :] < self.t_n[games][:, None]
+        r, c = np.nonzero(k)
+        g = games[r]
+        who = self.t_player[g, c] if owners is None else owners[r]
+        self.collected[g, who, self.t_card[g, c]] = True
+        self.t_n[games] = 0
+        self.trick_high[games] = -1
+        self.rank_mask[games] = 0
+        self.played_any[games] = False
+        self.played_main[games] = False
+
+    def _view1(self, seat, games, allowed=None):
+        return Part1View(seat=seat, games=games, hand=self.hand[games, seat], hand_size=self.hand_n[games, seat],
+                         trick_high=self.trick_high[games], trick_size=self.t_n[games],
+                         deck_remaining=self.deck_n[games], war_active=self.war_active[games],
+                         allowed_slough=allowed)
+
+    # ------------------------------------------------------------ part 1
+    def _play(self, act, cur):
+        for seat in range(self.P):
+            games = act[cur == seat]
+            if not games.size:
+                continue
+            draw, slot = self.policies[seat].part1_play(self._view1(seat, games), self.rng)
+            draw = np.asarray(draw, dtype=bool)
+            slot = np.where(draw, 0, np.asarray(slot, dtype=np.int64))
+            h = self.hand[games, seat]
+            n = self.hand_n[games, seat]
+            high = self.trick_high[games]
+            valid = np.arange(HAND1)[None, :] < n[:, None]
+            must = (valid & (_P1X[h] == high[:, None])).any(axis=1) & (high >= 0)
+            if ((slot < 0) | (slot >= n))[~draw].any():
+                raise IllegalActionError(f"{self.policies[seat].name}: invalid hand slot")
+            chosen = _P1X[h[np.arange(len(games)), slot]]
+            if (must & (draw | (chosen != high))).any():
+                raise IllegalActionError(f"{self.policies[seat].name}: must play a card matching the leading rank")
+            if (draw & (self.deck_n[games] == 0)).any():
+                raise IllegalActionError(f"{self.policies[seat].name}: deck empty; cannot play deck top")
+            if self.actions is not None:
+                self._record(games, [[0xFF] if d else [s] for d, s in zip(draw.tolist(), slot.tolist())])
+            cards = np.empty(len(games), dtype=np.int64)
+            if draw.any():
+                cards[draw] = self._deck_pop(games[draw])
+            if (~draw).any():
+                cards[~draw] = self._hand_remove(games[~draw], seat, slot[~draw])
+            self.trick_seq[games] += 1
+            self._trick_append(games, seat, cards, main=True)
+
+    def _slough_mask(self, games, seat):
+        h = self.hand[games, seat]
+        valid = np.arange(HAND1)[None, :] < self.hand_n[games, seat][:, None]
+        held = np.bitwise_or.reduce(np.where(valid, 1 << np.minimum(_P1X[h], 13), 0), axis=1)
+        mask = held & self.rank_mask[games]
+        played = np.where(self.war_active[games], self.played_main[games, seat], self.played_any[games, seat])
+        high = self.trick_high[games]
+        mask = np.where(~played & (high >= 0), mask & ~(1 << np.maximum(high, 0)), mask)
+        locked = (self.war_active[games] & self.war_member[games, seat] & (self.deck_n[games] == 0)
+                  & (self.hand_n[games, seat] == 1))
+        return np.where(locked, 0, mask), valid
+
+    def _sloughs(self, act):
+        pending = act
+        while pending.size:
+            changed = np.zeros(len(pending), dtype=bool)
+            for seat in range(self.P):
+                mask, valid = self._slough_mask(pending, seat)
+                ask = mask != 0
+                if not ask.any():
+                    continue
+                games = pending[ask]
+                allowed = valid[ask] & ((mask[ask][:, None] >> np.minimum(_P1X[self.hand[games, seat]], 13)) & 1 == 1)
+                sel = np.asarray(self.policies[seat].part1_slough(self._view1(seat, games, allowed), self.rng), dtype=bool)
+                if (sel & ~allowed).any():
+                    raise IllegalActionError(f"{self.policies[seat].name}: illegal slough indices")
+                if self.actions is not None:
+                    self._record(games, [[len(s)] + s for s in (np.nonzero(row)[0].tolist() for row in sel)])
+                for slot in range(HAND1 - 1, -1, -1):
+                    r = np.nonzero(sel[:, slot])[0]
+                    if r.size:
+                        cards = self._hand_remove(games[r], seat, np.full(r.size, slot))
+                        self._trick_append(games[r], seat, cards, main=False)
+                idx = np.nonzero(ask)[0]
+                changed[idx[sel.any(axis=1)]] = True
+            pending = pending[changed]
+
+    def _resolve(self, act):
+        n = len(act)
+        ended = np.zeros(n, dtype=bool)
+        winner = np.full(n, -1, dtype=np.int64)
+        k = np.arange(52)[None, :]
+        valid = k < self.t_n[act][:, None]
+        cards = self.t_card[act]
+        players = self.t_player[act]
+        is_high = valid & (P1[cards] == self.trick_high[act][:, None])
+        war = self.war_active[act]
+        if war.any():
+            w = np.nonzero(war)[0]
+            g = act[w]
+            hi = is_high[w] & self.war_member[g[:, None], players[w]]
+            cnt = hi.sum(axis=1)
+            if (cnt == 0).any():
+                raise RuntimeError("war without remaining participants")
+            one = cnt == 1
+            ended[w[one]] = True
+            winner[w[one]] = players[w[one], hi[one].argmax(axis=1)]
+            more = np.nonzero(~one)[0]
+            if more.size:
+                order = np.argsort(~hi[more], axis=1, kind="stable")
+                gm = g[more]
+                self.war_part[gm] = np.take_along_axis(players[w[more]], order, axis=1)
+                self.war_n[gm] = cnt[more]
+                member = np.zeros((more.size, self.P), dtype=bool)
+                rr, cc = np.nonzero(hi[more])
+                member[rr, players[w[more]][rr, cc]] = True
+                self.war_member[gm] = member
+                self.war_turn[gm] = 0
+        calm = np.nonzero(~war)[0]
+        if calm.size:
+            g = act[calm]
+            active_players = self.hand_n[g] > 0
+            ready = (~active_players | self.played_any[g]).all(axis=1)
+            hi = is_high[calm]
+            cnt = hi.sum(axis=1)
+            one = ready & (cnt == 1)
+            ended[calm[one]] = True
+            winner[calm[one]] = players[calm[one], hi[one].argmax(axis=1)]
+            start = np.nonzero(ready & (cnt > 1))[0]
+            if start.size:
+                gs = g[start]
+                self.wars[gs] += 1
+                self.war_active[gs] = True
+                rows = calm[start]
+                first = players[rows, hi[start].argmax(axis=1)]
+                has_high = np.zeros((start.size, self.P), dtype=bool)
+                rr, cc = np.nonzero(hi[start])
+                has_high[rr, players[rows][rr, cc]] = True
+                seats = (first[:, None] + np.arange(self.P)[None, :]) % self.P
+                inc = has_high[np.arange(start.size)[:, None], seats]
+                order = np.argsort(~inc, axis=1, kind="stable")
+                self.war_part[gs, :self.P] = np.take_along_axis(seats, order, axis=1)
+                self.war_n[gs] = inc.sum(axis=1)
+                self.war_member[gs] = has_high
+                self.war_turn[gs] = 0
+        done = np.nonzero(ended)[0]
+        if done.size:
+            g = act[done]
+            self._trick_to(g, winner[done])
+            self.last_winner[g] = winner[done]
+            self.war_active[g] = False
+            self.war_n[g] = 0
+            self.war_member[g] = False
+            self.war_turn[g] = 0
+        return ended, winner
+
+    def part1(self):
+        active = np.ones(self.B, dtype=bool)
+        while True:
+            act = np.nonzero(active)[0]
+            if not act.size:
+                break
+            stop = (self.hand_n[act] == 0).any(axis=1) & (self.deck_n[act] == 0)
+            if stop.any():
+                g = act[stop]
+                self._trick_to(g, None)  # unresolved trick: everyone takes back their cards
+                for p in range(self.P):
+                    r, c = np.nonzero(np.arange(HAND1)[None, :] < self.hand_n[g, p][:, None])
+                    self.collected[g[r], p, self.hand[g[r], p, c]] = True
+                self.hand_n[g] = 0
+                active[g] = False
+                act = act[~stop]
+                if not act.size:
+                    break
+            war = self.war_active[act].copy()
+            cur = np.where(war, self.war_part[act, self.war_turn[act]], self.leader[act])
+            self._play(act, cur)
+            self._sloughs(act)
+            ended, winner = self._resolve(act)
+            self.leader[act[ended]] = winner[ended]
+            g = act[war & ~ended]
+            self.war_turn[g] = (self.war_turn[g] + 1) % self.war_n[g]
+            g = act[~war & ~ended]
+            self.leader[g] = (self.leader[g] + 1) % self.P
+        none = self.last_winner < 0
+        self.last_winner[none] = self.goat[none]
+        self.collected[self.rows, self.last_winner, self.set_aside] = True
+        self.trump = SUIT[self.set_aside]
+
+    # ------------------------------------------------------------ part 2
+    def _part2_setup(self):
+        B, P = self.B, self.P
+        self.hand2 = self.collected
+        self.hand2_n = self.hand2.sum(axis=2)
+        self.out = np.zeros((B, P), dtype=bool)
+        self.order_out = np.full((B, P), -1, dtype=np.int64)
+        self.n_out = np.zeros(B, dtype=np.int64)
+        self.suit_mask = np.zeros((B, 4), dtype=np.int64)
+        self.card_seq = np.zeros((B, 52), dtype=np.int64)
+        self.seq = np.zeros(B, dtype=np.int64)
+        self.pl_suit = np.zeros((B, P), dtype=np.int64)
+        self.pl_mask = np.zeros((B, P), dtype=np.int64)
+        self.pl_top = np.zeros((B, P), dtype=np.int64)
+        self.pl_len = np.zeros((B, P), dtype=np.int64)
+        self.pl_trump = np.zeros((B, P), dtype=bool)
+        self.n_plays = np.zeros(B, dtype=np.int64)
+        self.hi = np.full(B, -1, dtype=np.int64)
+        self.current = self.last_winner.copy()
+        self.turn = np.zeros(B, dtype=np.int64)
+        self.kills = np.zeros(B, dtype=np.int64)
+        self.eats = np.zeros(B, dtype=np.int64)
+        self.loser = np.full(B, -1, dtype=np.int64)
+        self.aborted = np.zeros(B, dtype=bool)
+
+    def _mark_out(self, games, seats):
+        self.out[games, seats] = True
+        self.order_out[games, self.n_out[games]] = seats
+        self.n_out[games] += 1
+
+    def _view2(self, seat, games):
+        hi = np.maximum(self.hi[games], 0)
+        return Part2View(seat=seat, games=games, hand=self.hand2[games, seat], trump=self.trump[games],
+                         table_empty=self.n_plays[games] == 0, high_trump=self.pl_trump[games, hi],
+                         high_top=self.pl_top[games, hi], high_len=self.pl_len[games, hi],
+                         out=self.out[games], hand_counts=self.hand2_n[games])
+
+    def _eat(self, games):
+        m = self.suit_mask[games]
+        low = _LOWBIT[m]
+        suits = np.arange(4)[None, :]
+        seq = self.card_seq[games[:, None], suits * 13 + np.minimum(low, 12)]
+        key = ((suits == self.trump[games][:, None]).astype(np.int64) << 40) | (low << 32) | seq
+        key = np.where(m != 0, key, _BIG)
+        present = (m != 0).any(axis=1)
+        g = games[present]
+        best = key[present].argmin(axis=1)
+        mb = m[present, best]
+        lo = low[present, best]
+        block = mb >> lo
+        length = _LOWBIT[~block & (block + 1) & ((1 << 14) - 1)]
+        span = ((1 << length) - 1) << lo
+        self.suit_mask[g, best] &= ~span
+        pm = np.where(self.pl_suit[g] == best[:, None], self.pl_mask[g] & ~span[:, None], self.pl_mask[g])
+        alive = (np.arange(self.P)[None, :] < self.n_plays[g][:, None]) & (pm != 0)
+        order = np.argsort(~alive, axis=1, kind="stable")
+        for name in ("pl_suit", "pl_trump"):
+            arr = getattr(self, name)
+            arr[g] = np.take_along_axis(arr[g], order, axis=1)
+        pm = np.take_along_axis(pm, order, axis=1)
+        self.pl_mask[g] = pm
+        self.pl_top[g] = _HIGHBIT[pm]
+        self.pl_len[g] = _POPCNT[pm]
+        n = alive.sum(axis=1)
+        self.n_plays[g] = n
+        strength = np.where(np.arange(self.P)[None, :] < n[:, None],
+                            self.pl_trump[g] * 16 + self.pl_top[g], -1)
+        self.hi[g] = np.where(n > 0, strength.argmax(axis=1), -1)
+        self.eats[g] += 1
+        return present, n == 0
+
+    def _play_run(self, games, seat, low_card, length):
+        name = self.policies[seat].name
+        suit, lo = low_card // 13, low_card % 13
+        if ((length < 1) | (lo + length > 13) | (low_card < 0)).any():
+            raise IllegalActionError(f"{name}: illegal run")
+        run = ((1 << length) - 1) << lo
+        values = np.arange(13)[None, :]
+        in_run = (run[:, None] >> values) & 1 == 1
+        ids = suit[:, None] * 13 + values
+        hand = self.hand2[games, seat]
+        if (in_run & ~hand[np.arange(len(games))[:, None], ids]).any():
+            raise IllegalActionError(f"{name}: run cards not in hand")
+        top = lo + length - 1
+        is_trump = suit == self.trump[games]
+        n = self.n_plays[games]
+        hi = np.maximum(self.hi[games], 0)
+        ht, htop, hlen = self.pl_trump[games, hi], self.pl_top[games, hi], self.pl_len[games, hi]
+        beats = np.where(is_trump != ht, is_trump, np.where(top != htop, top > htop, length > hlen))
+        if ((n > 0) & ~beats).any():
+            raise IllegalActionError(f"{name}: run does not beat the table")
+        if self.actions is not None:
+            index = np.cumsum(hand, axis=1) - 1  # position of each held card in the sorted hand
+            first = index[np.arange(len(games)), low_card]
+            self._record(games, [[l] + list(range(f, f + l)) for f, l in zip(first.tolist(), length.tolist())])
+        rr, cc = np.nonzero(in_run)
+        self.hand2[games[rr], seat, ids[rr, cc]] = False
+        self.card_seq[games[rr], ids[rr, cc]] = self.seq[games[rr]] + cc - lo[rr] + 1
+        self.seq[games] += length
+        self.hand2_n[games, seat] -= length
+        self.suit_mask[games, suit] |= run
+        self.pl_suit[games, n] = suit
+        self.pl_mask[games, n] = run
+        self.pl_top[games, n] = top
+        self.pl_len[games, n] = length
+        self.pl_trump[games, n] = is_trump
+        higher = (n == 0) | ((is_trump.astype(np.int64) * 16 + top) > (ht.astype(np.int64) * 16 + htop))
+        self.hi[games] = np.where(higher, n, self.hi[games])
+        self.n_plays[games] = n + 1
+        empty = self.hand2_n[games, seat] == 0
+        if empty.any():
+            self._mark_out(games[empty], np.full(int(empty.sum()), seat))
+        kill = self.n_plays[games] == self.P
+        nxt = np.full(len(games), (seat + 1) % self.P)
+        if kill.any():
+            gk = games[kill]
+            self.kills[gk] += 1
+            self.suit_mask[gk] = 0
+            self.n_plays[gk] = 0
+            self.hi[gk] = -1
+            nxt[kill] = np.where(self.out[gk, seat], (seat + 1) % self.P, seat)
+        self.current[games] = nxt
+
+    def part2(self):
+        self._part2_setup()
+        P = self.P
+        active = np.ones(self.B, dtype=bool)
+        while True:
+            act = np.nonzero(active)[0]
+            if not act.size:
+                break
+            self.turn[act] += 1
+            over = self.turn[act] > MAX_TURNS
+            if over.any():
+                self.aborted[act[over]] = True
+                active[act[over]] = False
+                act = act[~over]
+            left = (~self.out[act]).sum(axis=1)
+            fin = left == 1
+            if fin.any():
+                g = act[fin]
+                self.loser[g] = (~self.out[g]).argmax(axis=1)
+                active[g] = False
+                act = act[~fin]
+            if not act.size:
+                continue
+            cur = self.current[act]
+            is_out = self.out[act, cur]
+            empty = ~is_out & (self.hand2_n[act, cur] == 0)
+            if empty.any():
+                self._mark_out(act[empty], cur[empty])
+            skip = is_out | empty
+            self.current[act[skip]] = (cur[skip] + 1) % P
+            for seat in range(P):
+                games = act[~skip & (cur == seat)]
+                if not games.size:
+                    continue
+                low_card, length = self.policies[seat].part2_move(self._view2(seat, games), self.rng)
+                low_card = np.asarray(low_card, dtype=np.int64)
+                length = np.asarray(length, dtype=np.int64)
+                eat = length == 0
+                if eat.any():
+                    ge = games[eat]
+                    if self.actions is not None:
+                        self._record(ge, [[0xFF]] * len(ge))
+                    ate, cleared = self._eat(ge)
+                    # eating from an empty table passes; the eater keeps the turn while cards remain
+                    passes = ge[~ate]
+                    self.current[passes] = (seat + 1) % P
+                    self.current[ge[ate][cleared]] = (seat + 1) % P
+                if (~eat).any():
+                    self._play_run(games[~eat], seat, low_card[~eat], length[~eat])
+
+    def result(self, seeds) -> BatchResult:
+        return BatchResult(seeds=seeds, goat_index=self.goat, loser=self.loser, order_out=self.order_out[:, :self.P - 1],
+                           tricks=self.trick_seq, wars=self.wars, kills=self.kills, eats=self.eats,
+                           aborted=self.aborted,
+                           actions=[bytes(a) for a in self.actions] if self.actions is not None else None)
+
+
+def simulate_games(policies: Sequence[BatchPolicy], seeds: Optional[Sequence[int]] = None, games: Optional[int] = None,
+                   goat_index=0, rng: Optional[np.random.Generator] = None, record_actions: bool = False) -> BatchResult:
+    """Play one batch of games between policies (one per seat).
+
+    With seeds, game i is dealt exactly like Part1Engine(random_seed=seeds[i]);
+    otherwise games decks are shuffled with rng. goat_index may be an int or
+    an array per game. record_actions keeps engine.action_log streams.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    if seeds is not None:
+        seeds = np.asarray(seeds, dtype=np.int64)
+        decks = deal_decks(seeds.tolist())
+    else:
+        decks = random_decks(rng, games)
+    goat = np.broadcast_to(np.asarray(goat_index, dtype=np.int64), (len(decks),)).copy()
+    batch = _Batch(policies, decks, goat, rng, record_actions)
+    batch.part1()
+    batch.part2()
+    return batch.result(seeds)
+
+
+def estimate_loss_rates(policies: Sequence[BatchPolicy], games: int, seed: int = 0, batch_size: int = 10_000) -> dict:
+    """Loss rate per seat over games simulated in batches, with the goat rotating like a tournament.
+
+    Returns {"games", "aborted", "loss_rate": [per seat], "stderr": [per seat]}.
+    """
+    rng = np.random.default_rng(seed)
+    P = len(policies)
+    losses = np.zeros(P, dtype=np.int64)
+    played = aborted = 0
+    while played + aborted < games:
+        n = min(batch_size, games - played - aborted)
+        res = simulate_games(policies, games=n, goat_index=np.arange(n) % P, rng=rng)
+        losses += res.loss_counts(P)
+        done = int((~res.aborted).sum())
+        played += done
+        aborted += n - done
+    rate = losses / max(played, 1)
+    return {"games": played, "aborted": aborted, "loss_rate": rate.tolist(),
+            "stderr": np.sqrt(rate * (1 - rate) / max(played, 1)).tolist()}
+
+
+__all__ = ["BatchPolicy", "Part1View", "Part2View", "BatchResult", "simulate_games", "estimate_loss_rates",
+           "deal_decks", "random_decks", "masked_argmin", "SUIT", "P1", "P2", "KEY_P1", "KEY_P2"]
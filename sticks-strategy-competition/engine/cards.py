@@ -1,5 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError
 from enum import IntEnum
 from typing import List
 
@@ -17,31 +17,92 @@ RANKS_PART2 = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
 RANK_INDEX_PART1 = {r: i for i, r in enumerate(RANKS_PART1)}  # A=0
 RANK_INDEX_PART2 = {r: i for i, r in enumerate(RANKS_PART2)}  # 2=0, A=12
 
+SUITS = list(Suit)
+
 
-@dataclass(frozen=True)
 class Card:
-    rank: str
-    suit: Suit
+    """A playing card. Cards are interned: Card('K', Suit.SPADES) always returns
+    the same object, so equality is identity and no card is ever allocated after import.
+
+    Besides ``rank``/``suit`` each card carries precomputed integers:
+      id  -- suit * 13 + part-2 rank index (0..51); suit == id // 13
+      p1  -- part-1 value (Ace low), same as part1_value()
+      p2  -- part-2 value (Ace high), same as part2_value() and id % 13
+    """
+
+    __slots__ = ("rank", "suit", "id", "p1", "p2")
+
+    def __new__(cls, rank: str, suit: Suit):
+        try:
+            return _BY_KEY[(rank, suit)]
+        except KeyError:
+            raise ValueError(f"Unknown card {rank!r} of {suit!r}") from None
 
     def part1_value(self) -> int:
-        return RANK_INDEX_PART1[self.rank]
+        return self.p1
 
     def part2_value(self) -> int:
-        return RANK_INDEX_PART2[self.rank]
+        return self.p2
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __hash__(self):
+        return self.id
+
+    def __reduce__(self):
+        return (card_from_id, (self.id,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"Card(rank={self.rank!r}, suit={self.suit!r})"
 
     def __str__(self):  # pragma: no cover - formatting helper
         return f"{self.rank}{self.suit.name[0]}"
 
 
+def _build_cards() -> List[Card]:
+    cards = []
+    for suit in SUITS:
+        for p2, rank in enumerate(RANKS_PART2):
+            card = object.__new__(Card)
+            for name, value in (("rank", rank), ("suit", suit), ("id", int(suit) * 13 + p2),
+                                ("p1", RANK_INDEX_PART1[rank]), ("p2", p2)):
+                object.__setattr__(card, name, value)
+            cards.append(card)
+    return cards
+
+
+CARDS: List[Card] = _build_cards()  # indexed by Card.id
+_BY_KEY = {(c.rank, c.suit): c for c in CARDS}
+_DECK_ORDER = [_BY_KEY[(r, s)] for s in SUITS for r in RANKS_PART1]
+
+
+def card_from_id(card_id: int) -> Card:
+    return CARDS[card_id]
+
+
 def make_deck() -> List[Card]:
-    return [Card(r, s) for s in Suit for r in RANKS_PART1]
+    return list(_DECK_ORDER)
 
 
 def touching_run(cards: List[Card]) -> bool:
     """Return True if all cards are same suit and consecutive in part-2 ordering."""
     if not cards:
         return False
-    if len({c.suit for c in cards}) != 1:
-        return False
-    vals = sorted(c.part2_value() for c in cards)
-    return all(b - a == 1 for a, b in zip(vals, vals[1:]))
+    suit = cards[0].suit
+    mask = 0
+    for c in cards:
+        if c.suit is not suit:
+            return False
+        mask |= 1 << c.p2
+    # distinct values forming one contiguous block of set bits
+    return bin(mask).count("1") == len(cards) and (mask + (mask & -mask)) & mask == 0
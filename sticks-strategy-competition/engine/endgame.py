@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+"""Exact Part 2 endgame solver.
+
+Solves perfect-information Part 2 positions (every hand known, e.g. a
+Part2Engine position or a determinization from engine.rollout) by memoized
+depth-first search under the Part2Engine rules.
+
+Part 2 has several players and a single loser, so "game-theoretic loser" needs
+a convention. Each player only cares about not losing: at its turn a player
+takes the first move that leads to someone else losing, trying moves
+cheapest first (non-trump before trump, then lower top card, then shorter
+run, eating last). If every move loses, it loses. With two players this is
+plain minimax. Eating from an empty table (a pass in the engine) is not
+searched, so every move removes cards and the search always terminates.
+
+Positions are keyed canonically relative to the player to move. The rules
+are the same for every seat, so rotated positions share transposition table
+entries. The table is a bounded LRU, and only finished subtrees are stored.
+A search stopped by its node or time budget therefore leaves useful entries
+for the next call. grade_game() replays an action log and grades the
+recorded Part 2 moves once few enough cards remain.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .actions import Part2Action, Part2ActionType
+from .hand_index import HandIndex, Strength
+from .state import IllegalActionError
+from .strategy_interface import BaseStrategy
+
+Move = Optional[Tuple[int, int]]  # (suit, 13-bit run mask); None = eat
+
+
+class SolverBudgetExceeded(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Position:
+    """A Part 2 position with every hand known.
+
+    hands holds four 13-bit suit masks per seat (bit = part-2 value, the
+    HandIndex layout), flattened; plays are the table plays in order as
+    (suit, mask). current is the seat to act.
+    """
+
+    players: int
+    trump: int
+    current: int
+    out: Tuple[bool, ...]
+    hands: Tuple[int, ...]
+    plays: Tuple[Tuple[int, int], ...] = ()
+
+    @classmethod
+    def from_engine(cls, engine, current: int) -> "Position":
+        hands = []
+        for hand in engine.hands:
+            hands.extend(HandIndex.from_cards(hand).masks)
+        plays = tuple((int(p.cards[0].suit), sum(1 << c.p2 for c in p.cards)) for p in engine.table_plays)
+        return cls(len(engine.hands), int(engine.trump), current, tuple(engine.out), tuple(hands), plays)
+
+    @classmethod
+    def from_view(cls, state, hands) -> "Position":
+        """The asking player's position, with opponents' hands filled in (e.g. Part2Rollout.determinize())."""
+        plays = tuple((int(p.cards[0].suit), sum(1 << c.p2 for c in p.cards)) for p in state.table_plays)
+        return cls(len(state.player_out), int(state.trump), state.player_index, tuple(state.player_out),
+                   tuple(hands), plays)
+
+    @property
+    def cards_left(self) -> int:
+        return sum(bin(m).count("1") for m in self.hands)
+
+    def key(self) -> tuple:
+        """Canonical key: seats rotated so the player to move is seat 0."""
+        c, P = self.current, self.players
+        return (P, self.trump, self.out[c:] + self.out[:c], self.hands[4 * c:] + self.hands[:4 * c], self.plays)
+
+
+@dataclass
+class SolveResult:
+    loser: Optional[int]  # None when the budget ran out
+    move: Move = None  # the current player's move under the solver's convention
+    nodes: int = 0
+    complete: bool = True
+
+
+def _high(plays, trump) -> Optional[Strength]:
+    high = None
+    for s, m in plays:
+        strength = (s == trump, m.bit_length() - 1, bin(m).count("1"))
+        if high is None or strength[:2] > high[:2]:
+            high = strength
+    return high
+
+
+def legal_moves(masks, plays, trump: int) -> List[Move]:
+    """Runs the hand may play (beating the table when it is not empty), cheapest first, then eat."""
+    high = _high(plays, trump)
+    runs = []
+    for s in range(4):
+        m = masks[s]
+        while m:
+            lo = (m & -m).bit_length() - 1
+            block = m >> lo
+            n = (~block & (block + 1)).bit_length() - 1
+            for a in range(lo, lo + n):
+                for b in range(a, lo + n):
+                    strength = (s == trump, b, b - a + 1)
+                    if high is not None:
+                        if strength[0] != high[0]:
+                            if not strength[0]:
+                                continue
+                        elif b < high[1] or (b == high[1] and strength[2] <= high[2]):
+                            continue
+                    runs.append((strength, s, ((1 << (b - a + 1)) - 1) << a))
+            m &= ~(((1 << n) - 1) << lo)
+    runs.sort()
+    moves: List[Move] = [(s, mask) for _, s, mask in runs]
+    if plays:
+        moves.append(None)
+    return moves
+
+
+def action_move(action: Part2Action, hand) -> Move:
+    """Convert a Part2Action (indices into a hand sorted by card id) to a solver move."""
+    if action.type == Part2ActionType.EAT:
+        return None
+    cards = [hand[i] for i in action.run_card_indices]
+    return int(cards[0].suit), sum(1 << c.p2 for c in cards)
+
+
+def move_action(move: Move, hand_index: HandIndex) -> Part2Action:
+    """Convert a solver move to a Part2Action for the hand described by hand_index."""
+    if move is None:
+        return Part2Action(Part2ActionType.EAT)
+    suit, mask = move
+    lo = (mask & -mask).bit_length() - 1
+    return Part2Action(Part2ActionType.PLAY_RUN, hand_index.run_indices(suit, lo, mask.bit_length() - 1))
+
+
+class EndgameSolver:
+    def __init__(self, tt_size: int = 200_000):
+        self.tt_size = tt_size
+        self.tt: "OrderedDict[tuple, Tuple[int, Move]]" = OrderedDict()  # key -> (loser relative to mover, move)
+        self.hits = 0
+        self._nodes = 0
+        self._max_nodes = None
+        self._deadline = None
+
+    # -------- public API ----------
+    def solve(self, pos: Position, max_nodes: Optional[int] = None,
+              time_budget_ms: Optional[float] = None) -> SolveResult:
+        """Loser of pos under the solver's convention, and the mover's move.
+
+        The player to move must hold cards and at least two players must be
+        in (the engine would otherwise skip or end the turn).
+        """
+        if pos.out[pos.current] or not any(pos.hands[4 * pos.current:4 * pos.current + 4]):
+            raise ValueError("the player to move has no cards")
+        self._start(max_nodes, time_budget_ms)
+        try:
+            loser = self._value(pos.players, pos.trump, pos.current, pos.out, pos.hands, pos.plays)
+        except SolverBudgetExceeded:
+            return SolveResult(None, nodes=self._nodes, complete=False)
+        key = pos.key()
+        return SolveResult(loser, self.tt[key][1], nodes=self._nodes)
+
+    def move_values(self, pos: Position, max_nodes: Optional[int] = None,
+                    time_budget_ms: Optional[float] = None) -> List[Tuple[Move, Optional[int]]]:
+        """(move, loser) for every legal move of the player to move; loser None where the budget ran out."""
+        self._start(max_nodes, time_budget_ms)
+        c = pos.current
+        out = []
+        for mv in legal_moves(pos.hands[4 * c:4 * c + 4], pos.plays, pos.trump):
+            try:
+                out.append((mv, self._after(pos.players, pos.trump, c, pos.out, pos.hands, pos.plays, mv)))
+            except SolverBudgetExceeded:
+                out.append((mv, None))
+        return out
+
+    def value_after(self, pos: Position, move: Move, max_nodes: Optional[int] = None,
+                    time_budget_ms: Optional[float] = None) -> Optional[int]:
+        """Loser after the player to move makes move (any engine-legal move, passes included)."""
+        self._start(max_nodes, time_budget_ms)
+        try:
+            return self._after(pos.players, pos.trump, pos.current, pos.out, pos.hands, pos.plays, move)
+        except SolverBudgetExceeded:
+            return None
+
+    def clear(self):
+        self.tt.clear()
+
+    # -------- search ----------
+    def _start(self, max_nodes, time_budget_ms):
+        self._nodes = 0
+        self._max_nodes = max_nodes
+        self._deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+
+    def _value(self, P, trump, cur, out, hands, plays) -> int:
+        key = (P, trump, out[cur:] + out[:cur], hands[4 * cur:] + hands[:4 * cur], plays)
+        hit = self.tt.get(key)
+        if hit is not None:
+            self.tt.move_to_end(key)
+            self.hits += 1
+            return (cur + hit[0]) % P
+        self._nodes += 1
+        if self._max_nodes is not None and self._nodes > self._max_nodes:
+            raise SolverBudgetExceeded
+        if self._deadline is not None and not self._nodes & 1023 and time.perf_counter() > self._deadline:
+            raise SolverBudgetExceeded
+        moves = legal_moves(hands[4 * cur:4 * cur + 4], plays, trump)
+        loser, best = cur, moves[0]
+        for mv in moves:
+            result = self._after(P, trump, cur, out, hands, plays, mv)
+            if result != cur:
+                loser, best = result, mv
+                break
+        self.tt[key] = ((loser - cur) % P, best)
+        if len(self.tt) > self.tt_size:
+            self.tt.popitem(last=False)
+        return loser
+
+    def _after(self, P, trump, cur, out, hands, plays, mv) -> int:
+        if mv is None:
+            if not plays:  # pass
+                return self._advance(P, trump, (cur + 1) % P, out, hands, plays)
+            best = None
+            for i, (s, m) in enumerate(plays):  # lowest card per suit, ties to the play placed first
+                low = (m & -m).bit_length() - 1
+                k = (s == trump, low, i)
+                if best is None or k < best:
+                    best = k
+            _, low, i = best
+            s = plays[i][0]
+            table = 0
+            for ps, pm in plays:
+                if ps == s:
+                    table |= pm
+            block = table >> low
+            span = ((1 << ((~block & (block + 1)).bit_length() - 1)) - 1) << low
+            plays = tuple((ps, pm & ~span if ps == s else pm) for ps, pm in plays if ps != s or pm & ~span)
+            return self._advance(P, trump, cur if plays else (cur + 1) % P, out, hands, plays)
+        s, rm = mv
+        b = 4 * cur
+        hands = hands[:b + s] + (hands[b + s] & ~rm,) + hands[b + s + 1:]
+        plays = plays + ((s, rm),)
+        if not (hands[b] or hands[b + 1] or hands[b + 2] or hands[b + 3]):
+            out = out[:cur] + (True,) + out[cur + 1:]
+        if len(plays) == P:  # kill
+            return self._advance(P, trump, cur if not out[cur] else (cur + 1) % P, out, hands, ())
+        return self._advance(P, trump, (cur + 1) % P, out, hands, plays)
+
+    def _advance(self, P, trump, cur, out, hands, plays) -> int:
+        while True:
+            if out.count(False) == 1:
+                return out.index(False)
+            if out[cur]:
+                cur = (cur + 1) % P
+                continue
+            b = 4 * cur
+            if not (hands[b] or hands[b + 1] or hands[b + 2] or hands[b + 3]):
+                out = out[:cur] + (True,) + out[cur + 1:]
+                cur = (cur + 1) % P
+                continue
+            return self._value(P, trump, cur, out, hands, plays)
+
+
+# -------- grading archived games ----------
+
+@dataclass
+class MoveGrade:
+    turn: int  # index of the Part 2 decision in the game
+    seat: int
+    cards_left: int  # cards in all hands before the move
+    move: Move
+    loser: Optional[int]  # loser after the recorded move (solver convention); None if over budget
+    best_loser: Optional[int]  # loser under the solver's choice for this seat
+    blunder: bool  # the recorded move loses for the mover while some move did not
+
+
+class _Replayer(BaseStrategy):
+    def __init__(self, script, solver: EndgameSolver, max_cards: int, max_nodes: Optional[int]):
+        super().__init__()
+        self.script, self.solver, self.max_cards, self.max_nodes = script, solver, max_cards, max_nodes
+        self.engine = None
+        self.grades: List[MoveGrade] = []
+        self.decisions = 0
+
+    # Part 1 is replayed straight from the script.
+    def part1_play(self, state):
+        return self.script.next("part1_play")
+
+    def part1_slough(self, state):
+        return self.script.next("part1_slough")
+
+    def part2_move(self, state):
+        action = self.script.next("part2_move")
+        turn, self.decisions = self.decisions, self.decisions + 1
+        pos = Position.from_engine(self.engine, state.player_index)
+        if pos.cards_left <= self.max_cards:
+            try:
+                move = action_move(action, state.hand)
+            except IndexError:
+                raise IllegalActionError("recorded move does not fit the hand") from None
+            best = self.solver.solve(pos, max_nodes=self.max_nodes)
+            loser = self.solver.value_after(pos, move, max_nodes=self.max_nodes)
+            seat = state.player_index
+            self.grades.append(MoveGrade(turn, seat, pos.cards_left, move, loser, best.loser,
+                                         loser == seat and best.loser is not None and best.loser != seat))
+        return action
+
+
+def grade_game(seed: int, actions: bytes, num_players: int, goat_index: int = 0, max_cards: int = 12,
+               max_nodes: Optional[int] = 200_000, solver: Optional[EndgameSolver] = None) -> List[MoveGrade]:
+    """Replay an action-logged game (engine.action_log) and grade every Part 2
+    move made with at most max_cards cards left in all hands."""
+    from .action_log import ScriptedActions
+    from .part1 import Part1Engine
+    from .part2 import Part2Engine
+    from .state import StrategyWrapper
+
+    replayer = _Replayer(ScriptedActions(actions), solver or EndgameSolver(), max_cards, max_nodes)
+    seats = [StrategyWrapper(name=f"seat{i}", module_name="", instance=replayer) for i in range(num_players)]
+    p1 = Part1Engine(seats, goat_index, time_limit_ms=0, random_seed=seed, replay_enabled=False, isolation="none")
+    collected, last_trick_winner, trump_card, _ = p1.run()
+    leader = last_trick_winner if last_trick_winner is not None else goat_index
+    p2 = Part2Engine(seats, collected, leader, trump_card.suit, time_limit_ms=0, random_seed=seed,
+                     replay_enabled=False, isolation="none", knowledge=p1.knowledge)
+    replayer.engine = p2
+    p2.run()
+    return replayer.grades
+
+
+__all__ = ["EndgameSolver", "Position", "SolveResult", "SolverBudgetExceeded", "MoveGrade", "legal_moves",
+           "action_move", "move_action", "grade_game"]
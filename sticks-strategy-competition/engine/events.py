@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+"""Tiny event bus for live tournament progress.
+
+Publishers (run_tournament) post JSON-serialisable dicts on a topic. Inside a
+process, subscribers get them through EventBus queues. A tournament running in
+another process (scripts/run_tournament.py) reaches the dashboard through a
+local UDP socket: SocketPublisher sends one datagram per event, and
+SocketListener, running in the dashboard process, republishes them on that
+process's bus.
+
+Delivery is best effort by design: a slow subscriber loses its oldest queued
+events, and datagrams sent while nobody listens are dropped. Progress events
+are full snapshots, so the next one always brings a subscriber up to date.
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+TOURNAMENT_TOPIC = "tournament"
+
+EVENTS_HOST = os.environ.get('SKIT_EVENTS_HOST', '127.0.0.1')
+EVENTS_PORT = int(os.environ.get('SKIT_EVENTS_PORT', 8765))
+_MAX_DATAGRAM = 65_000
+
+
+class Subscription:
+    def __init__(self, bus: "EventBus", topic: str, maxsize: int):
+        self._bus = bus
+        self.topic = topic
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def _offer(self, event: dict):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:  # drop the oldest event; snapshots supersede it anyway
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, or None if none arrived within timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._bus._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBus:
+    """In-process publish/subscribe; remembers the last event of each topic."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs: Dict[str, list] = {}
+        self._last: Dict[str, dict] = {}
+
+    def subscribe(self, topic: str = TOURNAMENT_TOPIC, maxsize: int = 64, replay_last: bool = True) -> Subscription:
+        sub = Subscription(self, topic, maxsize)
+        with self._lock:
+            self._subs.setdefault(topic, []).append(sub)
+            last = self._last.get(topic)
+        if replay_last and last is not None:
+            sub._offer(last)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._subs.get(sub.topic, [])
+            if sub in subs:
+                subs.remove(sub)
+
+    def publish(self, topic: str, event: dict):
+        with self._lock:
+            self._last[topic] = event
+            subs = list(self._subs.get(topic, ()))
+        for sub in subs:
+            sub._offer(event)
+
+    def last(self, topic: str = TOURNAMENT_TOPIC) -> Optional[dict]:
+        with self._lock:
+            return self._last.get(topic)
+
+
+_bus = EventBus()
+
+
+def get_bus() -> EventBus:
+    return _bus
+
+
+class SocketPublisher:
+    """Fire-and-forget JSON datagrams to a SocketListener on this machine."""
+
+    def __init__(self, address: Tuple[str, int] = (EVENTS_HOST, EVENTS_PORT)):
+        self.address = address
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+
+    def publish(self, topic: str, event: dict):
+        data = json.dumps({"topic": topic, "event": event}, separators=(',', ':')).encode()
+        if len(data) > _MAX_DATAGRAM:
+            return
+        try:
+            self._sock.sendto(data, self.address)
+        except OSError:  # nobody listening, buffer full, ...
+            pass
+
+    def close(self):
+        self._sock.close()
+
+
+class SocketListener:
+    """Receives SocketPublisher datagrams and republishes them on a bus."""
+
+    def __init__(self, bus: Optional[EventBus] = None, address: Tuple[str, int] = (EVENTS_HOST, EVENTS_PORT)):
+        self.bus = bus or get_bus()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(address)
+        self._sock.settimeout(0.5)
+        self.address = self._sock.getsockname()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="events-listener", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data = self._sock.recv(_MAX_DATAGRAM + 1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            try:
+                msg = json.loads(data)
+                self.bus.publish(msg["topic"], msg["event"])
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._sock.close()
+
+
+_listener: Optional[SocketListener] = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener() -> Optional[SocketListener]:
+    """Start the process-wide listener once; None if the port is taken."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            try:
+                _listener = SocketListener()
+            except OSError:
+                return None
+        return _listener
+
+
+class ProgressPublisher:
+    """Where run_tournament sends progress: the local bus and, optionally, the socket."""
+
+    def __init__(self, socket_address: Optional[Tuple[str, int]] = (EVENTS_HOST, EVENTS_PORT)):
+        self.bus = get_bus()
+        self.remote = SocketPublisher(socket_address) if socket_address else None
+
+    def publish(self, event: Dict[str, Any], topic: str = TOURNAMENT_TOPIC):
+        self.bus.publish(topic, event)
+        if self.remote is not None:
+            self.remote.publish(topic, event)
+
+    def close(self):
+        if self.remote is not None:
+            self.remote.close()
+
+
+__all__ = ["EventBus", "Subscription", "get_bus", "SocketPublisher", "SocketListener", "ensure_listener",
+           "ProgressPublisher", "TOURNAMENT_TOPIC"]
@@ -1,9 +1,22 @@
 from __future__ import annotations
+import atexit
 import json
+import logging
 import os
+import time
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from threading import RLock
 
+from .leaderboard import leaderboard_row, sort_leaderboard
+from .paths import data_dir
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms fall back to the in-process lock only
+    fcntl = None
+
 """Lightweight JSON-based aggregation storage.
 
 STATS_PATH used to be a plain relative path that included the project folder
@@ -11,17 +24,66 @@ name ("sticks-strategy-competition/data/stats/…"). When the Flask app was
 started from inside the project directory (cd sticks-strategy-competition &&
 python dashboard/app.py) that produced a doubled path like
 sticks-strategy-competition/sticks-strategy-competition/data/... which did
-not exist, so the leaderboard appeared empty. We now resolve the project root
-relative to this file's location and allow an env override.
+not exist, so the leaderboard appeared empty. We now resolve the project's
+data directory (engine.paths.data_dir) and allow an env override.
 """
 
 def _default_stats_path() -> Path:
-    # file: <root>/engine/skit/file_stats.py -> parents[2] is project root
-    root = Path(__file__).resolve().parents[2]
-    return root / 'data' / 'stats' / 'aggregated_stats.json'
+    return data_dir() / 'stats' / 'aggregated_stats.json'
 
 STATS_PATH = Path(os.environ.get('SKIT_STATS_PATH', _default_stats_path()))
 _lock = RLock()
+log = logging.getLogger(__name__)
+
+# Every game is appended as one JSON line to the game log (GAME_LOG_PATH, default
+# game_log.jsonl next to STATS_PATH); record_game buffers lines in memory and
+# appends them every FLUSH_EVERY games or FLUSH_INTERVAL_S seconds, and flush()
+# forces it (also at interpreter exit). compact() folds the log into the
+# aggregated snapshot at STATS_PATH, which remembers how far into the log it has
+# merged (log_offset); readers combine the snapshot with the unmerged tail and
+# this process's unflushed buffer in memory, and never write.
+# Writers in other processes are serialised with an advisory lock on
+# STATS_PATH + '.lock'; readers take it shared.
+FLUSH_EVERY = int(os.environ.get('SKIT_STATS_FLUSH_EVERY', 200))
+FLUSH_INTERVAL_S = float(os.environ.get('SKIT_STATS_FLUSH_INTERVAL_S', 5.0))
+COMPACT_BYTES = int(os.environ.get('SKIT_STATS_COMPACT_BYTES', 4 << 20))  # auto-compact past this tail size
+GAME_LOG_PATH = Path(os.environ['SKIT_GAME_LOG_PATH']) if os.environ.get('SKIT_GAME_LOG_PATH') else None
+
+_RECORD_KEYS = ('loser', 'order_out', 'wars', 'kills', 'eats', 'player_count')
+
+_pending: list[bytes] = []
+_last_flush = time.monotonic()
+
+def _log_path() -> Path:
+    return GAME_LOG_PATH if GAME_LOG_PATH is not None else STATS_PATH.with_name('game_log.jsonl')
+
+def _empty_rec() -> dict:
+    return {"games": 0, "losses": 0, "positions_sum": 0, "wars": 0.0, "kills": 0.0, "eats": 0.0}
+
+_lock_depth = 0
+
+@contextmanager
+def _file_lock(shared: bool = False):
+    # Callers hold _lock; nested use (flush -> compact) must not flock a second fd.
+    global _lock_depth
+    if _lock_depth:
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+        return
+    STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(str(STATS_PATH) + '.lock', 'a') as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        _lock_depth = 1
+        try:
+            yield
+        finally:
+            _lock_depth = 0
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_UN)
 
 def _load() -> dict:
     if STATS_PATH.exists():
@@ -33,24 +95,24 @@ def _load() -> dict:
 
 def _save(data: dict):
     STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    tmp = STATS_PATH.with_suffix('.tmp')
-    tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+    tmp = STATS_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp, 'w') as fh:
+        fh.write(json.dumps(data, indent=2, sort_keys=True))
+        fh.flush()
+        os.fsync(fh.fileno())
     tmp.replace(STATS_PATH)
 
-def record_game(result: dict):
+def _accumulate(data: dict, result: dict):
     order = result['order_out'] + [result['loser']]
     wars = result.get('wars', 0); kills = result.get('kills', 0); eats = result.get('eats', 0)
     n = len(order) if order else 1
     pc = result.get('player_count', n)
-    bucket = f"p{pc}" if pc in (3,4,5) else f"p{pc}"
-    with _lock:
-        data = _load()
-        strat_map = data.setdefault('strategies', {})
-        # segmented stats per player count
-        seg_map = data.setdefault('by_player_count', {})
-        bucket_map = seg_map.setdefault(bucket, {})
-        for pos, name in enumerate(order):
-            rec = strat_map.setdefault(name, {"games": 0, "losses": 0, "positions_sum": 0, "wars": 0.0, "kills": 0.0, "eats": 0.0})
+    bucket = f"p{pc}"
+    strat_map = data.setdefault('strategies', {})
+    # segmented stats per player count
+    bucket_map = data.setdefault('by_player_count', {}).setdefault(bucket, {})
+    for pos, name in enumerate(order):
+        for rec in (strat_map.setdefault(name, _empty_rec()), bucket_map.setdefault(name, _empty_rec())):
             rec['games'] += 1
             rec['positions_sum'] += pos
             rec['wars'] += wars / n
@@ -58,55 +120,157 @@ def record_game(result: dict):
             rec['eats'] += eats / n
             if pos == n - 1:
                 rec['losses'] += 1
-            # segmented
-            seg = bucket_map.setdefault(name, {"games": 0, "losses": 0, "positions_sum": 0, "wars": 0.0, "kills": 0.0, "eats": 0.0})
-            seg['games'] += 1
-            seg['positions_sum'] += pos
-            seg['wars'] += wars / n
-            seg['kills'] += kills / n
-            seg['eats'] += eats / n
-            if pos == n - 1:
-                seg['losses'] += 1
+
+def _log_identity(path: Path):
+    """(log_id, size) of the game log; the id is written as the log's first line."""
+    try:
+        with open(path, 'rb') as fh:
+            first = fh.readline()
+            size = os.fstat(fh.fileno()).st_size
+    except FileNotFoundError:
+        return None, 0
+    try:
+        return json.loads(first)['log_id'], size
+    except (ValueError, KeyError, TypeError):
+        return None, size
+
+def _read_tail(data: dict) -> tuple[dict, int]:
+    """Fold log records past the snapshot's log_offset into data.
+
+    Returns (data, end offset). A torn last line (writer died mid-append) is
+    left out until flush() terminates it; from then on it is a complete line
+    that does not decode, and is skipped with a warning like any other. A log
+    other than the one the snapshot refers to is read from 0.
+    """
+    path = _log_path()
+    log_id, size = _log_identity(path)
+    offset = data.get('log_offset', 0)
+    if log_id is None or log_id != data.get('log_id') or offset > size:
+        offset = 0
+    if offset == size:
+        return data, offset
+    with open(path, 'rb') as fh:
+        fh.seek(offset)
+        chunk = fh.read(size - offset)
+    end = chunk.rfind(b'\n') + 1
+    for line in chunk[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            log.warning("Skipping unreadable game log line in %s: %r", path, line[:80])
+            continue
+        if isinstance(rec, dict) and 'log_id' not in rec:
+            _accumulate(data, rec)
+    return data, offset + end
+
+def _current() -> dict:
+    """Aggregates as of now: compacted snapshot, unmerged log tail and unflushed buffer (read-only)."""
+    with _lock:
+        with _file_lock(shared=True):
+            data = _read_tail(_load())[0]
+        for line in _pending:
+            _accumulate(data, json.loads(line))
+    return data
+
+def record_game(result: dict):
+    """Buffer one game record; it is appended to the game log on the next flush."""
+    line = json.dumps({k: result.get(k) for k in _RECORD_KEYS}, separators=(',', ':')).encode() + b'\n'
+    with _lock:
+        _pending.append(line)
+        due = len(_pending) >= FLUSH_EVERY or time.monotonic() - _last_flush >= FLUSH_INTERVAL_S
+    if due:
+        flush()
+
+def flush():
+    """Append buffered game records to the log (one write under the file lock).
+
+    Compacts as well once the unmerged tail grows past COMPACT_BYTES.
+    """
+    global _pending, _last_flush
+    with _lock:
+        _last_flush = time.monotonic()
+        if not _pending:
+            return
+        batch = _pending
+        _pending = []
+        try:
+            with _file_lock():
+                path = _log_path()
+                fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    size = os.fstat(fd).st_size
+                    if size == 0:
+                        os.write(fd, json.dumps({'log_id': uuid.uuid4().hex}).encode() + b'\n')
+                    elif os.pread(fd, 1, size - 1) != b'\n':
+                        os.write(fd, b'\n')  # end a torn line so this batch starts on its own line
+                    os.write(fd, b''.join(batch))
+                finally:
+                    os.close(fd)
+                tail_bytes = path.stat().st_size
+        except Exception:
+            # keep the games for the next attempt rather than dropping them
+            _pending = batch + _pending
+            raise
+        if tail_bytes >= COMPACT_BYTES:
+            compact()
+
+def compact():
+    """Roll the game log into the aggregated snapshot and start a fresh log."""
+    with _lock, _file_lock():
+        data, end = _read_tail(_load())
+        path = _log_path()
+        log_id, size = _log_identity(path)
+        data['log_id'], data['log_offset'] = log_id, end
         _save(data)
+        if log_id is not None and end == size:
+            # Everything is merged: drop the log. The snapshot keeps the old id, so
+            # a crash before the next save leaves a recreated log read from 0.
+            path.unlink()
+            data['log_id'], data['log_offset'] = None, 0
+            _save(data)
+
+def _reset_after_fork():
+    # A forked child inherits the parent's buffer; only the parent may flush it.
+    # _lock may have been held by another thread (the stats writer) at fork time,
+    # and that thread does not exist in the child, so start with a fresh lock.
+    global _pending, _lock, _lock_depth
+    _pending = []
+    _lock = RLock()
+    _lock_depth = 0
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:  # pragma: no cover - nothing left to report to at exit
+        pass
+
+atexit.register(_flush_at_exit)
+
+def stats_version() -> tuple:
+    """Cheap change marker: (mtime_ns, size) of the snapshot and the game log."""
+    out = []
+    for path in (STATS_PATH, _log_path()):
+        try:
+            st = path.stat()
+            out.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            out.append(None)
+    return tuple(out)
+
+def _rows(strat_map: dict) -> list[dict]:
+    return sort_leaderboard([
+        leaderboard_row(name, rec.get('games', 0), rec.get('losses', 0), rec.get('positions_sum', 0),
+                        rec.get('wars', 0.0), rec.get('kills', 0.0), rec.get('eats', 0.0))
+        for name, rec in strat_map.items()
+    ])
 
 def load_leaderboard() -> list[dict]:
-    with _lock:
-        data = _load()
-    lb = []
-    for name, rec in data.get('strategies', {}).items():
-        games = rec.get('games', 1) or 1
-        lb.append({
-            'strategy': name,
-            'games': rec.get('games', 0),
-            'losses': rec.get('losses', 0),
-            'loss_rate': rec.get('losses', 0)/games,
-            'avg_finish_position': rec.get('positions_sum', 0)/games,
-            'avg_wars': rec.get('wars', 0.0)/games,
-            'avg_kills': rec.get('kills', 0.0)/games,
-            'avg_eats': rec.get('eats', 0.0)/games,
-        })
-    lb.sort(key=lambda x: (x['loss_rate'], x['avg_finish_position']))
-    return lb
+    return _rows(_current().get('strategies', {}))
 
 def load_segmented_leaderboards() -> dict:
-    with _lock:
-        data = _load()
-    seg_root = data.get('by_player_count', {})
-    out: dict = {}
-    for bucket, strat_map in seg_root.items():
-        lb = []
-        for name, rec in strat_map.items():
-            games = rec.get('games', 1) or 1
-            lb.append({
-                'strategy': name,
-                'games': rec.get('games', 0),
-                'losses': rec.get('losses', 0),
-                'loss_rate': rec.get('losses', 0)/games,
-                'avg_finish_position': rec.get('positions_sum', 0)/games,
-                'avg_wars': rec.get('wars', 0.0)/games,
-                'avg_kills': rec.get('kills', 0.0)/games,
-                'avg_eats': rec.get('eats', 0.0)/games,
-            })
-        lb.sort(key=lambda x: (x['loss_rate'], x['avg_finish_position']))
-        out[bucket] = lb
-    return out
+    return {bucket: _rows(strat_map) for bucket, strat_map in _current().get('by_player_count', {}).items()}
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+"""Bitmask index over a Part 2 hand.
+
+A hand is held as four 13-bit masks, one per suit, where bit v is set when the
+hand holds the card of that suit with part-2 value v (2=0 ... A=12). Runs are
+blocks of consecutive set bits, so run and beat queries become a handful of
+integer operations instead of scans over the card list.
+
+A table play's strength is described by ``(is_trump, top_value, length)``,
+matching Part2Engine.beats: trump beats non-trump, otherwise a higher top card
+wins and an equal top card needs a strictly longer run.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+from .cards import Card, Suit, CARDS
+
+Strength = Tuple[bool, int, int]
+Run = Tuple[Suit, int, int]  # (suit, low value, high value), inclusive
+
+
+def _runs(mask: int) -> List[Tuple[int, int]]:
+    """Maximal runs of set bits in mask as inclusive (lo, hi) pairs, lowest first."""
+    out = []
+    while mask:
+        lo = (mask & -mask).bit_length() - 1
+        block = mask >> lo
+        length = (~block & (block + 1)).bit_length() - 1  # trailing ones
+        out.append((lo, lo + length - 1))
+        mask &= ~(((1 << length) - 1) << lo)
+    return out
+
+
+def _cheapest_in_suit(mask: int, top: int, length: int) -> Optional[Tuple[int, int]]:
+    """Cheapest (hi, length) run in mask that beats a same-category play, if any."""
+    if length <= top:
+        need = ((1 << (length + 1)) - 1) << (top - length)
+        if mask & need == need:
+            return top, length + 1
+    above = mask >> (top + 1)
+    if above:
+        return top + (above & -above).bit_length(), 1
+    return None
+
+
+def cheapest_beating_run(masks, strength: Optional[Strength], trump: Optional[int]) -> Optional[Tuple[int, int, int]]:
+    """Cheapest run over four suit masks that beats strength, as (suit, lo, hi) ints.
+
+    Order: non-trump before trump, then lowest top card, then shortest. With
+    an empty table (strength None) this is the lowest non-trump single, or
+    the lowest trump if nothing else is held. Shared by
+    HandIndex.best_beating_run and the rollout policy.
+    """
+    hp_trump, top, length = strength if strength is not None else (False, -1, 0)
+    best = None
+    for s in range(4):
+        m = masks[s]
+        if not m or (s == trump) != hp_trump:
+            continue
+        found = _cheapest_in_suit(m, top, length)
+        if found and (best is None or found < best[1:]):
+            best = (s, *found)
+    if best is None:
+        if hp_trump or trump is None or not masks[trump]:
+            return None
+        m = masks[trump]
+        best = (int(trump), (m & -m).bit_length() - 1, 1)
+    s, hi, n = best
+    return s, hi - n + 1, hi
+
+
+class HandIndex:
+    """Immutable per-suit bitmask index of a hand; safe to share with strategies."""
+
+    __slots__ = ("masks",)
+
+    def __init__(self, masks: Iterable[int] = (0, 0, 0, 0)):
+        object.__setattr__(self, "masks", tuple(masks))
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[Card]) -> "HandIndex":
+        masks = [0, 0, 0, 0]
+        for c in cards:
+            masks[c.suit] |= 1 << c.p2
+        return cls(masks)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HandIndex is read-only")
+
+    def __reduce__(self):
+        return (HandIndex, (self.masks,))
+
+    def __eq__(self, other):
+        return isinstance(other, HandIndex) and self.masks == other.masks
+
+    def __hash__(self):
+        return hash(self.masks)
+
+    def __repr__(self):
+        return f"HandIndex({', '.join(f'{m:#06x}' for m in self.masks)})"
+
+    def __contains__(self, card: Card) -> bool:
+        return bool(self.masks[card.suit] >> card.p2 & 1)
+
+    def __len__(self) -> int:
+        return sum(bin(m).count("1") for m in self.masks)
+
+    def without(self, cards: Iterable[Card]) -> "HandIndex":
+        masks = list(self.masks)
+        for c in cards:
+            masks[c.suit] &= ~(1 << c.p2)
+        return HandIndex(masks)
+
+    def cards(self) -> List[Card]:
+        """Cards in the hand ordered by (suit, part-2 value), i.e. by card id."""
+        return [CARDS[s * 13 + v] for s, m in enumerate(self.masks) for v in range(13) if m >> v & 1]
+
+    # -------- runs ----------
+    def runs(self, suit: Suit) -> List[Tuple[int, int]]:
+        """Maximal runs held in one suit as (lo, hi) value pairs."""
+        return _runs(self.masks[suit])
+
+    def all_runs(self) -> List[Run]:
+        """Every legal run (any length, including singles) the hand can play."""
+        out: List[Run] = []
+        for s, m in enumerate(self.masks):
+            for lo, hi in _runs(m):
+                out.extend((Suit(s), a, b) for a in range(lo, hi + 1) for b in range(a, hi + 1))
+        return out
+
+    def run_indices(self, suit: Suit, lo: int, hi: int) -> List[int]:
+        """Hand positions of the run's cards, for a hand list sorted by card id
+        (Part 2 hands always are)."""
+        before = sum(bin(m).count("1") for m in self.masks[:suit])
+        first = before + bin(self.masks[suit] & ((1 << lo) - 1)).count("1")
+        return list(range(first, first + hi - lo + 1))
+
+    # -------- beating ----------
+    def can_beat(self, strength: Optional[Strength], trump: Optional[Suit]) -> bool:
+        """Whether any legal run beats a play of the given strength (None = empty table)."""
+        if strength is None:
+            return any(self.masks)
+        hp_trump, top, length = strength
+        if not hp_trump and trump is not None and self.masks[trump]:
+            return True
+        for s, m in enumerate(self.masks):
+            if m and (s == trump) == hp_trump and _cheapest_in_suit(m, top, length):
+                return True
+        return False
+
+    def beating_runs(self, strength: Optional[Strength], trump: Optional[Suit]) -> List[Run]:
+        """All legal runs that beat a play of the given strength."""
+        return [r for r in self.all_runs() if run_beats(r, strength, trump)]
+
+    def best_beating_run(self, strength: Optional[Strength], trump: Optional[Suit]) -> Optional[Run]:
+        """Cheapest beating run: non-trump before trump, then lowest top card, then shortest.
+
+        With an empty table this is the lowest non-trump single (trump if nothing else).
+        """
+        found = cheapest_beating_run(self.masks, strength, trump)
+        if found is None:
+            return None
+        suit, lo, hi = found
+        return Suit(suit), lo, hi
+
+
+def run_strength(run: Run, trump: Optional[Suit]) -> Strength:
+    suit, lo, hi = run
+    return (suit == trump, hi, hi - lo + 1)
+
+
+def run_beats(run: Run, strength: Optional[Strength], trump: Optional[Suit]) -> bool:
+    if strength is None:
+        return True
+    is_trump, hi, length = run_strength(run, trump)
+    hp_trump, top, hp_len = strength
+    if is_trump != hp_trump:
+        return is_trump
+    if hi != top:
+        return hi > top
+    return length > hp_len
+
+
+__all__ = ["HandIndex", "Strength", "Run", "run_beats", "run_strength", "cheapest_beating_run"]
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+"""Public card knowledge, maintained by the engines and shared with strategies.
+
+Everything a strategy could learn by watching the game is tracked once, as
+bitmasks over Card.id. The tracker is updated as the engines move cards:
+- cards shown (trick plays, sloughs, Part 2 runs);
+- cards now on the table;
+- cards out of play (eaten or killed in Part 2);
+- for every seat, the cards publicly known to be in its possession. In
+  Part 1 that is its collected pile: trick winners take face-up cards. In
+  Part 2 it is its hand. Part 1 hands that fold into the piles at the end
+  stay private.
+- the trump suit, once the set-aside card is revealed.
+
+State views carry a CardKnowledge snapshot as ``knowledge``. It adds the
+asking player's own cards, so ``unseen`` (cards whose location that player
+cannot know) and its per-suit / per-rank counts take a few integer
+operations instead of a pass over the game history.
+"""
+
+from typing import Optional, Tuple
+
+from .cards import Card, Suit
+
+ALL_CARDS = (1 << 52) - 1
+_SUIT_MASK = (1 << 13) - 1
+_RANK_MASKS = tuple(sum(1 << (s * 13 + v) for s in range(4)) for v in range(13))  # by part-2 value
+
+
+def card_mask(cards) -> int:
+    m = 0
+    for c in cards:
+        m |= 1 << c.id
+    return m
+
+
+class CardKnowledge:
+    """Read-only snapshot of public card knowledge plus the asking player's hand."""
+
+    __slots__ = ("hand", "table", "dead", "seen", "held", "trump")
+
+    def __init__(self, hand: int = 0, table: int = 0, dead: int = 0, seen: int = 0, held: Tuple[int, ...] = (),
+                 trump: Optional[Suit] = None):
+        for name, value in zip(self.__slots__, (hand, table, dead, seen, tuple(held), trump)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CardKnowledge is read-only")
+
+    def __reduce__(self):
+        return (CardKnowledge, (self.hand, self.table, self.dead, self.seen, self.held, self.trump))
+
+    def __eq__(self, other):
+        return isinstance(other, CardKnowledge) and all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        return (f"CardKnowledge(unseen={bin(self.unseen).count('1')}, table={bin(self.table).count('1')}, "
+                f"dead={bin(self.dead).count('1')}, trump={self.trump!r})")
+
+    @property
+    def unseen(self) -> int:
+        """Cards whose location the player cannot know (opponents' private cards, the deck, the set-aside card)."""
+        known = self.hand | self.table | self.dead
+        for m in self.held:
+            known |= m
+        return ALL_CARDS & ~known
+
+    def unseen_in_suit(self, suit: Suit) -> int:
+        return bin((self.unseen >> (13 * suit)) & _SUIT_MASK).count("1")
+
+    def unseen_of_value(self, part2_value: int) -> int:
+        """Unseen cards of one rank, by part-2 value (2=0 ... A=12)."""
+        return bin(self.unseen & _RANK_MASKS[part2_value]).count("1")
+
+    def unseen_suit_counts(self) -> Tuple[int, ...]:
+        u = self.unseen
+        return tuple(bin((u >> (13 * s)) & _SUIT_MASK).count("1") for s in range(4))
+
+    def unseen_rank_counts(self) -> Tuple[int, ...]:
+        u = self.unseen
+        return tuple(bin(u & r).count("1") for r in _RANK_MASKS)
+
+    def is_dead(self, card: Card) -> bool:
+        return bool(self.dead >> card.id & 1)
+
+
+class KnowledgeTracker:
+    """Engine-side, mutable counterpart of CardKnowledge (one per game, carried from Part 1 into Part 2)."""
+
+    def __init__(self, players: int):
+        self.table = 0
+        self.dead = 0
+        self.seen = 0
+        self.held = [0] * players
+        self.trump: Optional[Suit] = None
+        self._held_view: Optional[Tuple[int, ...]] = None
+
+    def show(self, mask: int, player: Optional[int] = None):
+        """Cards played face up onto the table (taken out of player's known cards)."""
+        self.seen |= mask
+        self.table |= mask
+        if player is not None and self.held[player] & mask:
+            self.held[player] &= ~mask
+            self._held_view = None
+
+    def give(self, player: int, mask: int):
+        """Cards publicly moved into player's possession (a won trick, reclaimed cards, the trump card)."""
+        self.seen |= mask
+        self.table &= ~mask
+        self.held[player] |= mask
+        self._held_view = None
+
+    def discard(self, mask: int):
+        """Table cards leaving the game (eaten spans, killed tables)."""
+        self.dead |= mask & self.table
+        self.table &= ~mask
+
+    def reveal_trump(self, player: int, card: Card):
+        self.trump = card.suit
+        self.give(player, 1 << card.id)
+
+    def snapshot(self, hand: int) -> CardKnowledge:
+        if self._held_view is None:
+            self._held_view = tuple(self.held)
+        return CardKnowledge(hand, self.table, self.dead, self.seen, self._held_view, self.trump)
+
+
+__all__ = ["CardKnowledge", "KnowledgeTracker", "card_mask", "ALL_CARDS"]
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+"""Leaderboard rows shared by every stats backend (file, SQLite, SingleStore).
+
+Backends sum per-strategy counters however they store them and turn them into
+rows here, so the averages and the ordering cannot drift between them.
+"""
+
+from typing import List
+
+
+def leaderboard_row(strategy: str, games, losses, positions_sum, wars, kills, eats) -> dict:
+    """One leaderboard entry from summed per-strategy counters."""
+    n = games or 1
+    return {
+        'strategy': strategy,
+        'games': games,
+        'losses': losses,
+        'loss_rate': losses / n,
+        'avg_finish_position': positions_sum / n,
+        'avg_wars': wars / n,
+        'avg_kills': kills / n,
+        'avg_eats': eats / n,
+    }
+
+
+def sort_leaderboard(rows: List[dict]) -> List[dict]:
+    rows.sort(key=lambda x: (x['loss_rate'], x['avg_finish_position']))
+    return rows
+
+
+__all__ = ["leaderboard_row", "sort_leaderboard"]
@@ -4,7 +4,87 @@ from typing import List, Optional
 from .cards import Card, make_deck
 from .state import StrategyWrapper, Part1StateView, TrickPlay, IllegalActionError, ReplayEvent
 from .actions import Part1PlayAction, Part1PlayType, Part1SloughAction
-from .sandbox import run_with_timeout
+from .sandbox import call_strategy
+from .knowledge import KnowledgeTracker, card_mask
+
+
+class _Hand(list):
+    """A player's hand.
+
+    Keeps per-rank counts (indexed by part-1 value) plus a bitmask of the
+    ranks held, so slough eligibility is a mask test, and caches the tuple
+    handed to state views until the list changes.
+    """
+
+    __slots__ = ("_view", "rank_counts", "rank_mask")
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._recount()
+
+    def _recount(self):
+        self._view = None
+        self.rank_counts = [0] * 13
+        self.rank_mask = 0
+        for c in self:
+            self.rank_counts[c.p1] += 1
+            self.rank_mask |= 1 << c.p1
+
+    def _added(self, card: Card):
+        self._view = None
+        self.rank_counts[card.p1] += 1
+        self.rank_mask |= 1 << card.p1
+
+    def _removed(self, card: Card):
+        self._view = None
+        self.rank_counts[card.p1] -= 1
+        if not self.rank_counts[card.p1]:
+            self.rank_mask &= ~(1 << card.p1)
+
+    def view(self) -> tuple:
+        if self._view is None:
+            self._view = tuple(self)
+        return self._view
+
+    def append(self, card: Card):
+        super().append(card)
+        self._added(card)
+
+    def extend(self, cards):
+        for c in cards:
+            self.append(c)
+
+    def insert(self, index, card: Card):
+        super().insert(index, card)
+        self._added(card)
+
+    def pop(self, index=-1) -> Card:
+        card = super().pop(index)
+        self._removed(card)
+        return card
+
+    def remove(self, card: Card):
+        super().remove(card)
+        self._removed(card)
+
+    def clear(self):
+        super().clear()
+        self._recount()
+
+
+def _recounting(name):
+    base = getattr(list, name)
+
+    def method(self, *args, **kwargs):
+        result = base(self, *args, **kwargs)
+        self._recount()
+        return self if result is None and name.startswith("__i") else result
+    method.__name__ = name
+    return method
+
+
+for _name in ("sort", "reverse", "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(_Hand, _name, _recounting(_name))
 
 
 class Part1Engine:
@@ -14,16 +94,21 @@ class Part1Engine:
     """
 
     def __init__(self, strategies: List[StrategyWrapper], goat_index: int, time_limit_ms: int,
-                 random_seed: int | None = None, replay_enabled: bool = True, max_replay_events: int = 10000):
+                 random_seed: int | None = None, replay_enabled: bool = True, max_replay_events: int | None = 10000,
+                 max_memory_bytes: int | None = None, isolation: str = "process", soft_time_limit: bool = False,
+                 replay_sink=None, action_log=None, scripted_actions=None):
         # Core config
         self.strategies = strategies
         self.goat_index = goat_index
         self.time_limit_ms = time_limit_ms
+        self.max_memory_bytes = max_memory_bytes
+        self.isolation = isolation
+        self.soft_time_limit = soft_time_limit
         self.random_seed = random_seed
         self._rng = random.Random(random_seed)
         # Piles / hands
         self.deck: List[Card] = []
-        self.hands: List[List[Card]] = [[] for _ in strategies]
+        self.hands: List[List[Card]] = [_Hand() for _ in strategies]
         self.collected: List[List[Card]] = [[] for _ in strategies]
         # Trick / war bookkeeping
         self.trick_seq = 0
@@ -37,7 +122,70 @@ class Part1Engine:
         # Replay
         self.replay_enabled = replay_enabled
         self.max_replay_events = max_replay_events
-        self.replay: list[ReplayEvent] = []
+        # list by default; a ReplayWriter sink (engine.replay_format) streams events instead
+        self.replay: list[ReplayEvent] = [] if replay_sink is None else replay_sink
+        # Action stream (engine.action_log): record strategy answers, or replay them without strategies
+        self.action_log = action_log
+        self.scripted_actions = scripted_actions
+        # Public card knowledge (engine.knowledge), handed on to Part2Engine
+        self.knowledge = KnowledgeTracker(len(strategies))
+        # Running summaries of current_trick (see _trick_append / _trick_clear)
+        self._trick_rank_mask = 0  # ranks on the table, bit = part-1 value
+        self._trick_high = -1  # highest part-1 value on the table
+        self._played_any: set[int] = set()  # players with any card in the trick
+        self._played_main: set[int] = set()  # players with a required (non-slough) play
+        # Trick / count tuples shared by every view until the next change
+        self._shared_views: tuple | None = None
+
+    def _changed(self):
+        self._shared_views = None
+
+    def _trick_append(self, tp: TrickPlay):
+        self.current_trick.append(tp)
+        self.knowledge.show(1 << tp.card.id)
+        v = tp.card.p1
+        self._trick_rank_mask |= 1 << v
+        if v > self._trick_high:
+            self._trick_high = v
+        self._played_any.add(tp.player_index)
+        if tp.sequence.is_integer():
+            self._played_main.add(tp.player_index)
+        self._changed()
+
+    def _trick_clear(self):
+        self.current_trick.clear()
+        self._trick_rank_mask = 0
+        self._trick_high = -1
+        self._played_any.clear()
+        self._played_main.clear()
+        self._changed()
+
+    def _have_played(self, idx: int) -> bool:
+        # During a war only required plays count; sloughs do not.
+        return idx in (self._played_main if self.war_active else self._played_any)
+
+    def _slough_mask(self, idx: int) -> int:
+        """Bitmask (by part-1 value) of the ranks player idx may slough right now."""
+        hand = self.hands[idx]
+        mask = hand.rank_mask & self._trick_rank_mask
+        if not mask:
+            return 0
+        # cannot pre-slough potential required match before first personal play of trick
+        if not self._have_played(idx):
+            mask &= ~(1 << self._trick_high)
+        # if war active and player is participant, prevent sloughing last card when deck empty
+        if self.war_active and idx in self.war_participants and not self.deck and len(hand) == 1:
+            return 0
+        return mask
+
+    def _shared(self) -> tuple:
+        if self._shared_views is None:
+            self._shared_views = (
+                tuple(self.current_trick),
+                tuple(len(h) for h in self.hands),
+                tuple(len(c) for c in self.collected),
+            )
+        return self._shared_views
 
     def deal(self):
         self.deck = make_deck()
@@ -47,35 +195,37 @@ class Part1Engine:
                 h.append(self.deck.pop())
         self.set_aside_card = self.deck.pop()  # face-down trump card
 
+    def _recording(self) -> bool:
+        # max_replay_events=None: no cap (streamed replays do not grow in memory)
+        return self.replay_enabled and (self.max_replay_events is None or len(self.replay) < self.max_replay_events)
+
+    def _ask(self, strat: StrategyWrapper, method: str, state):
+        if self.scripted_actions is not None:
+            return self.scripted_actions.next(method)
+        action = call_strategy(strat, method, state, self.time_limit_ms, self.max_memory_bytes,
+                               self.isolation, self.soft_time_limit)
+        if self.action_log is not None:
+            self.action_log.record(method, action)
+        return action
+
     def build_state(self, idx: int) -> Part1StateView:
-        hand = list(self.hands[idx])
+        hand = self.hands[idx].view()
         deck_remaining = len(self.deck)
-        have_played = any(tp.player_index == idx for tp in self.current_trick if (not self.war_active) or tp.sequence.is_integer())
-        current_high_rank = None
-        if self.current_trick:
-            high = max(self.current_trick, key=lambda tp: tp.card.part1_value())
-            current_high_rank = high.card.rank
-        ranks_on_table = {tp.card.rank for tp in self.current_trick}
-        allowed_slough: List[int] = []
-        for i, c in enumerate(hand):
-            if c.rank in ranks_on_table:
-                # cannot pre-slough potential required match before first personal play of trick
-                if current_high_rank and c.rank == current_high_rank and not have_played:
-                    continue
-                # if war active and player is participant, prevent sloughing last card when deck empty
-                if self.war_active and idx in self.war_participants and not self.deck and len(hand) == 1:
-                    continue
-                allowed_slough.append(i)
+        mask = self._slough_mask(idx)
+        allowed_slough = tuple(i for i, c in enumerate(hand) if mask >> c.p1 & 1) if mask else ()
+        trick, counts, collected_counts = self._shared()
         return Part1StateView(
             hand=hand,
             deck_remaining=deck_remaining,
-            current_trick_plays=list(self.current_trick),
-            have_played_this_trick=have_played,
+            current_trick_plays=trick,
+            have_played_this_trick=self._have_played(idx),
             allowed_slough_indices=allowed_slough,
-            players_card_counts=[len(h) for h in self.hands],
-            collected_counts=[len(c) for c in self.collected],
+            players_card_counts=counts,
+            collected_counts=collected_counts,
             war_active=self.war_active,
             memory=self.strategies[idx].memory,
+            player_index=idx,
+            knowledge=self.knowledge.snapshot(card_mask(hand)),
         )
 
     def play_turn(self, player_index: int):
@@ -87,19 +237,13 @@ class Part1Engine:
             return  # safety no-op
         strat = self.strategies[player_index]
         state = self.build_state(player_index)
-        action: Part1PlayAction = run_with_timeout(
-            strat.instance.part1_play,
-            args=(state,),
-            time_limit_ms=self.time_limit_ms,
-        )
+        action: Part1PlayAction = self._ask(strat, "part1_play", state)
         # Strict leading-card match rule:
         # If there is a current trick, identify the highest (leading) rank. If player holds one or more
         # cards of that rank, they MUST play one of them (cannot draw deck or play a different rank).
         hand = self.hands[player_index]
-        if self.current_trick:
-            high_play = max(self.current_trick, key=lambda tp: tp.card.part1_value())
-            leading_rank = high_play.card.rank
-            leading_indices = [i for i, c in enumerate(hand) if c.rank == leading_rank]
+        if self.current_trick and hand.rank_counts[self._trick_high]:
+            leading_indices = [i for i, c in enumerate(hand) if c.p1 == self._trick_high]
         else:
             leading_indices = []
         if leading_indices:
@@ -120,30 +264,28 @@ class Part1Engine:
             if self.deck:
                 hand.append(self.deck.pop())
         self.trick_seq += 1
-        self.current_trick.append(TrickPlay(player_index, card, float(self.trick_seq)))
-        if self.replay_enabled and len(self.replay) < self.max_replay_events:
+        self._trick_append(TrickPlay(player_index, card, float(self.trick_seq)))
+        if self._recording():
             self.replay.append(ReplayEvent(phase="part1", turn=self.trick_seq, player=player_index, type="play", detail={"rank": card.rank, "suit": int(card.suit), "deck_draw": action.type == Part1PlayType.PLAY_DECK_TOP}))
 
     def slough_round(self) -> bool:
         changed = False
-        for i, _ in enumerate(self.strategies):
-            state = self.build_state(i)
-            if not state.allowed_slough_indices:
+        for i in range(len(self.strategies)):
+            # Rank-mask precheck: only build a view and ask the strategy when a slough is possible.
+            if not self._slough_mask(i):
                 continue
-            action: Part1SloughAction = run_with_timeout(
-                self.strategies[i].instance.part1_slough,
-                args=(state,),
-                time_limit_ms=self.time_limit_ms,
-            )
+            state = self.build_state(i)
+            action: Part1SloughAction = self._ask(self.strategies[i], "part1_slough", state)
             if any(ci not in state.allowed_slough_indices for ci in action.card_indices):
                 raise IllegalActionError("Illegal slough indices")
             for ci in sorted(action.card_indices, reverse=True):
                 card = self.hands[i].pop(ci)
-                self.current_trick.append(TrickPlay(i, card, self.trick_seq + 0.1))
+                self._trick_append(TrickPlay(i, card, self.trick_seq + 0.1))
                 if self.deck:
                     self.hands[i].append(self.deck.pop())
+                self._changed()
                 changed = True
-                if self.replay_enabled and len(self.replay) < self.max_replay_events:
+                if self._recording():
                     self.replay.append(ReplayEvent(phase="part1", turn=self.trick_seq, player=i, type="slough", detail={"rank": card.rank, "suit": int(card.suit)}))
         return changed
 
@@ -155,8 +297,8 @@ class Part1Engine:
         if not self.current_trick:
             return False, None
         # Consider only latest plays for war participants when war active
-        high_val = max(tp.card.part1_value() for tp in self.current_trick)
-        highs = [tp for tp in self.current_trick if tp.card.part1_value() == high_val]
+        high_val = self._trick_high
+        highs = [tp for tp in self.current_trick if tp.card.p1 == high_val]
         if self.war_active:
             # Filter highs to only those whose player is still in war participants
             highs = [h for h in highs if h.player_index in self.war_participants]
@@ -165,7 +307,8 @@ class Part1Engine:
                 winner = highs[0].player_index
                 collected_cards = [tp.card for tp in self.current_trick]
                 self.collected[winner].extend(collected_cards)
-                self.current_trick.clear()
+                self.knowledge.give(winner, card_mask(collected_cards))
+                self._trick_clear()
                 self.last_completed_trick_winner = winner
                 self.war_active = False
                 self.war_participants.clear()
@@ -179,14 +322,14 @@ class Part1Engine:
         else:
             # Don't resolve a trick until all active players (with cards) have played once
             active_players = [i for i, h in enumerate(self.hands) if h]
-            distinct_played = {tp.player_index for tp in self.current_trick}
-            if not all(p in distinct_played for p in active_players):
+            if not all(p in self._played_any for p in active_players):
                 return False, None
             if len(highs) == 1:
                 winner = highs[0].player_index
                 collected_cards = [tp.card for tp in self.current_trick]
                 self.collected[winner].extend(collected_cards)
-                self.current_trick.clear()
+                self.knowledge.give(winner, card_mask(collected_cards))
+                self._trick_clear()
                 self.last_completed_trick_winner = winner
                 return True, winner
             else:
@@ -206,12 +349,13 @@ class Part1Engine:
                         ordered_players.append(pi)
                 self.war_participants = ordered_players
                 self.war_turn_index = 0
-                if self.replay_enabled and len(self.replay) < self.max_replay_events:
+                if self._recording():
                     self.replay.append(ReplayEvent(phase="part1", turn=self.trick_seq, player=-1, type="war_start", detail={"participants": ordered_players}))
                 return False, None
 
     def run(self):
         self.deal()
+        self._changed()
         leader = self.goat_index
         players_n = len(self.strategies)
         while True:
@@ -220,9 +364,11 @@ class Part1Engine:
                 # Abort unresolved trick: everyone reclaims their played cards
                 for tp in self.current_trick:
                     self.collected[tp.player_index].append(tp.card)
+                    self.knowledge.give(tp.player_index, 1 << tp.card.id)
                 for i, h in enumerate(self.hands):
                     self.collected[i].extend(h)
                     self.hands[i].clear()
+                self._changed()
                 break
             # Determine whose turn (normal or war)
             if self.war_active:
@@ -248,13 +394,15 @@ class Part1Engine:
                     leader = (leader + 1) % players_n
         if self.last_completed_trick_winner is not None and self.set_aside_card:
             self.collected[self.last_completed_trick_winner].append(self.set_aside_card)
+            self.knowledge.reveal_trump(self.last_completed_trick_winner, self.set_aside_card)
         else:
             # Edge: no completed trick; just assign trump card to goat for part2
             if self.set_aside_card:
                 self.collected[self.goat_index].append(self.set_aside_card)
+                self.knowledge.reveal_trump(self.goat_index, self.set_aside_card)
                 self.last_completed_trick_winner = self.goat_index
         # Append summary replay event
-        if self.replay_enabled and len(self.replay) < self.max_replay_events:
+        if self._recording():
             try:
                 trump_info = {"rank": self.set_aside_card.rank, "suit": int(self.set_aside_card.suit)} if self.set_aside_card else None
             except Exception:
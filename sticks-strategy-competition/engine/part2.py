@@ -1,23 +1,34 @@
 from __future__ import annotations
+from operator import attrgetter
 from typing import List, Set
-from .cards import Card, Suit, touching_run
-from .state import Part2StateView, StrategyWrapper, IllegalActionError, ReplayEvent
+from .cards import CARDS, Card, Suit, touching_run
+from .state import Part2StateView, StrategyWrapper, IllegalActionError, ReplayEvent, TablePlay
 from .actions import Part2Action, Part2ActionType
-from .sandbox import run_with_timeout
+from .sandbox import call_strategy
+from .hand_index import HandIndex, Strength, run_beats
+from .knowledge import ALL_CARDS, KnowledgeTracker, card_mask
+
+_card_id = attrgetter("id")
 
 
 class Part2Engine:
     def __init__(self, strategies: List[StrategyWrapper], collected: List[List[Card]],
                  initial_leader: int, trump: Suit, time_limit_ms: int, random_seed: int | None = None,
-                 replay_enabled: bool = True, max_replay_events: int = 10000):
+                 replay_enabled: bool = True, max_replay_events: int | None = 10000,
+                 max_memory_bytes: int | None = None, isolation: str = "process", soft_time_limit: bool = False,
+                 replay_sink=None, action_log=None, scripted_actions=None, knowledge=None):
         # Core setup
         self.strategies = strategies
-        self.hands = [sorted(cs, key=lambda c: (c.suit, c.part2_value())) for cs in collected]
+        self.hands = [sorted(cs, key=_card_id) for cs in collected]  # by (suit, part2 value)
+        self.hand_index = [HandIndex.from_cards(cs) for cs in collected]
         self.trump = trump
         self.leader = initial_leader
-        self.table_plays: List[dict] = []
+        self.table_plays: List[TablePlay] = []
         self.out = [False] * len(strategies)
         self.time_limit_ms = time_limit_ms
+        self.max_memory_bytes = max_memory_bytes
+        self.isolation = isolation
+        self.soft_time_limit = soft_time_limit
         self.random_seed = random_seed
         # Counters
         self.kills = 0
@@ -29,24 +40,130 @@ class Part2Engine:
         # Replay
         self.replay_enabled = replay_enabled
         self.max_replay_events = max_replay_events
-        self.replay: list[ReplayEvent] = []
+        # list by default; a ReplayWriter sink (engine.replay_format) streams events instead
+        self.replay: list[ReplayEvent] = [] if replay_sink is None else replay_sink
+        # Action stream (engine.action_log): record strategy answers, or replay them without strategies
+        self.action_log = action_log
+        self.scripted_actions = scripted_actions
+        # Public card knowledge (engine.knowledge); continues Part1Engine.knowledge when given
+        self.knowledge = knowledge if knowledge is not None else KnowledgeTracker(len(strategies))
+        self.knowledge.trump = trump
+        # Table index, maintained on play / eat / kill
+        self._table_masks = [0, 0, 0, 0]  # cards on the table per suit (bit = part2 value)
+        self._card_seq = [0] * 52  # placement order of table cards, by card id
+        self._seq = 0
+        self._play_strength: List[Strength] = []  # parallel to table_plays
+        self._highest_pos: int | None = None  # first play with the greatest (is_trump, top)
+        # View tuples shared between players until the next change
+        self._hand_views: List[tuple | None] = [None] * len(strategies)
+        self._shared_views: tuple | None = None
+
+    def _changed(self):
+        self._shared_views = None
+
+    def _shared(self) -> tuple:
+        if self._shared_views is None:
+            self._shared_views = (
+                tuple(self.table_plays),
+                tuple(self.out),
+                tuple(len(h) for h in self.hands),
+            )
+        return self._shared_views
+
+    def _mark_out(self, idx: int):
+        self.out[idx] = True
+        self.order_out.append(idx)
+        self._changed()
+
+    # -------- table index ----------
+    def _table_add(self, play: TablePlay):
+        cards = play.cards
+        top = max(c.p2 for c in cards)
+        strength = (cards[0].suit == self.trump, top, len(cards))
+        self.knowledge.show(card_mask(cards), play.player_index)
+        for c in cards:
+            self._table_masks[c.suit] |= 1 << c.p2
+            self._seq += 1
+            self._card_seq[c.id] = self._seq
+        self.table_plays.append(play)
+        self._play_strength.append(strength)
+        if self._highest_pos is None or strength[:2] > self._play_strength[self._highest_pos][:2]:
+            self._highest_pos = len(self.table_plays) - 1
+        self._changed()
+
+    def _table_remove(self, suit: Suit, span_mask: int):
+        """Take the cards of one suit selected by span_mask off the table."""
+        self._table_masks[suit] &= ~span_mask
+        self.knowledge.discard(span_mask << (13 * suit))
+        plays, strengths = [], []
+        for p, strength in zip(self.table_plays, self._play_strength):
+            cards = p.cards
+            if cards[0].suit == suit:
+                remaining = [c for c in cards if not span_mask >> c.p2 & 1]
+                if not remaining:
+                    continue
+                if len(remaining) != len(cards):
+                    p = TablePlay(p.player_index, remaining)
+                    top = max(c.p2 for c in remaining)
+                    strength = (strength[0], top, len(remaining))
+            plays.append(p)
+            strengths.append(strength)
+        self.table_plays = plays
+        self._play_strength = strengths
+        self._highest_pos = None
+        for i, strength in enumerate(strengths):
+            if self._highest_pos is None or strength[:2] > strengths[self._highest_pos][:2]:
+                self._highest_pos = i
+        self._changed()
+
+    def _table_clear(self):
+        self.knowledge.discard(ALL_CARDS)
+        self.table_plays.clear()
+        self._play_strength.clear()
+        self._table_masks = [0, 0, 0, 0]
+        self._highest_pos = None
+        self._changed()
 
     def highest_play(self):
-        if not self.table_plays:
+        if self._highest_pos is None:
+            return None
+        return self.table_plays[self._highest_pos]
+
+    def highest_strength(self) -> Strength | None:
+        """(is_trump, top value, length) of the play to beat, None if the table is empty."""
+        if self._highest_pos is None:
             return None
-        def strength(play):
-            highest = max(play["cards"], key=lambda c: c.part2_value())
-            return (highest.suit == self.trump, highest.part2_value())
-        return max(self.table_plays, key=strength)
+        return self._play_strength[self._highest_pos]
+
+    def _recording(self) -> bool:
+        # max_replay_events=None: no cap (streamed replays do not grow in memory)
+        return self.replay_enabled and (self.max_replay_events is None or len(self.replay) < self.max_replay_events)
+
+    def _ask(self, strat: StrategyWrapper, method: str, state):
+        if self.scripted_actions is not None:
+            return self.scripted_actions.next(method)
+        action = call_strategy(strat, method, state, self.time_limit_ms, self.max_memory_bytes,
+                               self.isolation, self.soft_time_limit)
+        if self.action_log is not None:
+            self.action_log.record(method, action)
+        return action
 
     def build_state(self, idx: int) -> Part2StateView:
+        hand = self._hand_views[idx]
+        if hand is None:
+            hand = self._hand_views[idx] = tuple(self.hands[idx])
+        table, out, counts = self._shared()
         return Part2StateView(
-            hand=list(self.hands[idx]),
+            hand=hand,
             trump=self.trump,
-            table_plays=[p.copy() for p in self.table_plays],
-            player_out=list(self.out),
-            player_hand_counts=[len(h) for h in self.hands],
+            table_plays=table,
+            player_out=out,
+            player_hand_counts=counts,
             memory=self.strategies[idx].memory,
+            hand_index=self.hand_index[idx],
+            highest_strength=self.highest_strength(),
+            player_index=idx,
+            knowledge=self.knowledge.snapshot(sum(m << (13 * s) for s, m in enumerate(self.hand_index[idx].masks))),
         )
 
     def legal_run(self, hand_snapshot: List[Card], indices: List[int]) -> bool:
@@ -57,7 +174,7 @@ class Part2Engine:
         if any(i < 0 or i >= len(hand_snapshot) for i in indices):
             return False
         # must be ascending by part2_value
-        if any(hand_snapshot[indices[i]].part2_value() > hand_snapshot[indices[i+1]].part2_value() for i in range(len(indices)-1)):
+        if any(hand_snapshot[indices[i]].p2 > hand_snapshot[indices[i+1]].p2 for i in range(len(indices)-1)):
             return False
         cards = [hand_snapshot[i] for i in indices]
         return touching_run(cards)
@@ -65,46 +182,45 @@ class Part2Engine:
     def beats(self, run_cards: List[Card]) -> bool:
         if not self.table_plays:
             return True
-        hp = self.highest_play()
-        hp_cards = hp["cards"]  # type: ignore
-        hp_max = max(hp_cards, key=lambda c: c.part2_value())
-        rc_max = max(run_cards, key=lambda c: c.part2_value())
-        if rc_max.suit == self.trump and hp_max.suit != self.trump:
-            return True
-        if rc_max.suit != self.trump and hp_max.suit == self.trump:
-            return False
-        if rc_max.part2_value() != hp_max.part2_value():
-            return rc_max.part2_value() > hp_max.part2_value()
-        return len(run_cards) > len(hp_cards)
+        top = max(c.p2 for c in run_cards)
+        return run_beats((run_cards[0].suit, top - len(run_cards) + 1, top), self.highest_strength(), self.trump)
+
+    def _lowest_span(self):
+        """(suit, mask) of the touching span holding the table's lowest card.
+
+        Lowest means lowest non-trump value (trump only when nothing else is on
+        the table); equal values in different suits go to the card placed first.
+        """
+        best = None
+        for suit, m in enumerate(self._table_masks):
+            if not m:
+                continue
+            low = (m & -m).bit_length() - 1
+            key = (suit == self.trump, low, self._card_seq[suit * 13 + low])
+            if best is None or key < best[0]:
+                best = (key, suit, m, low)
+        if best is None:
+            return None
+        _, suit, m, low = best
+        block = m >> low
+        length = (~block & (block + 1)).bit_length() - 1
+        return Suit(suit), ((1 << length) - 1) << low
 
     def lowest_touching_span(self):
-        if not self.table_plays:
+        found = self._lowest_span()
+        if found is None:
             return None
-        all_cards = []
-        for p in self.table_plays:
-            all_cards.extend(p["cards"])
-        def order_key(c: Card):
-            return (c.suit == self.trump, c.part2_value())
-        all_sorted = sorted(all_cards, key=order_key)
-        lowest = all_sorted[0]
-        same_suit = sorted([c for c in all_cards if c.suit == lowest.suit], key=lambda c: c.part2_value())
-        span = [lowest]
-        i = same_suit.index(lowest)
-        j = i - 1
-        while j >= 0 and same_suit[j + 1].part2_value() - same_suit[j].part2_value() == 1:
-            span.insert(0, same_suit[j])
-            j -= 1
-        k = i + 1
-        while k < len(same_suit) and same_suit[k].part2_value() - same_suit[k - 1].part2_value() == 1:
-            span.append(same_suit[k])
-            k += 1
-        return span
+        suit, mask = found
+        return [CARDS[suit * 13 + v] for v in range(13) if mask >> v & 1]
 
     def remove_cards_from_hand(self, idx: int, indices: List[int]) -> List[Card]:
         hand = self.hands[idx]
         cards = [hand[i] for i in indices]
         for i in sorted(indices, reverse=True):
             hand.pop(i)
+        self.hand_index[idx] = self.hand_index[idx].without(cards)
+        self._hand_views[idx] = None
+        self._changed()
         return cards
 
     def run(self):
@@ -115,7 +231,7 @@ class Part2Engine:
                 raise RuntimeError("Exceeded maximum turns safeguard in Part2; possible infinite loop")
             if sum(1 for o in self.out if not o) == 1:
                 loser = self.out.index(False)
-                if self.replay_enabled and len(self.replay) < self.max_replay_events:
+                if self._recording():
                     self.replay.append(ReplayEvent(phase="part2", turn=self.turn_counter, player=-1, type="summary", detail={
                         "loser": loser,
                         "order_out": self.order_out + [loser],
@@ -135,33 +251,23 @@ class Part2Engine:
             # hands and returning invalid indices like [0].
             if not self.hands[current_player]:
                 if not self.out[current_player]:
-                    self.out[current_player] = True
-                    self.order_out.append(current_player)
-                    if self.replay_enabled and len(self.replay) < self.max_replay_events:
+                    self._mark_out(current_player)
+                    if self._recording():
                         self.replay.append(ReplayEvent(phase="part2", turn=self.turn_counter, player=current_player, type="player_out", detail={"guard": True}))
                 current_player = (current_player + 1) % len(self.strategies)
                 continue
             state = self.build_state(current_player)
-            action: Part2Action = run_with_timeout(
-                self.strategies[current_player].instance.part2_move,
-                args=(state,),
-                time_limit_ms=self.time_limit_ms,
-            )
+            action: Part2Action = self._ask(self.strategies[current_player], "part2_move", state)
             if action.type == Part2ActionType.EAT:
-                span = self.lowest_touching_span()
-                if not span:
+                found = self._lowest_span()
+                if not found:
                     current_player = (current_player + 1) % len(self.strategies)
                     continue
                 self.eats += 1
-                if self.replay_enabled and len(self.replay) < self.max_replay_events:
+                if self._recording():
+                    span = self.lowest_touching_span()
                     self.replay.append(ReplayEvent(phase="part2", turn=self.turn_counter, player=current_player, type="eat", detail={"span": [{"rank": c.rank, "suit": int(c.suit)} for c in span]}))
-                new_table = []
-                for p in self.table_plays:
-                    remaining = [c for c in p["cards"] if c not in span]
-                    if remaining:
-                        p["cards"] = remaining
-                        new_table.append(p)
-                self.table_plays = new_table
+                self._table_remove(*found)
                 if not self.table_plays:
                     current_player = (current_player + 1) % len(self.strategies)
                 continue
@@ -173,54 +279,28 @@ class Part2Engine:
                 run_cards = [state.hand[i] for i in action.run_card_indices]
                 if self.table_plays:
                     if not self.beats(run_cards):
-                        hand_cards = state.hand
-                        by_suit: dict[Suit, list[tuple[int, Card]]] = {}
-                        for idx, c in enumerate(hand_cards):
-                            by_suit.setdefault(c.suit, []).append((idx, c))
-                        can_beat = False
-                        for suit, pairs in by_suit.items():
-                            pairs.sort(key=lambda pc: pc[1].part2_value())
-                            n = len(pairs)
-                            values = [p[1].part2_value() for p in pairs]
-                            start = 0
-                            while start < n:
-                                end = start
-                                while end + 1 < n and values[end+1] == values[end] + 1:
-                                    end += 1
-                                for i in range(start, end+1):
-                                    for j in range(i, end+1):
-                                        segment = [pairs[k][1] for k in range(i, j+1)]
-                                        if self.beats(segment):
-                                            can_beat = True
-                                            break
-                                    if can_beat:
-                                        break
-                                if can_beat:
-                                    break
-                                start = end + 1
-                            if can_beat:
-                                break
+                        can_beat = self.hand_index[current_player].can_beat(self.highest_strength(), self.trump)
                         if can_beat:
                             raise IllegalActionError(f"{self.strategies[current_player].name}: Non-beating run played while beating run exists indices={action.run_card_indices}")
                         else:
                             raise IllegalActionError(f"{self.strategies[current_player].name}: Must EAT (no beating run) instead of playing indices={action.run_card_indices}")
                 played = self.remove_cards_from_hand(current_player, action.run_card_indices)
-                self.table_plays.append({"player_index": current_player, "cards": played})
-                if self.replay_enabled and len(self.replay) < self.max_replay_events:
-                    # Determine beat reason (whether new highest).
-                    if len(self.table_plays) == 1:
+                prev = self.highest_strength()
+                self._table_add(TablePlay(current_player, played))
+                if self._recording():
+                    # Beat reason relative to the highest play before this one.
+                    if prev is None:
                         beat = True; beat_reason = "first"
                     else:
-                        hp_cards = self.highest_play()["cards"]  # type: ignore
-                        hp_max = max(hp_cards, key=lambda c: c.part2_value())
-                        rc_max = max(played, key=lambda c: c.part2_value())
-                        if rc_max.suit == self.trump and hp_max.suit != self.trump:
+                        rc_trump, rc_top, _ = self._play_strength[-1]
+                        hp_trump, hp_top, hp_len = prev
+                        if rc_trump and not hp_trump:
                             beat = True; beat_reason = "trump_over_nontrump"
-                        elif rc_max.suit != self.trump and hp_max.suit == self.trump:
+                        elif not rc_trump and hp_trump:
                             beat = False; beat_reason = "cannot_over_trump"
-                        elif rc_max.part2_value() > hp_max.part2_value():
+                        elif rc_top > hp_top:
                             beat = True; beat_reason = "higher_value"
-                        elif rc_max.part2_value() == hp_max.part2_value() and len(played) > len(hp_cards):
+                        elif rc_top == hp_top and len(played) > hp_len:
                             beat = True; beat_reason = "longer_run"
                         else:
                             beat = False; beat_reason = "not_higher"
@@ -230,15 +310,14 @@ class Part2Engine:
                         "beat_reason": beat_reason
                     }))
                 if not self.hands[current_player]:
-                    self.out[current_player] = True
-                    self.order_out.append(current_player)
-                    if self.replay_enabled and len(self.replay) < self.max_replay_events:
+                    self._mark_out(current_player)
+                    if self._recording():
                         self.replay.append(ReplayEvent(phase="part2", turn=self.turn_counter, player=current_player, type="player_out", detail={}))
                 if len(self.table_plays) == self.plays_needed_to_kill:
                     killer = current_player
                     self.kills += 1
-                    self.table_plays.clear()
-                    if self.replay_enabled and len(self.replay) < self.max_replay_events:
+                    self._table_clear()
+                    if self._recording():
                         self.replay.append(ReplayEvent(phase="part2", turn=self.turn_counter, player=killer, type="kill", detail={"kills": self.kills}))
                     if self.out[killer]:
                         current_player = (killer + 1) % len(self.strategies)
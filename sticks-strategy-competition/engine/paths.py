@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+"""Default locations of the files the engine writes.
+
+Stats (JSON snapshot and game log, SQLite database) and replay archives all
+live under one data directory: <project>/data, or SKIT_DATA_DIR when set.
+"""
+
+import os
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def data_dir() -> Path:
+    env = os.environ.get('SKIT_DATA_DIR')
+    return Path(env) if env else PROJECT_ROOT / 'data'
+
+
+__all__ = ["PROJECT_ROOT", "data_dir"]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+"""Memory-mapped replay archives.
+
+A tournament run with replays writes every game into one archive file in the
+engine.replay_format encoding, and ReplayWriter appends a fixed-width entry
+per game (byte offset, record count, game number, seed) to ``<archive>.idx``.
+finalize_index() sorts the index by game number once the tournament is done.
+
+ReplayArchive maps both files with mmap, so opening an archive reads nothing
+up front and extracting a game only touches that game's pages: with a
+finalized index of games 0..N-1, game(n) is a direct index lookup. Lookups by
+seed (and by game number in unsorted indexes) build a dict on first use.
+"""
+
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from .paths import data_dir
+from .replay_format import (INDEX_RECORD, RECORD, RECORD_SIZE, _F_FIRST, _NO_GAME, ReplayFormatError,
+                            ReplayGame, index_path, pack_index_entry)
+
+
+def default_archive_path(name: str) -> Path:
+    return data_dir() / 'replays' / f'{name}.skr'
+
+
+def _map(path: Path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _write_index(path, entries):
+    tmp = index_path(path).with_name(index_path(path).name + f'.tmp{os.getpid()}')
+    with open(tmp, 'wb') as f:
+        for offset, records, game_number, seed, flags in entries:
+            f.write(INDEX_RECORD.pack(offset, records, game_number, seed, flags))
+    os.replace(tmp, index_path(path))
+
+
+def build_index(path) -> int:
+    """(Re)build ``<archive>.idx`` by scanning the archive; returns the number of games.
+
+    For archives written with index=False or whose index was lost.
+    """
+    entries = []
+    mm = _map(Path(path))
+    try:
+        usable = len(mm) - len(mm) % RECORD_SIZE
+        start = None
+        for off in range(0, usable, RECORD_SIZE):
+            if mm[off] == 0:
+                if start is not None:
+                    entries.append((start, (off - start) // RECORD_SIZE))
+                start = off
+        if start is not None:
+            entries.append((start, (usable - start) // RECORD_SIZE))
+        packed = []
+        for offset, records in entries:
+            _, _, _, flags, game_number, _, _, _, seed = RECORD.unpack_from(mm, offset)
+            packed.append(INDEX_RECORD.unpack(pack_index_entry(
+                offset, records, None if game_number == _NO_GAME else game_number, seed if flags & _F_FIRST else None)))
+    finally:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
+    packed.sort(key=lambda e: (e[2], e[0]))
+    _write_index(path, packed)
+    return len(packed)
+
+
+def finalize_index(path) -> int:
+    """Sort the index by game number (then offset) so game(n) is a direct lookup."""
+    idx = index_path(path)
+    if not idx.exists():
+        return build_index(path)
+    data = idx.read_bytes()
+    entries = list(INDEX_RECORD.iter_unpack(data[:len(data) - len(data) % INDEX_RECORD.size]))
+    entries.sort(key=lambda e: (e[2], e[0]))
+    _write_index(path, entries)
+    return len(entries)
+
+
+class ReplayArchive:
+    def __init__(self, path):
+        self.path = Path(path)
+        if not index_path(self.path).exists():
+            build_index(self.path)
+        self._data = _map(self.path)
+        self._index = _map(index_path(self.path))
+        self._count = len(self._index) // INDEX_RECORD.size
+        self._by_game: Optional[Dict[int, int]] = None
+        self._by_seed: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, i: int) -> tuple:
+        return INDEX_RECORD.unpack_from(self._index, i * INDEX_RECORD.size)
+
+    def _load(self, i: int) -> ReplayGame:
+        offset, records, *_ = self._entry(i)
+        end = offset + records * RECORD_SIZE
+        if end > len(self._data):
+            raise ReplayFormatError(f"index entry {i} points past the end of {self.path}")
+        raw = self._data[offset:end]  # copies just this game
+        return ReplayGame(RECORD.unpack_from(raw), raw[RECORD_SIZE:])
+
+    def game(self, game_number: int) -> ReplayGame:
+        if 0 <= game_number < self._count and self._entry(game_number)[2] == game_number:
+            return self._load(game_number)
+        if self._by_game is None:
+            self._by_game = {e[2]: i for i, e in enumerate(INDEX_RECORD.iter_unpack(self._index)) if e[2] != _NO_GAME}
+        try:
+            return self._load(self._by_game[game_number])
+        except KeyError:
+            raise KeyError(f"no game {game_number} in {self.path}") from None
+
+    def by_seed(self, seed: int) -> ReplayGame:
+        if self._by_seed is None:
+            self._by_seed = {e[3]: i for i, e in enumerate(INDEX_RECORD.iter_unpack(self._index)) if e[4] & _F_FIRST}
+        try:
+            return self._load(self._by_seed[seed])
+        except KeyError:
+            raise KeyError(f"no game with seed {seed} in {self.path}") from None
+
+    def __iter__(self) -> Iterator[ReplayGame]:
+        for i in range(self._count):
+            yield self._load(i)
+
+    def close(self):
+        for m in (self._data, self._index):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+__all__ = ["ReplayArchive", "build_index", "finalize_index", "default_archive_path"]
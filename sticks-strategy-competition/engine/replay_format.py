@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+"""Compact binary replay format.
+
+A replay file is a flat sequence of fixed-width little-endian records
+(RECORD_SIZE bytes, layout RECORD):
+
+  phase   u8   0 = game header, 1 = part1, 2 = part2
+  type    u8   index into EVENT_TYPES
+  player  i8   acting seat, -1 for engine events
+  flags   u8   per-type booleans (deck_draw, beat, guard)
+  turn    u32  trick / turn counter of the event
+  a, b    u16  per-type small integers (see encode_event)
+  packed  u64  per-type packed small integers (seat orders, card counts)
+  cards   i64  set of cards as a bitmask over Card.id
+
+Each game starts with a header record (phase 0) carrying MAGIC, VERSION,
+the number of players, goat index, game number and seed, followed by the
+game's events. Because every game is self-delimiting, any number of games
+can share a file and writers in different processes can append to the same
+file: ReplayWriter buffers one game and appends it with a single write.
+
+Card lists decode in ascending Card.id order (runs and eaten spans are sets
+of cards, so nothing is lost); everything else in ReplayEvent.detail
+round-trips exactly.
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .cards import CARDS
+from .state import ReplayEvent
+
+RECORD = struct.Struct("<BBbBIHHQq")
+RECORD_SIZE = RECORD.size
+MAGIC = int.from_bytes(b"SKRP", "little")
+VERSION = 1
+MAX_PLAYERS = 10  # collected_counts pack 6 bits per seat into 64 bits
+
+PHASES = ("game", "part1", "part2")
+EVENT_TYPES = ("game", "play", "slough", "war_start", "summary", "eat", "run_play", "player_out", "kill")
+_TYPE_CODE = {name: i for i, name in enumerate(EVENT_TYPES)}
+BEAT_REASONS = ("first", "trump_over_nontrump", "cannot_over_trump", "higher_value", "longer_run", "not_higher")
+_BEAT_CODE = {name: i for i, name in enumerate(BEAT_REASONS)}
+
+_NO_SEAT = 0xFFFF
+_NO_GAME = 0xFFFFFFFF
+_ID_BY_KEY = {(c.rank, int(c.suit)): c.id for c in CARDS}
+_F_FIRST = 1  # deck_draw / beat / has-seed
+_F_GUARD = 2
+
+
+class ReplayFormatError(ValueError):
+    pass
+
+
+# Offset index, one entry per game in <archive>.idx:
+#   offset u64, records u32 (header included), game_number u32, seed i64, flags u32
+INDEX_RECORD = struct.Struct("<QIIqI")
+
+
+def index_path(path) -> Path:
+    return Path(str(path) + '.idx')
+
+
+def pack_index_entry(offset: int, records: int, game_number: Optional[int], seed: Optional[int]) -> bytes:
+    has_seed = isinstance(seed, int) and -(1 << 63) <= seed < (1 << 63)
+    return INDEX_RECORD.pack(offset, records, _NO_GAME if game_number is None else game_number,
+                             seed if has_seed else 0, _F_FIRST if has_seed else 0)
+
+
+def append_index_entry(path, offset: int, records: int, game_number: Optional[int], seed: Optional[int]):
+    fd = os.open(index_path(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, pack_index_entry(offset, records, game_number, seed))  # 28 bytes: one atomic append
+    finally:
+        os.close(fd)
+
+
+def _mask(cards: List[dict]) -> int:
+    m = 0
+    for c in cards:
+        m |= 1 << _ID_BY_KEY[(c["rank"], c["suit"])]
+    return m
+
+
+def _cards(mask: int) -> List[dict]:
+    out = []
+    while mask:
+        low = mask & -mask
+        c = CARDS[low.bit_length() - 1]
+        out.append({"rank": c.rank, "suit": int(c.suit)})
+        mask ^= low
+    return out
+
+
+def _pack(values: List[int], bits: int) -> int:
+    packed = 0
+    for i, v in enumerate(values):
+        packed |= v << (i * bits)
+    return packed
+
+
+def _unpack(packed: int, bits: int, count: int) -> List[int]:
+    m = (1 << bits) - 1
+    return [(packed >> (i * bits)) & m for i in range(count)]
+
+
+def encode_header(num_players: int, seed: Optional[int] = None, goat_index: int = 0,
+                  game_number: Optional[int] = None) -> bytes:
+    if not 0 < num_players <= MAX_PLAYERS:
+        raise ReplayFormatError(f"replay format supports 1..{MAX_PLAYERS} players, got {num_players}")
+    has_seed = isinstance(seed, int) and -(1 << 63) <= seed < (1 << 63)
+    return RECORD.pack(0, 0, num_players, _F_FIRST if has_seed else 0,
+                       _NO_GAME if game_number is None else game_number, goat_index, VERSION, MAGIC,
+                       seed if has_seed else 0)
+
+
+def encode_event(event: ReplayEvent) -> bytes:
+    d = event.detail
+    t = event.type
+    flags = a = b = packed = cards = 0
+    if event.phase == "part1":
+        phase = 1
+        if t in ("play", "slough"):
+            cards = 1 << _ID_BY_KEY[(d["rank"], d["suit"])]
+            flags = _F_FIRST if d.get("deck_draw") else 0
+        elif t == "war_start":
+            seats = d["participants"]
+            a, b = sum(1 << s for s in seats), seats[0]  # seat set + first seat restores the order
+        elif t == "summary":
+            a = d["wars"]
+            b = _NO_SEAT if d["last_trick_winner"] is None else d["last_trick_winner"]
+            packed = _pack(d["collected_counts"], 6)
+            cards = _mask([d["trump_card"]]) if d["trump_card"] else 0
+    else:
+        phase = 2
+        if t == "eat":
+            cards = _mask(d["span"])
+        elif t == "run_play":
+            cards = _mask(d["cards"])
+            flags = _F_FIRST if d["beat"] else 0
+            a = _BEAT_CODE[d["beat_reason"]]
+        elif t == "player_out":
+            flags = _F_GUARD if d.get("guard") else 0
+        elif t == "kill":
+            a = d["kills"]
+        elif t == "summary":
+            a, b = d["kills"], d["eats"]
+            packed = _pack(d["order_out"], 4)
+    return RECORD.pack(phase, _TYPE_CODE[t], event.player, flags, event.turn, a, b, packed, cards)
+
+
+def _decode(rec: tuple, num_players: int, part2_events: int) -> ReplayEvent:
+    phase, code, player, flags, turn, a, b, packed, cards = rec
+    t = EVENT_TYPES[code]
+    if phase == 1:
+        if t in ("play", "slough"):
+            detail = _cards(cards)[0]
+            if t == "play":
+                detail["deck_draw"] = bool(flags & _F_FIRST)
+        elif t == "war_start":
+            detail = {"participants": [(b + o) % num_players for o in range(num_players) if a >> ((b + o) % num_players) & 1]}
+        else:
+            trump = _cards(cards)
+            detail = {
+                "wars": a,
+                "last_trick_winner": None if b == _NO_SEAT else b,
+                "tricks_played": turn,
+                "collected_counts": _unpack(packed, 6, num_players),
+                "trump_card": trump[0] if trump else None,
+            }
+    else:
+        if t == "eat":
+            detail = {"span": _cards(cards)}
+        elif t == "run_play":
+            detail = {"cards": _cards(cards), "beat": bool(flags & _F_FIRST), "beat_reason": BEAT_REASONS[a]}
+        elif t == "player_out":
+            detail = {"guard": True} if flags & _F_GUARD else {}
+        elif t == "kill":
+            detail = {"kills": a}
+        else:
+            order = _unpack(packed, 4, num_players)
+            detail = {
+                "loser": order[-1],
+                "order_out": order,
+                "kills": a,
+                "eats": b,
+                "turns": turn,
+                "players_remaining": [order[-1]],
+                "events": part2_events,
+            }
+    return ReplayEvent(phase=PHASES[phase], turn=turn, player=player, type=t, detail=detail)
+
+
+class ReplayGame:
+    """One game of a replay file; events are decoded lazily from the raw records."""
+
+    def __init__(self, header: tuple, data):
+        _, _, num_players, flags, game_number, goat_index, version, magic, seed = header
+        if magic != MAGIC or version != VERSION:
+            raise ReplayFormatError("not a replay game header (bad magic or unsupported version)")
+        self.num_players = num_players
+        self.goat_index = goat_index
+        self.game_number = None if game_number == _NO_GAME else game_number
+        self.seed = seed if flags & _F_FIRST else None
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._data) // RECORD_SIZE
+
+    def __iter__(self) -> Iterator[ReplayEvent]:
+        part2_events = 0
+        for rec in RECORD.iter_unpack(self._data):
+            yield _decode(rec, self.num_players, part2_events)
+            if rec[0] == 2:
+                part2_events += 1
+
+    def events(self, phase: Optional[str] = None) -> Iterator[ReplayEvent]:
+        return (e for e in self if phase is None or e.phase == phase)
+
+
+def iter_replays(path, chunk_records: int = 4096) -> Iterator[ReplayGame]:
+    """Yield the games of a replay file in file order, reading it in chunks.
+
+    Only the game being yielded is held in memory. A torn trailing record
+    (a writer killed mid-append) is ignored.
+    """
+    header = None
+    body = bytearray()
+    with open(path, 'rb') as f:
+        pending = b''
+        while True:
+            chunk = f.read(RECORD_SIZE * chunk_records)
+            if not chunk:
+                break
+            chunk = pending + chunk
+            usable = len(chunk) - len(chunk) % RECORD_SIZE
+            pending = chunk[usable:]
+            view = memoryview(chunk)[:usable]
+            for off in range(0, usable, RECORD_SIZE):
+                rec = view[off:off + RECORD_SIZE]
+                if rec[0] == 0:
+                    if header is not None:
+                        yield ReplayGame(header, bytes(body))
+                    header = RECORD.unpack(rec)
+                    body = bytearray()
+                elif header is not None:
+                    body += rec
+    if header is not None:
+        yield ReplayGame(header, bytes(body))
+
+
+class _PhaseSink:
+    """list-like target for an engine's replay events (append and len only)."""
+
+    def __init__(self, writer: "ReplayWriter"):
+        self._writer = writer
+        self._count = 0
+
+    def append(self, event: ReplayEvent):
+        self._writer._buf += encode_event(event)
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class ReplayWriter:
+    """Appends encoded games to a replay file.
+
+    Usage: begin_game(), hand sink() to each engine as its replay list, then
+    end_game(). Events are encoded as the engines emit them; the finished game
+    is appended with one O_APPEND write, so concurrent writers never
+    interleave games. A game that raises before end_game() is simply dropped.
+    Unless index=False, each game also gets an entry in the file's offset
+    index (engine.replay_archive).
+    """
+
+    def __init__(self, path, index: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.index = index
+        self._buf = bytearray()
+        self._game = (None, None)
+
+    def begin_game(self, num_players: int, seed: Optional[int] = None, goat_index: int = 0,
+                   game_number: Optional[int] = None):
+        self._buf = bytearray(encode_header(num_players, seed, goat_index, game_number))
+        self._game = (game_number, seed)
+
+    def sink(self) -> _PhaseSink:
+        return _PhaseSink(self)
+
+    def end_game(self):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            data = memoryview(self._buf)
+            while data:
+                data = data[os.write(fd, data):]
+            # with O_APPEND the fd offset ends right after our own write
+            offset = os.lseek(fd, 0, os.SEEK_CUR) - len(self._buf)
+        finally:
+            os.close(fd)
+        if self.index:
+            append_index_entry(self.path, offset, len(self._buf) // RECORD_SIZE, *self._game)
+        self._buf = bytearray()
+
+
+__all__ = ["ReplayWriter", "ReplayGame", "iter_replays", "encode_event", "encode_header", "ReplayFormatError",
+           "RECORD_SIZE", "EVENT_TYPES", "BEAT_REASONS"]
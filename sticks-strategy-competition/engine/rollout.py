@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+"""Determinize-and-roll-out lookahead for Part 2 strategies.
+
+Part2Rollout is built from the Part2StateView a strategy receives. Each
+rollout deals the cards the strategy cannot see (everything not in its hand,
+not on the table and not listed in ``exclude``) to the other players in the
+counts the view reports. With state.knowledge, dead cards are never dealt
+and cards publicly known to be in a hand stay there. It then optionally
+makes a candidate first move and plays the game out with a fast default
+policy under the Part2Engine rules (beats, eats of the lowest touching span,
+kills after one play per seat, players going out). The result is the loser's
+seat.
+
+Everything runs in the calling process on integers: hands are four 13-bit
+suit masks per seat (the HandIndex layout), the table is four suit masks plus
+a short list of plays, and a rollout copies a handful of small lists. A
+strategy can therefore afford hundreds of rollouts per decision:
+
+    rollout = Part2Rollout(state)
+    moves = [Part2Action(Part2ActionType.EAT), ...]
+    stats = rollout.compare(moves, n=500, time_budget_ms=30)
+    best = min(zip(moves, stats), key=lambda ms: ms[1].loss_rate)[0]
+
+Randomness comes from ``rng`` (default: the random module, which the sandbox
+seeds per game, so rollouts are reproducible with the game seed).
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .actions import Part2Action, Part2ActionType
+from .hand_index import Strength, cheapest_beating_run, run_beats
+from .state import IllegalActionError, Part2StateView
+
+Move = Optional[Tuple[int, int]]  # (suit, 13-bit run mask); None = eat
+Policy = Callable[[List[int], int, Optional[Strength]], Move]
+
+_POLICY = object()  # "let the policy choose the first move too"
+
+
+def cheapest_move(masks: List[int], trump: int, high: Optional[Strength]) -> Move:
+    """Default rollout policy: the cheapest beating run (hand_index.cheapest_beating_run), else eat.
+
+    Leads the lowest non-trump single on an empty table.
+    """
+    found = cheapest_beating_run(masks, high, trump)
+    if found is None:
+        return None
+    s, lo, hi = found
+    return s, ((1 << (hi - lo + 1)) - 1) << lo
+
+
+def _strength(suit: int, mask: int, trump: int) -> Strength:
+    return (suit == trump, mask.bit_length() - 1, bin(mask).count("1"))
+
+
+@dataclass
+class RolloutStats:
+    seat: int
+    rollouts: int = 0
+    truncated: int = 0  # rollouts stopped by max_turns (no loser)
+    losses: List[int] = field(default_factory=list)  # per seat
+
+    def add(self, loser: int):
+        self.rollouts += 1
+        if loser < 0:
+            self.truncated += 1
+        else:
+            self.losses[loser] += 1
+
+    @property
+    def loss_rate(self) -> float:
+        """Share of finished rollouts lost by the asking player."""
+        finished = self.rollouts - self.truncated
+        return self.losses[self.seat] / finished if finished else 0.0
+
+
+class Part2Rollout:
+    """Lookahead from a Part2StateView; see the module docstring.
+
+    exclude: bitmask over Card.id of cards known to be out of play (eaten or
+    killed), so they are never dealt to opponents. policy: callable taking
+    (four suit masks, trump, strength to beat or None) and returning
+    (suit, run mask) or None to eat; it must only return legal moves.
+    """
+
+    def __init__(self, state: Part2StateView, exclude: int = 0, policy: Policy = cheapest_move,
+                 max_turns: int = 5000):
+        if state.player_index < 0:
+            raise ValueError("state view has no player_index")
+        self.seat = seat = state.player_index
+        self.players = P = len(state.player_out)
+        self.trump = trump = int(state.trump)
+        self.hand = state.hand
+        self.policy = policy
+        self.max_turns = max_turns
+        self.out = list(state.player_out)
+        self.base = [0] * (4 * P)
+        known = exclude
+        for c in state.hand:
+            self.base[4 * seat + c.suit] |= 1 << c.p2
+            known |= 1 << c.id
+        self.table = [0, 0, 0, 0]
+        self.seq = [0] * 52
+        self.plays: List[Tuple[int, int, Strength]] = []
+        self.high: Optional[Strength] = None
+        n = 0
+        for play in state.table_plays:
+            suit, mask = int(play.cards[0].suit), 0
+            for c in play.cards:
+                n += 1
+                self.seq[c.id] = n
+                mask |= 1 << c.p2
+                known |= 1 << c.id
+            strength = _strength(suit, mask, trump)
+            self.table[suit] |= mask
+            self.plays.append((suit, mask, strength))
+            if self.high is None or strength[:2] > self.high[:2]:
+                self.high = strength
+        self.next_seq = n
+        counts = list(state.player_hand_counts)
+        if state.knowledge is not None:
+            known |= state.knowledge.dead
+            for j, held in enumerate(state.knowledge.held):
+                if j == seat or not held:
+                    continue
+                for c in range(52):
+                    if held >> c & 1:
+                        self.base[4 * j + c // 13] |= 1 << (c % 13)
+                known |= held
+                counts[j] -= bin(held).count("1")
+        self.pool = [(c // 13, 1 << (c % 13)) for c in range(52) if not known >> c & 1]
+        self.deal = [(4 * j, k) for j, k in enumerate(counts) if j != seat and k > 0]
+        self.hidden = sum(k for _, k in self.deal)
+        if self.hidden > len(self.pool):
+            raise ValueError(f"opponents hold {self.hidden} cards but only {len(self.pool)} are unseen")
+
+    # -------- moves ----------
+    def move(self, action: Part2Action) -> Move:
+        """Validate a Part2Action against the view and convert it to a rollout move."""
+        if action.type == Part2ActionType.EAT:
+            return None
+        idx = list(action.run_card_indices)
+        if not idx or len(set(idx)) != len(idx) or any(i < 0 or i >= len(self.hand) for i in idx):
+            raise IllegalActionError("Invalid run indices")
+        cards = [self.hand[i] for i in idx]
+        suit = cards[0].suit
+        values = [c.p2 for c in cards]
+        if any(c.suit != suit for c in cards) or values != list(range(values[0], values[0] + len(values))):
+            raise IllegalActionError("Run is not a touching ascending run of one suit")
+        if not run_beats((suit, values[0], values[-1]), self.high, self.trump):
+            raise IllegalActionError("Run does not beat current highest")
+        return int(suit), ((1 << len(values)) - 1) << values[0]
+
+    # -------- sampling ----------
+    def determinize(self, rng=None) -> List[int]:
+        """Hands (4 suit masks per seat, flattened) with the hidden cards dealt at random."""
+        hands = self.base[:]
+        cards = (rng or random).sample(self.pool, self.hidden)
+        i = 0
+        for offset, k in self.deal:
+            for suit, bit in cards[i:i + k]:
+                hands[offset + suit] |= bit
+            i += k
+        return hands
+
+    def play_out(self, hands: List[int], first=_POLICY) -> int:
+        """Play a determinized position to the end (mutates hands); loser seat, -1 if truncated."""
+        P, trump, policy = self.players, self.trump, self.policy
+        out = self.out[:]
+        remaining = out.count(False)
+        table, plays, seq, n, high = self.table[:], self.plays[:], self.seq[:], self.next_seq, self.high
+        cur = self.seat
+        for _ in range(self.max_turns):
+            if remaining == 1:
+                return out.index(False)
+            if out[cur]:
+                cur = (cur + 1) % P
+                continue
+            b = 4 * cur
+            if not (hands[b] or hands[b + 1] or hands[b + 2] or hands[b + 3]):
+                out[cur] = True
+                remaining -= 1
+                cur = (cur + 1) % P
+                continue
+            if first is _POLICY:
+                mv = policy(hands[b:b + 4], trump, high)
+            else:
+                mv, first = first, _POLICY
+            if mv is None:  # eat the lowest touching span; keep the turn while cards remain
+                if not plays:
+                    cur = (cur + 1) % P
+                    continue
+                best = None
+                for s in range(4):
+                    m = table[s]
+                    if m:
+                        low = (m & -m).bit_length() - 1
+                        key = (s == trump, low, seq[s * 13 + low])
+                        if best is None or key < best:
+                            best, bs, blo = key, s, low
+                block = table[bs] >> blo
+                span = ((1 << ((~block & (block + 1)).bit_length() - 1)) - 1) << blo
+                table[bs] &= ~span
+                kept, high = [], None
+                for ps, pm, strength in plays:
+                    if ps == bs and pm & span:
+                        pm &= ~span
+                        if not pm:
+                            continue
+                        strength = _strength(ps, pm, trump)
+                    kept.append((ps, pm, strength))
+                    if high is None or strength[:2] > high[:2]:
+                        high = strength
+                plays = kept
+                if not plays:
+                    cur = (cur + 1) % P
+                continue
+            s, rm = mv
+            hands[b + s] &= ~rm
+            table[s] |= rm
+            x, base = rm, s * 13
+            while x:
+                low = x & -x
+                n += 1
+                seq[base + low.bit_length() - 1] = n
+                x ^= low
+            strength = _strength(s, rm, trump)
+            plays.append((s, rm, strength))
+            if high is None or strength[:2] > high[:2]:
+                high = strength
+            if not (hands[b] or hands[b + 1] or hands[b + 2] or hands[b + 3]):
+                out[cur] = True
+                remaining -= 1
+            if len(plays) == P:  # kill: the table clears and the killer leads again
+                table, plays, high = [0, 0, 0, 0], [], None
+                if out[cur]:
+                    cur = (cur + 1) % P
+            else:
+                cur = (cur + 1) % P
+        return -1
+
+    # -------- statistics ----------
+    def compare(self, actions: Sequence[Optional[Part2Action]], n: int = 100,
+                time_budget_ms: Optional[float] = None, rng=None) -> List[RolloutStats]:
+        """Roll out each candidate (None = let the policy move) on the same n determinizations.
+
+        Stops early when time_budget_ms runs out; every candidate always has
+        the same number of rollouts.
+        """
+        moves = [_POLICY if a is None else self.move(a) for a in actions]
+        stats = [RolloutStats(self.seat, losses=[0] * self.players) for _ in moves]
+        deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+        for _ in range(n):
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            hands = self.determinize(rng)
+            for mv, st in zip(moves, stats):
+                st.add(self.play_out(hands[:], mv))
+        return stats
+
+    def evaluate(self, action: Optional[Part2Action] = None, n: int = 100,
+                 time_budget_ms: Optional[float] = None, rng=None) -> RolloutStats:
+        return self.compare([action], n, time_budget_ms, rng)[0]
+
+
+__all__ = ["Part2Rollout", "RolloutStats", "cheapest_move"]
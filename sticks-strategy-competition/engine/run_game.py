@@ -4,14 +4,22 @@ from .loader import load_strategies
 from .part1 import Part1Engine
 from .part2 import Part2Engine
 from .state import GameConfig
+from .sandbox import begin_game
 import random
-from .file_stats import record_game as record_game_file
-from .singlestore_repo import get_repo as get_ss_repo
+from .stats_writer import get_writer
+from .replay_format import ReplayWriter
+from .action_log import ActionLog, ActionRecorder, append_action_log, game_result
+from dataclasses import replace
 
 
 def run_single_game(strat_wrappers, goat_index=0, config: GameConfig | None = None):
     if config is None:
         config = GameConfig()
+    recorder = None
+    if config.record_actions or config.action_log_path:
+        recorder = ActionRecorder()
+        if config.random_seed is None:
+            config = replace(config, random_seed=random.randrange(1 << 62))
     # Apply optional max player cap
     working_wrappers = list(strat_wrappers)
     if config.max_players_per_game is not None and len(working_wrappers) > config.max_players_per_game:
@@ -19,13 +27,27 @@ def run_single_game(strat_wrappers, goat_index=0, config: GameConfig | None = No
         working_wrappers = rng.sample(working_wrappers, config.max_players_per_game)
         # Adjust goat_index to within sampled set: choose first sampled as goat
         goat_index = 0
+    for seat, w in enumerate(working_wrappers):
+        begin_game(w, seed=None if config.random_seed is None else f"{config.random_seed}:{seat}",
+                   isolation=config.isolation, soft_time_limit=config.soft_time_limit)
+    writer = None
+    max_replay_events = config.max_replay_events
+    if config.enable_replay and config.replay_path:
+        writer = ReplayWriter(config.replay_path)
+        writer.begin_game(len(working_wrappers), config.random_seed, goat_index, config.game_number)
+        max_replay_events = None
     p1 = Part1Engine(
         working_wrappers,
         goat_index,
         time_limit_ms=config.time_limit_ms,
         random_seed=config.random_seed,
         replay_enabled=config.enable_replay,
-        max_replay_events=config.max_replay_events,
+        max_replay_events=max_replay_events,
+        max_memory_bytes=config.max_memory_bytes,
+        isolation=config.isolation,
+        soft_time_limit=config.soft_time_limit,
+        replay_sink=writer.sink() if writer else None,
+        action_log=recorder,
     )
     collected, last_trick_winner, trump_card, wars = p1.run()
     trump = trump_card.suit if trump_card else None
@@ -38,7 +60,13 @@ def run_single_game(strat_wrappers, goat_index=0, config: GameConfig | None = No
         time_limit_ms=config.time_limit_ms,
         random_seed=config.random_seed,
         replay_enabled=config.enable_replay,
-        max_replay_events=config.max_replay_events,
+        max_replay_events=max_replay_events,
+        max_memory_bytes=config.max_memory_bytes,
+        isolation=config.isolation,
+        soft_time_limit=config.soft_time_limit,
+        replay_sink=writer.sink() if writer else None,
+        action_log=recorder,
+        knowledge=p1.knowledge,
     )
     loser, order_out, kills, eats = p2.run()
     result = {
@@ -50,31 +78,33 @@ def run_single_game(strat_wrappers, goat_index=0, config: GameConfig | None = No
         "order_out": [working_wrappers[i].name for i in order_out],
         "player_count": len(working_wrappers),
     }
-    if config.enable_replay:
+    if recorder is not None and recorder.valid:
+        log = ActionLog(config.random_seed, len(working_wrappers), goat_index, bytes(recorder.data),
+                        game_result(p1, p2, loser, order_out))
+        result["replay_actions"] = log
+        if config.action_log_path:
+            append_action_log(config.action_log_path, log)
+    if writer is not None:
+        writer.end_game()
+        result["replay_file"] = str(writer.path)
+    elif config.enable_replay:
         result["replay_part1"] = p1.replay
         result["replay_part2"] = p2.replay
-    # Record stats (SingleStore preferred if configured)
-    try:
-        repo = get_ss_repo()
-    except Exception:
-        repo = None
-    if repo:
-        try:
-            repo.record_game(result, seed=config.random_seed, goat_index=goat_index)
-        except Exception:
-            # Fallback to file if DB write fails
-            try:
-                record_game_file(result)
-            except Exception:
-                pass
-    else:
-        try:
-            record_game_file(result)
-        except Exception:
-            pass
+    stats = {k: v for k, v in result.items() if not k.startswith("replay_")}
+    _record_stats(dict(stats, seed=config.random_seed, goat_index=goat_index))
     return result
 
 
+def _record_stats(result: dict):
+    # Written by the background stats writer (SingleStore preferred if configured)
+    get_writer().submit(result)
+
+
+def flush_stats():
+    """Block until stats of every finished game have been written; best effort."""
+    get_writer().flush()
+
+
 def main():  # pragma: no cover
     strategies_dir = Path(__file__).parent.parent / "strategies"
     wrappers = load_strategies(strategies_dir)
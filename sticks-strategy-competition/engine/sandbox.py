@@ -1,8 +1,22 @@
 from __future__ import annotations
+import atexit
+import copy
 import multiprocessing as mp
-from typing import Callable
+import os
+import pickle
+import random
+import threading
+import time
+import weakref
+from dataclasses import is_dataclass, replace
+from typing import Any, Callable
 from .state import TimeoutEngineError, StrategyExecutionError
 
+# Workers receive the live strategy instance at start-up. Forking hands it over without
+# pickling (inline / test-local strategy classes are not importable by a spawned child),
+# so prefer fork wherever the platform offers it.
+MP_CONTEXT = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else mp.get_context()
+
 
 def _invoke(fn, args, kwargs, q):
     try:
@@ -12,9 +26,10 @@ def _invoke(fn, args, kwargs, q):
 
 
 def run_with_timeout(fn: Callable, args=(), kwargs=None, time_limit_ms: int = 50):
-    """Execute fn(*args, **kwargs) in a subprocess with a wall time limit.
+    """Execute fn(*args, **kwargs) in a fresh subprocess with a wall time limit.
 
-    NOTE: Memory limiting & banned import enforcement to be enhanced later.
+    One-shot helper kept for ad-hoc use; the engines go through call_strategy,
+    which reuses a persistent StrategyWorker per strategy.
     """
     if kwargs is None:
         kwargs = {}
@@ -34,3 +49,420 @@ def run_with_timeout(fn: Callable, args=(), kwargs=None, time_limit_ms: int = 50
     if status == "err":
         raise StrategyExecutionError(f"Strategy error: {payload}")
     return payload
+
+
+# Values of these types cannot be mutated in place, so reading them never makes a key a candidate.
+_IMMUTABLE = (int, float, complex, str, bytes, bool, type(None), tuple, frozenset)
+
+BEGIN_GAME = "__begin_game__"
+
+
+class _TrackedMemory(dict):
+    """Strategy memory dict that remembers which top-level keys may have changed.
+
+    Assignments and deletions are tracked exactly. Reading a mutable value
+    (list, dict, set, objects) marks its key as a candidate as well, since the
+    strategy may mutate it in place; the worker then compares the candidate's
+    pickled bytes with what it last sent and only ships real changes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty: set = set()
+
+    def _touch(self, key, value):
+        if not isinstance(value, _IMMUTABLE):
+            self.dirty.add(key)
+        return value
+
+    def __getitem__(self, key):
+        return self._touch(key, super().__getitem__(key))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        self.dirty.add(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.dirty.add(key)
+        super().__delitem__(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        self.dirty.add(key)
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self.dirty.add(key)
+        return key, value
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        self.dirty.update(self.keys())
+        super().clear()
+
+    def values(self):
+        return [v for _, v in self.items()]
+
+    def items(self):
+        return [(k, self._touch(k, v)) for k, v in super().items()]
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):  # ship as a plain dict if a strategy returns or stores it
+        return (dict, (dict(super().items()),))
+
+
+def _encode_memory(memory: dict, keys) -> dict:
+    return {k: pickle.dumps(dict.__getitem__(memory, k), protocol=pickle.HIGHEST_PROTOCOL) for k in keys}
+
+
+def _restore_memory(memory: _TrackedMemory, sent: dict):
+    """Undo a failed call: dirty keys go back to the value the engine last received."""
+    for k in memory.dirty:
+        if k in sent:
+            dict.__setitem__(memory, k, pickle.loads(sent[k]))
+        else:
+            dict.pop(memory, k, None)
+
+
+def _worker_main(instance, conn, seed_memory):
+    """Worker loop: answer (method, state, budget) requests until the engine closes the pipe.
+
+    Strategy memory stays resident here: the same dict is bound to
+    instance.memory and to every state.memory, and each reply carries only the
+    keys whose pickled value differs from the last one sent plus the keys
+    deleted. The last-sent blobs are kept, so a call that fails (strategy
+    error, memory budget, unsendable reply) rolls memory back to what the
+    engine's mirror holds.
+    """
+    memory = _TrackedMemory(getattr(instance, "memory", None) or {})
+    memory.update(seed_memory)
+    initial = pickle.dumps(dict(memory.items()), protocol=pickle.HIGHEST_PROTOCOL)
+    instance.memory = memory
+    sent = _encode_memory(memory, memory.keys())
+    memory.dirty.clear()
+    conn.send(("ready", sent))
+    while True:
+        try:
+            method, state, budget = conn.recv()
+        except (EOFError, OSError):
+            break
+        if method == BEGIN_GAME:
+            if state is not None:
+                random.seed(state)
+            memory.clear()
+            memory.update(pickle.loads(initial))
+            memory.dirty.clear()
+            sent = _encode_memory(memory, memory.keys())
+            conn.send(("ok", None, sent, None))
+            continue
+        if is_dataclass(state) and hasattr(state, "memory"):
+            state = replace(state, memory=memory)
+        try:
+            action = getattr(instance, method)(state)
+            blobs = _encode_memory(memory, [k for k in memory.dirty if k in memory])
+            changed = {k: b for k, b in blobs.items() if sent.get(k) != b}
+            deleted = [k for k in memory.dirty if k not in memory and k in sent]
+            if budget is not None:
+                total = sum(len(b) for k, b in sent.items() if k not in blobs and k not in deleted)
+                if total + sum(len(b) for b in blobs.values()) > budget:
+                    raise MemoryError(f"strategy memory exceeds {budget} bytes")
+            reply = ("ok", action, changed, deleted)
+        except Exception as e:
+            reply = ("err", repr(e))
+        try:
+            conn.send(reply)
+        except Exception as e:  # e.g. unpicklable action object
+            reply = ("err", repr(e))
+            conn.send(reply)
+        if reply[0] == "ok":
+            for k in deleted:
+                del sent[k]
+            sent.update(changed)
+        else:
+            _restore_memory(memory, sent)
+        memory.dirty.clear()
+
+
+# Start-up is not billed to the strategy's decision budget, but a worker that never
+# reports ready is treated like a crash.
+WORKER_START_TIMEOUT_S = 10.0
+
+_live_workers: "weakref.WeakSet[StrategyWorker]" = weakref.WeakSet()
+
+
+class StrategyWorker:
+    """Long-lived sandbox process serving decisions for one strategy instance.
+
+    State views are sent over a pipe and actions come back the same way, so a
+    decision costs a pickle round trip instead of a process spawn. A call that
+    exceeds its wall-clock limit, or a worker that dies, gets the process
+    killed and respawned before the error is raised to the engine.
+
+    Strategy memory lives in the worker; ``memory`` is the engine-side mirror,
+    kept current from per-call deltas and used to re-seed a respawned worker.
+    """
+
+    def __init__(self, instance: Any, memory: dict | None = None):
+        self.instance = instance
+        self.memory = memory if memory is not None else {}
+        self._proc = None
+        self._conn = None
+        self._owner_pid: int | None = None
+
+    def start(self):
+        parent_conn, child_conn = MP_CONTEXT.Pipe()
+        proc = MP_CONTEXT.Process(target=_worker_main, args=(self.instance, child_conn, dict(self.memory)), daemon=True)
+        proc.start()
+        child_conn.close()
+        self._proc = proc
+        self._conn = parent_conn
+        self._owner_pid = os.getpid()
+        _live_workers.add(self)
+        try:
+            reply = parent_conn.recv() if parent_conn.poll(WORKER_START_TIMEOUT_S) else None
+        except (EOFError, OSError):
+            reply = None
+        if reply is None or reply[0] != "ready":
+            self.close()
+            raise StrategyExecutionError("Strategy worker failed to start")
+        self._sync_memory(reply[1], None, full=True)
+
+    def _sync_memory(self, changed: dict, deleted, full: bool = False):
+        if full:
+            self.memory.clear()
+        for k in deleted or ():
+            self.memory.pop(k, None)
+        for k, blob in changed.items():
+            self.memory[k] = pickle.loads(blob)
+
+    def alive(self) -> bool:
+        # A worker inherited through fork belongs to the parent; never talk over its pipe.
+        return self._proc is not None and self._owner_pid == os.getpid() and self._proc.is_alive()
+
+    def close(self):
+        if self._proc is None:
+            return
+        if self._owner_pid == os.getpid():
+            try:
+                self._conn.close()
+            except Exception:  # pragma: no cover - defensive
+                pass
+            if self._proc.is_alive():
+                self._proc.kill()
+            self._proc.join()
+        self._proc = None
+        self._conn = None
+
+    def restart(self):
+        self.close()
+        self.start()
+
+    def call(self, method: str, state: Any, time_limit_ms: int = 50, max_memory_bytes: int | None = None):
+        if not self.alive():
+            self.close()
+            self.start()
+        if getattr(state, "memory", None) is not None:
+            state = replace(state, memory=None)  # the worker binds its resident copy
+        conn = self._conn
+        try:
+            conn.send((method, state, max_memory_bytes))
+            ready = conn.poll(time_limit_ms / 1000.0)
+            reply = conn.recv() if ready else None
+        except (EOFError, OSError):
+            reply = None
+        if reply is None:
+            self.restart()
+            raise TimeoutEngineError("Strategy action timed out or crashed")
+        if reply[0] == "err":
+            raise StrategyExecutionError(f"Strategy error: {reply[1]}")
+        _, action, changed, deleted = reply
+        self._sync_memory(changed, deleted, full=method == BEGIN_GAME)
+        return action
+
+    def begin_game(self, seed: str | None = None):
+        """Restore memory to what the constructor set up and optionally seed ``random``."""
+        if not self.alive():
+            self.close()
+            self.memory.clear()
+            self.start()
+        self.call(BEGIN_GAME, seed, time_limit_ms=int(WORKER_START_TIMEOUT_S * 1000))
+
+
+class InProcessRunner:
+    """Calls a trusted strategy directly in the engine process (isolation="none").
+
+    There is no sandbox: the strategy shares the interpreter and the engine's
+    memory dict (wrapper.memory is bound to instance.memory), and
+    max_memory_bytes is not enforced. The global ``random`` module is swapped
+    to the strategy's own generator state for the duration of each call, so
+    begin_game(seed) and the strategy's draws never disturb the engine's or
+    the tournament's use of ``random``. With soft_time_limit the call is timed
+    with time.perf_counter and an overrun is reported as a TimeoutEngineError
+    once the call returns; it is never interrupted.
+    """
+
+    def __init__(self, instance: Any, memory: dict | None = None, soft_time_limit: bool = False):
+        self.instance = instance
+        self.memory = memory if memory is not None else {}
+        self.soft_time_limit = soft_time_limit
+        self._rng_state = random.Random().getstate()
+        self._initial = copy.deepcopy(dict(getattr(instance, "memory", None) or {}))
+        merged = copy.deepcopy(self._initial)
+        merged.update(self.memory)
+        self.memory.clear()
+        self.memory.update(merged)
+        instance.memory = self.memory
+
+    def _enter_rng(self):
+        outer = random.getstate()
+        random.setstate(self._rng_state)
+        return outer
+
+    def _leave_rng(self, outer):
+        self._rng_state = random.getstate()
+        random.setstate(outer)
+
+    def _invoke(self, method: str, state: Any):
+        try:
+            return getattr(self.instance, method)(state)
+        except Exception as e:
+            raise StrategyExecutionError(f"Strategy error: {e!r}") from e
+
+    def call(self, method: str, state: Any, time_limit_ms: int = 50, max_memory_bytes: int | None = None):
+        start = time.perf_counter()
+        outer = self._enter_rng()
+        try:
+            action = self._invoke(method, state)
+        finally:
+            self._leave_rng(outer)
+        if self.soft_time_limit and (time.perf_counter() - start) * 1000.0 > time_limit_ms:
+            raise TimeoutEngineError("Strategy action exceeded its time budget")
+        return action
+
+    def begin_game(self, seed: str | None = None):
+        """Restore memory to what the constructor set up and optionally seed the strategy's ``random``."""
+        self.memory.clear()
+        self.memory.update(copy.deepcopy(self._initial))
+        self.instance.memory = self.memory
+        if seed is not None:
+            self._rng_state = random.Random(seed).getstate()
+
+    def close(self):
+        pass
+
+
+class ThreadRunner(InProcessRunner):
+    """In-process runner that waits on a helper thread (isolation="thread").
+
+    The wall-clock limit is enforced on the engine side: a call that does not
+    return in time raises TimeoutEngineError. Python threads cannot be killed,
+    so a runaway call keeps running in the background and may still mutate
+    the strategy's memory or draw from the global ``random``. The runner is
+    therefore dead after a timeout: every later call raises
+    StrategyExecutionError, and begin_game revives it only once the runaway
+    call has finished. Use "process" for untrusted code.
+    """
+
+    def __init__(self, instance: Any, memory: dict | None = None, soft_time_limit: bool = False):
+        super().__init__(instance, memory, soft_time_limit)
+        self._runaway: threading.Thread | None = None
+
+    def call(self, method: str, state: Any, time_limit_ms: int = 50, max_memory_bytes: int | None = None):
+        if self._runaway is not None:
+            raise StrategyExecutionError("Strategy is dead: an earlier call timed out and may still be running")
+        box: list = []
+
+        def target():
+            try:
+                box.append(("ok", self._invoke(method, state)))
+            except StrategyExecutionError as e:
+                box.append(("err", e))
+
+        thread = threading.Thread(target=target, name=f"strategy-{method}", daemon=True)
+        outer = self._enter_rng()
+        thread.start()
+        thread.join(time_limit_ms / 1000.0)
+        if not box:
+            random.setstate(outer)
+            self._runaway = thread
+            raise TimeoutEngineError("Strategy action timed out or crashed")
+        self._leave_rng(outer)
+        status, payload = box[0]
+        if status == "err":
+            raise payload
+        return payload
+
+    def begin_game(self, seed: str | None = None):
+        if self._runaway is not None:
+            if self._runaway.is_alive():
+                raise StrategyExecutionError("Strategy is dead: a timed-out call is still running")
+            self._runaway = None
+        super().begin_game(seed)
+
+
+ISOLATION_MODES = ("process", "thread", "none")
+
+
+def _worker_for(wrapper, isolation: str = "process", soft_time_limit: bool = False):
+    if isolation == "process":
+        kind = StrategyWorker
+    elif isolation == "thread":
+        kind = ThreadRunner
+    elif isolation == "none":
+        kind = InProcessRunner
+    else:
+        raise ValueError(f"Unknown isolation mode {isolation!r}; expected one of {ISOLATION_MODES}")
+    worker = wrapper.worker
+    if type(worker) is not kind:
+        if worker is not None:
+            worker.close()
+        if kind is StrategyWorker:
+            worker = StrategyWorker(wrapper.instance, wrapper.memory)
+        else:
+            worker = kind(wrapper.instance, wrapper.memory, soft_time_limit)
+        wrapper.worker = worker
+    elif kind is not StrategyWorker:
+        worker.soft_time_limit = soft_time_limit
+    return worker
+
+
+def call_strategy(wrapper, method: str, state: Any, time_limit_ms: int = 50, max_memory_bytes: int | None = None,
+                  isolation: str = "process", soft_time_limit: bool = False):
+    """Invoke wrapper.instance.<method>(state) under the requested isolation.
+
+    "process" (default) uses the wrapper's sandbox worker, "thread" and "none"
+    call the strategy in this process (trusted strategies only, see
+    InProcessRunner). wrapper.memory is kept in sync with the strategy's memory.
+    """
+    return _worker_for(wrapper, isolation, soft_time_limit).call(method, state, time_limit_ms, max_memory_bytes)
+
+
+def begin_game(wrapper, seed: str | None = None, isolation: str = "process", soft_time_limit: bool = False):
+    """Start a new game: drop memory from previous games and, when seed is given,
+    reseed the strategy's ``random`` so its choices are reproducible (the worker's
+    global module, or the in-process runner's own generator state)."""
+    _worker_for(wrapper, isolation, soft_time_limit).begin_game(seed)
+
+
+def shutdown_workers():
+    for worker in list(_live_workers):
+        worker.close()
+
+
+atexit.register(shutdown_workers)
@@ -10,19 +10,27 @@ Connection pattern strictly follows the requested format:
         with conn.cursor() as cur:
             cur.is_connected()
 
-We open short‑lived connections per operation (record / fetch) to keep it
-simple and resilient. If the environment variable SINGLESTORE_URI is missing
-or a connection fails, caller gets None and higher layers will fall back to
-file based stats.
+Connections come from a small per-process ConnectionPool instead of being
+opened per operation; a pooled connection is health-checked before reuse and
+replaced when it has gone away. get_repo() caches the repo for the process, so
+the .env lookup, probe query and schema check happen once rather than per game.
+If the environment variable SINGLESTORE_URI is missing or a connection fails,
+caller gets None and higher layers will fall back to file based stats.
 """
 
 import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 import json
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 
 import singlestoredb as s2
+
+from .leaderboard import leaderboard_row, sort_leaderboard
+
 try:  # Attempt early .env load (best effort). We keep very quiet here.
     from dotenv import load_dotenv  # type: ignore
     load_dotenv(dotenv_path=Path(__file__).resolve().parents[2] / '.env', override=False)
@@ -57,10 +65,264 @@ SCHEMA_AGG = (
     "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
     ") ENGINE=ColumnStore;"
 )
+# Same counters split by player count; the primary key serves the segmented
+# leaderboard directly, so the dashboard never scans game_records.
+# Rebuilt from game_records once per database (see _backfill_segments).
+SCHEMA_AGG_BY_PC = (
+    "CREATE TABLE IF NOT EXISTS aggregated_stats_by_player_count ("
+    "player_count INT NOT NULL,"
+    "strategy VARCHAR(128) NOT NULL,"
+    "games BIGINT NOT NULL DEFAULT 0,"
+    "losses BIGINT NOT NULL DEFAULT 0,"
+    "positions_sum BIGINT NOT NULL DEFAULT 0,"
+    "wars DOUBLE NOT NULL DEFAULT 0,"
+    "kills DOUBLE NOT NULL DEFAULT 0,"
+    "eats DOUBLE NOT NULL DEFAULT 0,"
+    "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,"
+    "PRIMARY KEY (player_count, strategy)"
+    ") ENGINE=ColumnStore;"
+)
+# One row per one-off data migration that has run (or is running) on this database.
+SCHEMA_BACKFILLS = (
+    "CREATE TABLE IF NOT EXISTS stats_backfills ("
+    "name VARCHAR(64) PRIMARY KEY,"
+    "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+    ") ENGINE=ColumnStore;"
+)
+_UPSERT_COUNTERS = (
+    " ON DUPLICATE KEY UPDATE "
+    "games=games+VALUES(games), losses=losses+VALUES(losses), positions_sum=positions_sum+VALUES(positions_sum), "
+    "wars=wars+VALUES(wars), kills=kills+VALUES(kills), eats=eats+VALUES(eats)"
+)
+
+POOL_SIZE = int(os.getenv('SKIT_DB_POOL_SIZE', '4'))
+POOL_TIMEOUT_S = 10.0
+HEALTH_CHECK_IDLE_S = 30.0  # ping connections that sat idle longer than this before reuse
+REPO_RETRY_S = 60.0  # how long get_repo() remembers that the database was unavailable
+
+# Errors after which a connection cannot be trusted any more.
+_CONNECTION_ERRORS = (s2.OperationalError, s2.InterfaceError, OSError)
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections for one process.
+
+    At most max_size connections exist at a time; callers beyond that wait up
+    to timeout seconds. Idle connections are health-checked (is_connected())
+    before reuse once they have been idle for HEALTH_CHECK_IDLE_S, and a
+    connection that raised a connection-level error is closed instead of
+    being returned. A forked child never reuses the parent's sockets.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT_S):
+        self._connect = connect
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        self._idle: list[tuple[Any, float]] = []
+        self._open = 0
+        self._pid = os.getpid()
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            # Inherited sockets belong to the parent; drop them without closing
+            # (closing would end the parent's sessions).
+            self._cond = threading.Condition()
+            self._reset()
+
+    @staticmethod
+    def _healthy(conn) -> bool:
+        try:
+            return bool(conn.is_connected())
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def acquire(self):
+        self._check_pid()
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while not self._idle and self._open >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("no database connection available")
+                self._cond.wait(remaining)
+            if self._idle:
+                conn, since = self._idle.pop()
+            else:
+                conn, since = None, 0.0
+                self._open += 1
+        if conn is not None:
+            if time.monotonic() - since < HEALTH_CHECK_IDLE_S or self._healthy(conn):
+                return conn
+            try:  # stale: reconnect in the same slot
+                conn.close()
+            except Exception:
+                pass
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, broken: bool = False):
+        if self._pid != os.getpid():
+            return
+        if broken:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success and rolls back on error."""
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except _CONNECTION_ERRORS:
+            self.release(conn, broken=True)
+            raise
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                self.release(conn, broken=True)
+                raise
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def run(self, fn: Callable[[Any], Any], retry: bool = False):
+        """Call fn(conn) on a pooled connection.
+
+        With retry, a connection-level failure is retried once on a fresh
+        connection (only safe for reads and idempotent statements).
+        """
+        try:
+            with self.connection() as conn:
+                return fn(conn)
+        except _CONNECTION_ERRORS:
+            if not retry:
+                raise
+        with self.connection() as conn:
+            return fn(conn)
+
+    def close(self):
+        self._check_pid()
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+BATCH_ROWS = 500  # rows per multi-row INSERT statement
+
+
+def _leaderboard(rows) -> list[dict]:
+    return sort_leaderboard([leaderboard_row(*row) for row in rows])
+
+
+def _chunks(rows: list) -> list:
+    return [rows[i:i + BATCH_ROWS] for i in range(0, len(rows), BATCH_ROWS)]
+
+
+def _segment_deltas(games) -> Dict[tuple, list]:
+    """Sum per-(player_count, strategy) counters over (player_count, order, wars, kills, eats) tuples.
+
+    order lists every player, the loser last.
+    """
+    seg_deltas: Dict[tuple, list] = {}
+    for pc, order, wars, kills, eats in games:
+        n = len(order)
+        for pos, name in enumerate(order):
+            d = seg_deltas.setdefault((pc, name), [0, 0, 0, 0.0, 0.0, 0.0])
+            d[0] += 1
+            d[1] += 1 if pos == n - 1 else 0
+            d[2] += pos
+            d[3] += wars / n
+            d[4] += kills / n
+            d[5] += eats / n
+    return seg_deltas
+
+
+def _upsert_segments(cur, seg_rows: list):
+    for chunk in _chunks(seg_rows):
+        cur.execute(
+            "INSERT INTO aggregated_stats_by_player_count"
+            "(player_count,strategy,games,losses,positions_sum,wars,kills,eats) VALUES "
+            + ",".join(["(%s,%s,%s,%s,%s,%s,%s,%s)"] * len(chunk)) + _UPSERT_COUNTERS,
+            [v for row in chunk for v in row]
+        )
+
+
+_SEATS = 17  # most players a deal supports: 3 cards each plus the set-aside card
+_SEAT_NUMBERS = " UNION ALL ".join(f"SELECT {i} AS i" for i in range(_SEATS))
+# Recomputes the per-player-count counters from game_records in one statement
+# (player count = JSON_LENGTH(order_out)+1, the loser finishing last).
+_BACKFILL_SEGMENTS = (
+    "INSERT INTO aggregated_stats_by_player_count"
+    "(player_count,strategy,games,losses,positions_sum,wars,kills,eats) "
+    "SELECT pc, strategy, COUNT(*), SUM(lost), SUM(pos), SUM(wars/pc), SUM(kills/pc), SUM(eats/pc) FROM ("
+    "SELECT JSON_LENGTH(g.order_out)+1 AS pc, JSON_EXTRACT_STRING(g.order_out, n.i) AS strategy, n.i AS pos, "
+    "0 AS lost, g.wars, g.kills, g.eats "
+    f"FROM game_records g JOIN ({_SEAT_NUMBERS}) n ON n.i < JSON_LENGTH(g.order_out) "
+    "UNION ALL "
+    "SELECT JSON_LENGTH(order_out)+1, loser, JSON_LENGTH(order_out), 1, wars, kills, eats FROM game_records"
+    ") t GROUP BY pc, strategy"
+)
+
+
+def _backfill_segments(cur):
+    """Rebuild aggregated_stats_by_player_count from game_records, once per database.
+
+    The table arrived after game_records and aggregated_stats, so on an
+    existing deployment it starts out missing games the overall leaderboard
+    counts. The claim row in stats_backfills serialises upgrading processes
+    (a concurrent INSERT IGNORE waits for the first transaction and then
+    inserts nothing), and the rebuild replaces the table in the same
+    transaction from a single INSERT ... SELECT, so a game recorded
+    concurrently is counted either by that snapshot or by its own upsert,
+    never by both.
+    """
+    cur.execute("INSERT IGNORE INTO stats_backfills(name) VALUES (%s)", ("aggregated_stats_by_player_count",))
+    if not cur.rowcount:
+        return
+    cur.execute("DELETE FROM aggregated_stats_by_player_count")
+    cur.execute(_BACKFILL_SEGMENTS)
+    log.info("Rebuilt aggregated_stats_by_player_count from game_records")
+
+
+# URIs whose schema has been ensured in this process.
+_schema_ready: set[str] = set()
+
 
 class SingleStoreStatsRepo:
-    def __init__(self, uri: str):
+    source = "db"  # StatsBackend tag
+
+    def __init__(self, uri: str, pool_size: int = POOL_SIZE):
         self.uri = self._normalize_uri(uri)
+        self._pool = ConnectionPool(self._connect, max_size=pool_size)
         self._ensure_schema()
 
     def _connect(self):
@@ -71,67 +333,122 @@ class SingleStoreStatsRepo:
         return uri.strip()
 
     def _ensure_schema(self):
+        if self.uri in _schema_ready:
+            return
+        def create(conn):
+            with conn.cursor() as cur:
+                cur.execute(SCHEMA_GAME)
+                cur.execute(SCHEMA_AGG)
+                cur.execute(SCHEMA_AGG_BY_PC)
+                cur.execute(SCHEMA_BACKFILLS)
+        def backfill(conn):
+            with conn.cursor() as cur:
+                _backfill_segments(cur)
         try:
-            with self._connect() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(SCHEMA_GAME)
-                    cur.execute(SCHEMA_AGG)
+            self._pool.run(create, retry=True)
+            self._pool.run(backfill)  # one transaction: claim row, DELETE, INSERT ... SELECT
         except Exception as e:  # pragma: no cover
             log.warning("Failed ensuring SingleStore schema: %s", e)
             raise
+        _schema_ready.add(self.uri)
 
-    def record_game(self, result: dict, seed: int | None, goat_index: int):
-        order_json = json.dumps(result['order_out'])
-        try:
-            with self._connect() as conn:
-                with conn.cursor() as cur:
-                    # game record
+    def close(self):
+        self._pool.close()
+
+    def record_game(self, result: dict, seed: int | None = None, goat_index: int | None = None):
+        if seed is not None:
+            result = dict(result, seed=seed)
+        if goat_index is not None:
+            result = dict(result, goat_index=goat_index)
+        self.record_games([result])
+
+    def record_games(self, results: list[dict]):
+        """Write a batch of run_single_game results in one transaction.
+
+        Game rows go in as multi-row INSERTs (BATCH_ROWS rows per statement) and
+        per-strategy deltas are summed client-side into one multi-row upsert
+        per aggregate table (overall and per player count), so a batch costs a
+        handful of statements instead of 1 + players per game.
+        Each result may carry 'seed' and 'goat_index' (defaults None / 0).
+        """
+        if not results:
+            return
+        rows = [
+            (r.get('seed'), r.get('goat_index', 0), r['loser'], r['wars'], r['kills'], r['eats'], r.get('trump'),
+             json.dumps(r['order_out']))
+            for r in results
+        ]
+        seg_deltas = _segment_deltas(
+            (r.get('player_count', len(r['order_out']) + 1), r['order_out'] + [r['loser']], r['wars'], r['kills'],
+             r['eats'])
+            for r in results
+        )
+        deltas: Dict[str, list] = {}
+        for (_, name), d in seg_deltas.items():
+            total = deltas.setdefault(name, [0, 0, 0, 0.0, 0.0, 0.0])
+            for i, v in enumerate(d):
+                total[i] += v
+        agg_rows = [(name, *d) for name, d in sorted(deltas.items())]
+        seg_rows = [(pc, name, *d) for (pc, name), d in sorted(seg_deltas.items())]
+        def write(conn):
+            with conn.cursor() as cur:
+                for chunk in _chunks(rows):
+                    cur.execute(
+                        "INSERT INTO game_records(seed, goat_index, loser, wars, kills, eats, trump, order_out) VALUES "
+                        + ",".join(["(%s,%s,%s,%s,%s,%s,%s,%s)"] * len(chunk)),
+                        [v for row in chunk for v in row]
+                    )
+                for chunk in _chunks(agg_rows):
                     cur.execute(
-                        "INSERT INTO game_records(seed, goat_index, loser, wars, kills, eats, trump, order_out) "
-                        "VALUES (%s,%s,%s,%s,%s,%s,%s,%s)",
-                        (seed, goat_index, result['loser'], result['wars'], result['kills'], result['eats'], result['trump'], order_json)
+                        "INSERT INTO aggregated_stats(strategy,games,losses,positions_sum,wars,kills,eats) VALUES "
+                        + ",".join(["(%s,%s,%s,%s,%s,%s,%s)"] * len(chunk)) + _UPSERT_COUNTERS,
+                        [v for row in chunk for v in row]
                     )
-                    # aggregation
-                    order = result['order_out'] + [result['loser']]
-                    wars = result['wars']; kills = result['kills']; eats = result['eats']; n = len(order)
-                    for pos, name in enumerate(order):
-                        cur.execute(
-                            "INSERT INTO aggregated_stats(strategy,games,losses,positions_sum,wars,kills,eats) "
-                            "VALUES(%s,1,%s,%s,%s,%s,%s) "
-                            "ON DUPLICATE KEY UPDATE "
-                            "games=games+1, losses=losses+VALUES(losses), positions_sum=positions_sum+VALUES(positions_sum), "
-                            "wars=wars+VALUES(wars), kills=kills+VALUES(kills), eats=eats+VALUES(eats)",
-                            (name, 1 if pos == n-1 else 0, pos, wars / n, kills / n, eats / n)
-                        )
-                # context manager commits automatically
+                _upsert_segments(cur, seg_rows)
+        try:
+            self._pool.run(write)  # committed when the connection is released
         except Exception as e:  # pragma: no cover
-            log.warning("Failed recording game to SingleStore: %s", e)
+            log.warning("Failed recording %d game(s) to SingleStore: %s", len(results), e)
             raise
 
     def fetch_leaderboard(self) -> list[dict]:
+        def read(conn):
+            with conn.cursor() as cur:
+                cur.execute("SELECT strategy,games,losses,positions_sum,wars,kills,eats FROM aggregated_stats")
+                return cur.fetchall()
         try:
-            with self._connect() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT strategy,games,losses,positions_sum,wars,kills,eats FROM aggregated_stats")
-                    rows = cur.fetchall()
+            rows = self._pool.run(read, retry=True)
         except Exception as e:  # pragma: no cover
             log.warning("Failed fetching leaderboard from SingleStore: %s", e)
             return []
-        lb: list[dict] = []
-        for (strategy, games, losses, pos_sum, wars, kills, eats) in rows:
-            games = games or 1
-            lb.append({
-                'strategy': strategy,
-                'games': games,
-                'losses': losses,
-                'loss_rate': losses / games,
-                'avg_finish_position': pos_sum / games,
-                'avg_wars': wars / games,
-                'avg_kills': kills / games,
-                'avg_eats': eats / games,
-            })
-        lb.sort(key=lambda x: (x['loss_rate'], x['avg_finish_position']))
-        return lb
+        return _leaderboard(rows)
+
+    def fetch_segmented_leaderboards(self) -> dict:
+        """Leaderboards per player count ('p3', 'p4', ...) from one primary-key ordered read."""
+        def read(conn):
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT player_count,strategy,games,losses,positions_sum,wars,kills,eats "
+                    "FROM aggregated_stats_by_player_count ORDER BY player_count"
+                )
+                return cur.fetchall()
+        try:
+            rows = self._pool.run(read, retry=True)
+        except Exception as e:  # pragma: no cover
+            log.warning("Failed fetching segmented leaderboards from SingleStore: %s", e)
+            return {}
+        by_pc: Dict[str, list] = {}
+        for (pc, *row) in rows:
+            by_pc.setdefault(f"p{pc}", []).append(row)
+        return {bucket: _leaderboard(bucket_rows) for bucket, bucket_rows in by_pc.items()}
+
+    def stats_version(self):
+        """Newest game id; every recorded batch moves it along with the aggregates."""
+        def read(conn):
+            with conn.cursor() as cur:
+                cur.execute("SELECT MAX(id) FROM game_records")
+                return cur.fetchone()[0]
+        return self._pool.run(read, retry=True)
 
     def fetch_recent_games(self, limit: int = 20) -> list[dict]:
         """Return a list of recent games (most recent first).
@@ -139,14 +456,15 @@ class SingleStoreStatsRepo:
         Includes: id, created_at, seed, goat_index, wars, kills, eats, trump,
         players (ordered list of all players, last element is loser), loser.
         """
+        def read(conn):
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT id, seed, goat_index, loser, wars, kills, eats, trump, order_out, created_at "
+                    "FROM game_records ORDER BY id DESC LIMIT %s", (limit,)
+                )
+                return cur.fetchall()
         try:
-            with self._connect() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT id, seed, goat_index, loser, wars, kills, eats, trump, order_out, created_at "
-                        "FROM game_records ORDER BY id DESC LIMIT %s", (limit,)
-                    )
-                    rows = cur.fetchall()
+            rows = self._pool.run(read, retry=True)
         except Exception as e:  # pragma: no cover
             log.warning("Failed fetching recent games from SingleStore: %s", e)
             return []
@@ -171,7 +489,8 @@ class SingleStoreStatsRepo:
             })
         return recent
 
-def get_repo() -> SingleStoreStatsRepo | None:
+def _resolve_uri() -> str | None:
+    """SINGLESTORE_URI from the environment or a nearby .env, scheme added if missing."""
     uri = os.getenv("SINGLESTORE_URI")
     if not uri and os.getenv('SKIT_AUTO_LOAD_DOTENV','1') == '1':
         # Secondary attempt: manually search upward for a .env and parse SINGLESTORE_URI
@@ -211,14 +530,58 @@ def get_repo() -> SingleStoreStatsRepo | None:
         # print('[singlestore_repo] Warning: SINGLESTORE_URI missing scheme, prepending singlestoredb://')
         uri = 'singlestoredb://' + uri
     uri = uri.strip()
+    return uri
+
+
+_repo_cache: dict = {}
+_repo_lock = threading.Lock()
+
+
+def get_repo() -> SingleStoreStatsRepo | None:
+    """Process-wide repo, created on first use.
+
+    The URI lookup, probe query and schema check run once per process; a
+    failed attempt is remembered for REPO_RETRY_S so callers on the hot path
+    (one call per game) fall back to file stats without retrying every time.
+    """
+    with _repo_lock:
+        cached = _repo_cache.get('entry')
+        if cached is not None:
+            repo, at = cached
+            # the pool itself reconnects in forked children and after failures
+            if repo is not None or time.monotonic() - at < REPO_RETRY_S:
+                return repo
+        repo = _open_repo()
+        _repo_cache['entry'] = (repo, time.monotonic())
+        return repo
+
+
+def _open_repo() -> SingleStoreStatsRepo | None:
+    uri = _resolve_uri()
+    if not uri:
+        return None
     try:
-        with s2.connect(uri) as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-                cur.fetchone()
-        return SingleStoreStatsRepo(uri)
+        repo = SingleStoreStatsRepo(uri)
+        repo._pool.run(_probe, retry=True)
+        return repo
     except Exception as e:  # pragma: no cover
         log.warning("SingleStore repo unavailable: %s", e)
         return None
 
-__all__ = ["get_repo", "SingleStoreStatsRepo"]
+
+def _probe(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1")
+        cur.fetchone()
+
+
+def reset_repo_cache():
+    """Forget the cached repo (e.g. after changing SINGLESTORE_URI)."""
+    with _repo_lock:
+        entry = _repo_cache.pop('entry', None)
+    if entry and entry[0] is not None:
+        entry[0].close()
+    _schema_ready.clear()
+
+
+__all__ = ["get_repo", "reset_repo_cache", "SingleStoreStatsRepo", "ConnectionPool"]
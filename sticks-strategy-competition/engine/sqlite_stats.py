@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+"""Embedded SQLite stats backend.
+
+Game rows live in an indexed ``game_records`` table and per-strategy counters
+in ``aggregated_stats`` keyed by (strategy, player_count); every batch
+updates both in one transaction, so leaderboards never rescan games. The
+database runs in WAL mode, so readers (the dashboard) do not block the
+writer. Concurrent writer processes wait on SQLite's own lock (busy_timeout).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+from .leaderboard import leaderboard_row, sort_leaderboard
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS game_records ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " seed INTEGER NULL,"
+    " goat_index INTEGER NOT NULL,"
+    " loser TEXT NOT NULL,"
+    " wars INTEGER NOT NULL,"
+    " kills INTEGER NOT NULL,"
+    " eats INTEGER NOT NULL,"
+    " trump TEXT NULL,"
+    " order_out TEXT NOT NULL,"
+    " player_count INTEGER NOT NULL,"
+    " created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP"
+    ")",
+    "CREATE INDEX IF NOT EXISTS idx_game_records_loser ON game_records(loser)",
+    "CREATE INDEX IF NOT EXISTS idx_game_records_player_count ON game_records(player_count, id)",
+    "CREATE TABLE IF NOT EXISTS aggregated_stats ("
+    " strategy TEXT NOT NULL,"
+    " player_count INTEGER NOT NULL,"
+    " games INTEGER NOT NULL DEFAULT 0,"
+    " losses INTEGER NOT NULL DEFAULT 0,"
+    " positions_sum INTEGER NOT NULL DEFAULT 0,"
+    " wars REAL NOT NULL DEFAULT 0,"
+    " kills REAL NOT NULL DEFAULT 0,"
+    " eats REAL NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (strategy, player_count)"
+    ") WITHOUT ROWID",
+)
+
+BUSY_TIMEOUT_MS = 10_000
+
+
+class SQLiteStatsBackend:
+    source = "sqlite"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        with conn:
+            for stmt in SCHEMA:
+                conn.execute(stmt)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and process; sqlite3 connections must not cross either.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def record_game(self, result: dict) -> None:
+        self.record_games([result])
+
+    def record_games(self, results: List[dict]) -> None:
+        if not results:
+            return
+        rows = []
+        deltas: Dict[tuple, list] = {}
+        for r in results:
+            order = r['order_out'] + [r['loser']]
+            n = len(order)
+            pc = r.get('player_count', n)
+            rows.append((r.get('seed'), r.get('goat_index', 0), r['loser'], r['wars'], r['kills'], r['eats'],
+                         r.get('trump'), json.dumps(r['order_out']), pc))
+            for pos, name in enumerate(order):
+                d = deltas.setdefault((name, pc), [0, 0, 0, 0.0, 0.0, 0.0])
+                d[0] += 1
+                d[1] += 1 if pos == n - 1 else 0
+                d[2] += pos
+                d[3] += r['wars'] / n
+                d[4] += r['kills'] / n
+                d[5] += r['eats'] / n
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO game_records(seed, goat_index, loser, wars, kills, eats, trump, order_out, player_count) "
+                "VALUES (?,?,?,?,?,?,?,?,?)", rows)
+            conn.executemany(
+                "INSERT INTO aggregated_stats(strategy, player_count, games, losses, positions_sum, wars, kills, eats) "
+                "VALUES (?,?,?,?,?,?,?,?) "
+                "ON CONFLICT(strategy, player_count) DO UPDATE SET "
+                "games=games+excluded.games, losses=losses+excluded.losses, "
+                "positions_sum=positions_sum+excluded.positions_sum, wars=wars+excluded.wars, "
+                "kills=kills+excluded.kills, eats=eats+excluded.eats",
+                [(name, pc, *d) for (name, pc), d in deltas.items()])
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def fetch_leaderboard(self) -> List[dict]:
+        rows = self._conn().execute(
+            "SELECT strategy, SUM(games), SUM(losses), SUM(positions_sum), SUM(wars), SUM(kills), SUM(eats) "
+            "FROM aggregated_stats GROUP BY strategy").fetchall()
+        return sort_leaderboard([leaderboard_row(*row) for row in rows])
+
+    def fetch_segmented_leaderboards(self) -> Dict[str, List[dict]]:
+        out: Dict[str, List[dict]] = {}
+        for pc, *row in self._conn().execute(
+                "SELECT player_count, strategy, games, losses, positions_sum, wars, kills, eats FROM aggregated_stats"):
+            out.setdefault(f"p{pc}", []).append(leaderboard_row(*row))
+        for rows in out.values():
+            sort_leaderboard(rows)
+        return out
+
+    def stats_version(self):
+        # every batch inserts game rows, so the newest id moves with the aggregates
+        return self._conn().execute("SELECT MAX(id) FROM game_records").fetchone()[0]
+
+    def fetch_recent_games(self, limit: int = 20) -> List[dict]:
+        recent = []
+        for (gid, seed, goat_idx, loser, wars, kills, eats, trump, order_json, created_at) in self._conn().execute(
+                "SELECT id, seed, goat_index, loser, wars, kills, eats, trump, order_out, created_at "
+                "FROM game_records ORDER BY id DESC LIMIT ?", (limit,)):
+            recent.append({
+                'id': gid,
+                'seed': seed,
+                'goat_index': goat_idx,
+                'loser': loser,
+                'wars': wars,
+                'kills': kills,
+                'eats': eats,
+                'trump': trump,
+                'players': json.loads(order_json) + [loser],
+                'created_at': created_at,
+            })
+        return recent
+
+
+__all__ = ["SQLiteStatsBackend"]
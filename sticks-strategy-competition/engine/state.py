@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from collections.abc import Mapping
+from typing import List, Dict, Any, Sequence, Tuple
 from .cards import Card, Suit
 
 
@@ -22,34 +23,82 @@ class IllegalActionError(EngineError):
     pass
 
 
-@dataclass
+@dataclass(frozen=True)
 class TrickPlay:
     player_index: int
     card: Card
     sequence: float  # order; sloughs can use fractional values
 
 
-@dataclass
+class TablePlay(Mapping):
+    """Immutable Part 2 table play, read like the dict it replaces:
+    ``play["player_index"]``, ``play["cards"]`` (a tuple), or as attributes."""
+
+    __slots__ = ("player_index", "cards")
+    _KEYS = ("player_index", "cards")
+
+    def __init__(self, player_index: int, cards: Sequence[Card]):
+        object.__setattr__(self, "player_index", player_index)
+        object.__setattr__(self, "cards", tuple(cards))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TablePlay is read-only")
+
+    def __getitem__(self, key):
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return 2
+
+    def copy(self) -> dict:
+        return {"player_index": self.player_index, "cards": list(self.cards)}
+
+    def __reduce__(self):
+        return (TablePlay, (self.player_index, self.cards))
+
+    def __repr__(self):
+        return f"TablePlay(player_index={self.player_index}, cards={self.cards!r})"
+
+
+# State views are immutable snapshots. Sequence fields are tuples that the engine
+# builds once per step and shares between players; never mutate them.
+
+@dataclass(frozen=True)
 class Part1StateView:
-    hand: List[Card]
+    hand: Tuple[Card, ...]
     deck_remaining: int
-    current_trick_plays: List[TrickPlay]
+    current_trick_plays: Tuple[TrickPlay, ...]
     have_played_this_trick: bool
-    allowed_slough_indices: List[int]
-    players_card_counts: List[int]
-    collected_counts: List[int]
+    allowed_slough_indices: Tuple[int, ...]
+    players_card_counts: Tuple[int, ...]
+    collected_counts: Tuple[int, ...]
     war_active: bool
     memory: Dict[str, Any]
+    player_index: int = -1  # seat of the player being asked
+    # Public card knowledge plus this player's hand (engine.knowledge.CardKnowledge)
+    knowledge: Any = None
 
 
-@dataclass
+@dataclass(frozen=True)
 class Part2StateView:
-    hand: List[Card]
+    hand: Tuple[Card, ...]
     trump: Suit
-    table_plays: List[dict]  # list of {player_index, cards}
-    player_out: List[bool]
-    player_hand_counts: List[int]
+    table_plays: Tuple[TablePlay, ...]  # play order; each reads like {player_index, cards}
+    player_out: Tuple[bool, ...]
+    player_hand_counts: Tuple[int, ...]
     memory: Dict[str, Any]
+    # Read-only bitmask index of `hand` (engine.hand_index.HandIndex); hand is sorted by card id
+    hand_index: Any = None
+    # (is_trump, top part2 value, run length) of the play to beat; None when the table is empty
+    highest_strength: tuple | None = None
+    player_index: int = -1  # seat of the player being asked
+    # Public card knowledge plus this player's hand (engine.knowledge.CardKnowledge)
+    knowledge: Any = None
 
 
 @dataclass
@@ -61,8 +110,23 @@ class GameConfig:
     enable_replay: bool = True
     # optional cap on stored events to prevent unbounded memory in pathological games
     max_replay_events: int = 10000
+    # Stream replays to this file in the compact binary format (engine.replay_format)
+    # instead of returning event lists; no event cap applies then
+    replay_path: str | None = None
+    # Position of the game in a tournament, tagged on streamed replays
+    game_number: int | None = None
+    # Record the seed plus every strategy answer (engine.action_log) as result["replay_actions"],
+    # appending it to action_log_path when set; unseeded games get a random seed so they can be replayed
+    record_actions: bool = False
+    action_log_path: str | None = None
     # Optional maximum players per game (if wrappers list larger, a subset will be sampled)
     max_players_per_game: int | None = None
+    # How strategies are called: "process" (sandbox worker, default), "thread" or
+    # "none" (direct in-process calls; trusted strategies only, see engine/sandbox.py)
+    isolation: str = "process"
+    # With isolation="none", time each call with perf_counter and treat an overrun of
+    # time_limit_ms as a timeout once the call returns
+    soft_time_limit: bool = False
 
 
 @dataclass
@@ -80,6 +144,8 @@ class StrategyWrapper:
     module_name: str
     instance: Any
     memory: Dict[str, Any] = field(default_factory=dict)
+    # Persistent sandbox worker (engine.sandbox.StrategyWorker), started on first call
+    worker: Any = field(default=None, repr=False, compare=False)
 
 
 @dataclass
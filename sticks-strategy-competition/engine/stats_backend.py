@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+"""Pluggable stats storage.
+
+Everything that records or reads game statistics goes through a StatsBackend:
+the background stats writer (run_single_game) and the dashboard's stats
+service. Three implementations exist:
+
+  file        -- engine.file_stats (JSON snapshot + append-only game log)
+  sqlite      -- engine.sqlite_stats.SQLiteStatsBackend, an embedded database
+  singlestore -- engine.singlestore_repo.SingleStoreStatsRepo
+
+get_backend() picks one from SKIT_STATS_BACKEND ("auto", "file", "sqlite",
+"singlestore"). "auto" (the default) keeps the historical routing: SingleStore
+when SINGLESTORE_URI is configured and reachable, otherwise the file store.
+An explicit "singlestore" falls back to the file store too, but logs a
+warning; any other value raises ValueError.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, runtime_checkable
+
+from . import file_stats
+from .leaderboard import leaderboard_row, sort_leaderboard
+from .paths import data_dir
+from .singlestore_repo import REPO_RETRY_S, get_repo as get_ss_repo
+
+log = logging.getLogger(__name__)
+
+BACKEND_KINDS = ("auto", "file", "sqlite", "singlestore")
+
+
+@runtime_checkable
+class StatsBackend(Protocol):
+    # Short tag reported to the dashboard ("file", "sqlite", "db")
+    source: str
+
+    def record_game(self, result: dict) -> None:
+        """Record one run_single_game result (may carry 'seed' and 'goat_index')."""
+
+    def record_games(self, results: List[dict]) -> None:
+        """Record a batch of results; backends write it as one unit where they can."""
+
+    def fetch_leaderboard(self) -> List[dict]:
+        """Rows sorted by (loss_rate, avg_finish_position); see leaderboard_row."""
+
+    def fetch_segmented_leaderboards(self) -> Dict[str, List[dict]]:
+        """Leaderboards per player count, keyed 'p3', 'p4', ..."""
+
+    def fetch_recent_games(self, limit: int = 20) -> List[dict]:
+        """Most recent games first (empty when the backend keeps no game records)."""
+
+    def stats_version(self) -> Any:
+        """Cheap value that changes whenever recorded stats change (used by caches)."""
+
+
+class FileStatsBackend:
+    """Adapter over the module-level functions in engine.file_stats."""
+
+    source = "file"
+
+    def record_game(self, result: dict) -> None:
+        file_stats.record_game(result)
+
+    def record_games(self, results: List[dict]) -> None:
+        for result in results:
+            file_stats.record_game(result)
+
+    def fetch_leaderboard(self) -> List[dict]:
+        return file_stats.load_leaderboard()
+
+    def fetch_segmented_leaderboards(self) -> Dict[str, List[dict]]:
+        return file_stats.load_segmented_leaderboards()
+
+    def fetch_recent_games(self, limit: int = 20) -> List[dict]:
+        return []
+
+    def stats_version(self) -> Any:
+        return file_stats.stats_version()
+
+
+FILE_BACKEND = FileStatsBackend()
+
+_sqlite_backends: dict = {}
+_sqlite_lock = threading.Lock()
+
+
+def _default_sqlite_path() -> Path:
+    return data_dir() / 'stats' / 'stats.sqlite3'
+
+
+def get_sqlite_backend(path: Optional[Path] = None):
+    from .sqlite_stats import SQLiteStatsBackend
+    path = Path(path or os.environ.get('SKIT_SQLITE_PATH') or _default_sqlite_path())
+    with _sqlite_lock:
+        backend = _sqlite_backends.get(path)
+        if backend is None:
+            backend = _sqlite_backends[path] = SQLiteStatsBackend(path)
+        return backend
+
+
+_fallback_warned_at: Optional[float] = None
+
+
+def _warn_singlestore_fallback(reason):
+    # get_backend runs per batch and per dashboard request; warn once per repo retry window.
+    global _fallback_warned_at
+    now = time.monotonic()
+    if _fallback_warned_at is None or now - _fallback_warned_at >= REPO_RETRY_S:
+        _fallback_warned_at = now
+        log.warning("SKIT_STATS_BACKEND=singlestore but SingleStore is unavailable (%s); using file stats", reason)
+
+
+def get_backend() -> StatsBackend:
+    kind = os.environ.get('SKIT_STATS_BACKEND', 'auto').strip().lower()
+    if kind not in BACKEND_KINDS:
+        raise ValueError(f"Unknown SKIT_STATS_BACKEND {kind!r}; expected one of {BACKEND_KINDS}")
+    if kind == 'sqlite':
+        return get_sqlite_backend()
+    if kind in ('auto', 'singlestore'):
+        try:
+            repo = get_ss_repo()
+            reason = "not configured or not reachable"
+        except Exception as e:
+            repo, reason = None, e
+        if repo is not None:
+            return repo
+        if kind == 'singlestore':
+            _warn_singlestore_fallback(reason)
+    return FILE_BACKEND
+
+
+__all__ = ["StatsBackend", "FileStatsBackend", "FILE_BACKEND", "BACKEND_KINDS", "get_backend", "get_sqlite_backend",
+           "leaderboard_row", "sort_leaderboard"]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+"""Background stats writer.
+
+run_single_game hands each finished game to a StatsWriter and carries on; a
+daemon thread drains the queue in batches to the configured StatsBackend
+(record_games; see engine.stats_backend). A batch the backend rejects is
+spilled to the file store instead of being dropped; games the file store
+rejects as well are logged and counted in ``dropped``, which close() reports.
+
+The queue is bounded: when storage cannot keep up, submit() blocks until
+there is room (backpressure) rather than letting memory grow without limit.
+flush() waits until everything submitted so far has been written; close()
+flushes and stops the thread, and runs at interpreter exit.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+from .file_stats import flush as flush_file_stats
+from .stats_backend import FILE_BACKEND, get_backend as default_backend
+
+log = logging.getLogger(__name__)
+
+QUEUE_SIZE = int(os.environ.get('SKIT_STATS_QUEUE_SIZE', 1000))
+DB_BATCH_SIZE = int(os.environ.get('SKIT_DB_BATCH_SIZE', 100))
+BATCH_WAIT_S = 0.5  # how long a partial batch waits for more games before it is written
+
+_STOP = object()
+_FLUSH = object()  # ends the batch being gathered so flush() need not wait out BATCH_WAIT_S
+
+
+class StatsWriter:
+    def __init__(self, get_backend: Callable[[], Any] = default_backend, maxsize: int = QUEUE_SIZE,
+                 batch_size: int = DB_BATCH_SIZE):
+        self._get_backend = get_backend
+        self.batch_size = max(1, batch_size)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0  # games neither the backend nor the file store accepted
+
+    # -------- producer side ----------
+    def submit(self, result: dict):
+        """Queue one game's stats; blocks while the queue is full."""
+        self._ensure_thread()
+        self._queue.put(result)
+
+    def flush(self):
+        """Block until every game submitted so far has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        try:
+            flush_file_stats()
+        except Exception:
+            log.exception("Could not flush buffered file stats; they stay buffered for the next flush")
+
+    def close(self) -> int:
+        """Flush and stop the writer thread; returns the number of games dropped so far."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+            self._thread = None
+        self.flush()
+        if self.dropped:
+            log.error("Stats writer dropped %d game(s) that no stats store accepted", self.dropped)
+        return self.dropped
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+                self._thread.start()
+
+    # -------- writer thread ----------
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP or item is _FLUSH:
+                self._queue.task_done()
+                if item is _STOP:
+                    return
+                continue
+            batch = [item]
+            marker = None
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=BATCH_WAIT_S)
+                except queue.Empty:
+                    break
+                if item is _STOP or item is _FLUSH:
+                    marker = item
+                    break
+                batch.append(item)
+            try:
+                self._write(batch)
+            finally:
+                for _ in range(len(batch) + (marker is not None)):
+                    self._queue.task_done()
+            if marker is _STOP:
+                return
+
+    def _write(self, batch: list[dict]):
+        try:
+            backend = self._get_backend()
+        except Exception:
+            log.exception("Could not select a stats backend; writing %d game(s) to file stats", len(batch))
+            backend = FILE_BACKEND
+        if backend is not FILE_BACKEND:
+            try:
+                backend.record_games(batch)
+                return
+            except Exception as e:
+                log.warning("Spilling %d game(s) to file stats: %s", len(batch), e)
+        failed = 0
+        for result in batch:
+            try:
+                FILE_BACKEND.record_game(result)
+            except Exception:
+                if not failed:
+                    log.exception("File stats fallback failed for a batch of %d game(s)", len(batch))
+                failed += 1
+        self.dropped += failed
+
+
+_writer: Optional[StatsWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> StatsWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = StatsWriter()
+        return _writer
+
+
+def _reset_after_fork():
+    # The writer thread does not survive fork and the queue's locks may be held;
+    # a forked child starts with its own writer on first use.
+    global _writer, _writer_lock
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+def _close_at_exit():
+    if _writer is not None:
+        _writer.close()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(_close_at_exit)
+
+__all__ = ["StatsWriter", "get_writer"]
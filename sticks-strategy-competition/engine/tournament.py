@@ -1,11 +1,22 @@
 from __future__ import annotations
 import random
 import sys
-from dataclasses import dataclass
+import time
+import uuid
+from pathlib import Path
+from dataclasses import dataclass, replace
 from typing import List, Dict, Any
 from .state import GameConfig, StrategyWrapper
 from collections import defaultdict
-from .run_game import run_single_game
+from concurrent.futures import ProcessPoolExecutor
+from .run_game import run_single_game, flush_stats
+from .sandbox import MP_CONTEXT
+from .events import ProgressPublisher
+from .replay_archive import default_archive_path, finalize_index
+from .replay_format import index_path
+
+# Minimum seconds between live progress snapshots (TournamentConfig.publish_events)
+EVENT_INTERVAL_S = 0.25
 
 
 @dataclass
@@ -14,29 +25,119 @@ class TournamentConfig:
     random_seed: int | None = None
     time_limit_ms: int = 50
     enable_replay: bool = False
+    # With enable_replay every game streams into this archive (engine.replay_archive);
+    # default data/replays/<tournament id>.skr. An existing archive is replaced.
+    replay_path: str | None = None
+    action_log_path: str | None = None  # seed + action stream per game (engine.action_log); replaced per run
     rotate_goat: bool = True
+    workers: int = 1  # >1 shards games across a process pool
+    isolation: str = "process"  # "thread" / "none" for trusted strategies (see GameConfig)
+    soft_time_limit: bool = False
+    publish_events: bool = False  # live progress snapshots on the event bus (engine.events)
+
+
+def _game_summary(result: dict) -> Dict[str, Any]:
+    """The fields of a run_single_game result that tournament aggregation needs."""
+    return {k: result[k] for k in ("loser", "order_out", "wars", "kills", "eats", "player_count")}
+
+
+def _play_game(wrappers: List[StrategyWrapper], config: TournamentConfig, g: int, subset_size: int) -> Dict[str, Any]:
+    n = len(wrappers)
+    goat_index = g % n if config.rotate_goat else 0
+    seed = (config.random_seed + g) if config.random_seed is not None else None
+    game_conf = GameConfig(time_limit_ms=config.time_limit_ms, random_seed=seed, enable_replay=config.enable_replay,
+                           replay_path=config.replay_path, action_log_path=config.action_log_path, game_number=g,
+                           isolation=config.isolation, soft_time_limit=config.soft_time_limit)
+    # Use exact player count - ensure we always use the specified number
+    rng = random.Random(seed)
+    chosen = rng.sample(wrappers, subset_size)
+    game_conf.max_players_per_game = subset_size
+    return _game_summary(run_single_game(chosen, goat_index=goat_index % subset_size, config=game_conf))
+
+
+# Pool worker globals: wrappers are handed over once per process by the initializer.
+_pool_wrappers: List[StrategyWrapper] = []
+
+
+def _init_pool_worker(wrappers: List[StrategyWrapper]):
+    global _pool_wrappers
+    _pool_wrappers = wrappers
+
+
+def _run_shard(games: range, config: TournamentConfig, subset_size: int) -> List[Dict[str, Any]]:
+    summaries = [_play_game(_pool_wrappers, config, g, subset_size) for g in games]
+    flush_stats()  # pool workers exit without running atexit hooks
+    return summaries
+
+
+def _shards(games: int, workers: int) -> List[range]:
+    # Several contiguous shards per worker keeps the pool busy when game lengths vary.
+    size = max(1, -(-games // (workers * 4)))
+    return [range(start, min(games, start + size)) for start in range(0, games, size)]
+
+
+def _iter_games(wrappers: List[StrategyWrapper], config: TournamentConfig, subset_size: int):
+    """Yield per-game summaries in game order, running shards on a process pool if configured."""
+    if config.workers <= 1 or config.games <= 1:
+        for g in range(config.games):
+            yield _play_game(wrappers, config, g, subset_size)
+        return
+    with ProcessPoolExecutor(max_workers=config.workers, mp_context=MP_CONTEXT,
+                             initializer=_init_pool_worker, initargs=(wrappers,)) as pool:
+        futures = [pool.submit(_run_shard, shard, config, subset_size) for shard in _shards(config.games, config.workers)]
+        for fut in futures:
+            yield from fut.result()
+
+
+def _progress_event(tournament_id: str, done: int, total: int, started: float, stats: Dict[str, dict], finished: bool) -> Dict[str, Any]:
+    elapsed = time.perf_counter() - started
+    return {
+        "tournament_id": tournament_id,
+        "games_done": done,
+        "games_total": total,
+        "games_per_sec": done / elapsed if elapsed > 0 else 0.0,
+        "elapsed_s": elapsed,
+        "finished": finished,
+        "strategies": {name: {"games": s["games"], "losses": s["losses"], "loss_rate": s["losses"] / (s["games"] or 1)}
+                       for name, s in stats.items()},
+    }
 
 
 def run_tournament(wrappers: List[StrategyWrapper], config: TournamentConfig | None = None, max_players_per_game: int = 5, progress: bool = False) -> Dict[str, Any]:
+    """Play config.games games and aggregate leaderboards.
+
+    With config.workers > 1 games are sharded by seed across a process pool.
+    Shards return per-game summaries that are folded in game order, so the
+    result is identical to a serial run with the same random_seed.
+
+    With config.publish_events, a progress snapshot (games done, games/sec,
+    per-strategy loss rate) is published at most every EVENT_INTERVAL_S and
+    once more when the tournament finishes; see engine.events.
+
+    With config.enable_replay, replays go to one archive per tournament
+    (result["replay_archive"]), never into the result dicts.
+    """
     if config is None:
         config = TournamentConfig()
     n = len(wrappers)
     assert n >= 3, 'Need at least 3 strategies'
     stats = {w.name: {"games": 0, "losses": 0, "positions_sum": 0, "wars": 0, "kills": 0, "eats": 0} for w in wrappers}
     segmented: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(lambda: defaultdict(lambda: {"games": 0, "losses": 0, "positions_sum": 0, "wars": 0.0, "kills": 0.0, "eats": 0.0}))
-    base_seed = config.random_seed
     is_tty = sys.stdout.isatty()
     prev_len = 0
-    for g in range(config.games):
-        goat_index = g % n if config.rotate_goat else 0
-        seed = (base_seed + g) if base_seed is not None else None
-        game_conf = GameConfig(time_limit_ms=config.time_limit_ms, random_seed=seed, enable_replay=config.enable_replay)
-        # Use exact player count - ensure we always use the specified number
-        subset_size = max_players_per_game
-        rng = random.Random(seed)
-        chosen = rng.sample(wrappers, subset_size)
-        game_conf.max_players_per_game = subset_size
-        result = run_single_game(chosen, goat_index=goat_index % subset_size, config=game_conf)
+    subset_size = max_players_per_game
+    publisher = ProgressPublisher() if config.publish_events else None
+    tournament_id = uuid.uuid4().hex
+    archive = None
+    if config.enable_replay:
+        archive = Path(config.replay_path) if config.replay_path else default_archive_path(tournament_id)
+        for stale in (archive, index_path(archive)):
+            stale.unlink(missing_ok=True)
+        config = replace(config, replay_path=str(archive))
+    if config.action_log_path:
+        Path(config.action_log_path).unlink(missing_ok=True)
+    started = last_event = time.perf_counter()
+    for g, result in enumerate(_iter_games(wrappers, config, subset_size)):
         order_names = result['order_out'] + [result['loser']]
         bucket = f"p{result.get('player_count', subset_size)}"
         # Update participation stats: For legacy expectation tests, credit every strategy with a game
@@ -65,6 +166,9 @@ def run_tournament(wrappers: List[StrategyWrapper], config: TournamentConfig | N
             seg["wars"] += result['wars'] / subset_size
             seg["kills"] += result['kills'] / subset_size
             seg["eats"] += result['eats'] / subset_size
+        if publisher is not None and time.perf_counter() - last_event >= EVENT_INTERVAL_S:
+            publisher.publish(_progress_event(tournament_id, g + 1, config.games, started, stats, False))
+            last_event = time.perf_counter()
         if progress:
             completed = g + 1
             pct = (completed / config.games) * 100
@@ -77,6 +181,12 @@ def run_tournament(wrappers: List[StrategyWrapper], config: TournamentConfig | N
             else:
                 # Non-TTY (piped/redirected) -> print each update on its own line
                 print(msg)
+    flush_stats()
+    if archive is not None and archive.exists():
+        finalize_index(archive)
+    if publisher is not None:
+        publisher.publish(_progress_event(tournament_id, config.games, config.games, started, stats, True))
+        publisher.close()
     leaderboard = []
     for name, s in stats.items():
         games = s['games'] or 1
@@ -111,7 +221,10 @@ def run_tournament(wrappers: List[StrategyWrapper], config: TournamentConfig | N
     # Ensure newline after final progress line if progress printing enabled
     if progress and is_tty:
         print()  # final newline after in-place updates
-    return {"leaderboard": leaderboard, "raw": stats, "segmented": seg_out}
+    out = {"leaderboard": leaderboard, "raw": stats, "segmented": seg_out}
+    if archive is not None:
+        out["replay_archive"] = str(archive)
+    return out
 
 
 __all__ = ["TournamentConfig", "run_tournament"]
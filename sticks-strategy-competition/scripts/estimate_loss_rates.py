@@ -0,0 +1,44 @@
+from __future__ import annotations
+from pathlib import Path
+import sys
+import time
+import argparse
+
+# Ensure project root (parent of this scripts dir) is on sys.path when executed directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from engine.batch_policies import POLICIES  # noqa: E402
+from engine.batch_sim import estimate_loss_rates  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None):  # pragma: no cover - thin wrapper
+    p = argparse.ArgumentParser(description="Estimate loss rates of batched policies with the NumPy simulator")
+    p.add_argument('--seats', type=str, default='simple_strategy,trump_hoarder_strategy,simple_strategy,trump_hoarder_strategy',
+                   help=f'Comma-separated policy per seat (available: {", ".join(POLICIES)})')
+    p.add_argument('--games', type=int, default=100_000)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--batch-size', type=int, default=10_000, help='Games simulated in lockstep (default: 10000)')
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):  # pragma: no cover
+    args = parse_args(argv)
+    names = [n.strip() for n in args.seats.split(',') if n.strip()]
+    unknown = [n for n in names if n not in POLICIES]
+    if unknown:
+        print(f"Unknown policies: {', '.join(unknown)}")
+        return 1
+    started = time.perf_counter()
+    est = estimate_loss_rates([POLICIES[n]() for n in names], args.games, seed=args.seed, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    for seat, name in enumerate(names):
+        print(f"seat {seat} {name:<24} loss rate {est['loss_rate'][seat]:.4f} ± {1.96 * est['stderr'][seat]:.4f}")
+    print(f"{est['games']} games in {elapsed:.1f}s ({est['games'] / elapsed if elapsed else 0:.0f}/s), "
+          f"{est['aborted']} hit the turn guard")
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -19,10 +19,17 @@ def parse_args(argv: list[str] | None = None):  # pragma: no cover - thin wrappe
     p.add_argument('--time-limit-ms', type=int, default=60, help='Per-call soft time limit ms (default: 60)')
     p.add_argument('--no-rotate-goat', action='store_true', help='Disable rotating the initial goat position')
     p.add_argument('--replay', action='store_true', help='Enable replay recording (slower)')
+    p.add_argument('--replay-file', type=str, default=None, help='Replay archive path (implies --replay; default data/replays/<id>.skr)')
+    p.add_argument('--action-log', type=str, default=None, help='Record each game as seed + actions to this file (see scripts/verify_action_logs.py)')
     p.add_argument('--include', type=str, default='', help='Comma-separated subset of strategy module basenames (without .py) to include')
     p.add_argument('--list', action='store_true', help='List discovered strategies and exit')
     p.add_argument('--progress', action='store_true', help='Show live per-game progress updating one line')
     p.add_argument('--show-segmented', action='store_true', help='Show separate leaderboards for 3, 4, 5 player games')
+    p.add_argument('--jobs', type=int, default=1, help='Worker processes to shard games across (default: 1 = serial)')
+    p.add_argument('--isolation', choices=['process', 'thread', 'none'], default='process',
+                   help='How strategies are called: sandbox process (default), thread, or none (trusted strategies only)')
+    p.add_argument('--soft-time-limit', action='store_true', help='With --isolation none, treat calls over the time limit as timeouts')
+    p.add_argument('--events', action='store_true', help='Publish live progress for the dashboard (SKIT_EVENTS_HOST/PORT)')
     p.add_argument('--players', type=int, default=5, choices=[3, 4, 5], help='Number of players per game (default: 5)')
     return p.parse_args(argv)
 
@@ -50,10 +57,18 @@ def main(argv: list[str] | None = None):  # pragma: no cover
         games=args.games,
         random_seed=args.seed,
         time_limit_ms=args.time_limit_ms,
-        enable_replay=args.replay,
+        enable_replay=args.replay or args.replay_file is not None,
+        replay_path=args.replay_file,
+        action_log_path=args.action_log,
         rotate_goat=not args.no_rotate_goat,
+        workers=args.jobs,
+        isolation=args.isolation,
+        soft_time_limit=args.soft_time_limit,
+        publish_events=args.events,
     )
     results = run_tournament(wrappers, cfg, max_players_per_game=args.players, progress=args.progress)
+    if 'replay_archive' in results:
+        print(f"Replays: {results['replay_archive']}")
     print("Leaderboard (by loss rate):")
     for i, row in enumerate(results['leaderboard'], 1):
         print(f"{i:2d}. {row['name']}: loss_rate={row['loss_rate']:.3f} avg_pos={row['avg_finish_position']:.2f} games={row['games']}")
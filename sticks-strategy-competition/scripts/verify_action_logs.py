@@ -0,0 +1,40 @@
+from __future__ import annotations
+from pathlib import Path
+import sys
+import time
+import argparse
+
+# Ensure project root (parent of this scripts dir) is on sys.path when executed directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from engine.action_log import ReplayMismatchError, iter_action_logs, verify_log  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None):  # pragma: no cover - thin wrapper
+    p = argparse.ArgumentParser(description="Re-simulate recorded games (run_tournament.py --action-log) and check their results")
+    p.add_argument('path', type=str, help='Action log file')
+    p.add_argument('--max-errors', type=int, default=10, help='Mismatches to print before only counting (default: 10)')
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):  # pragma: no cover
+    args = parse_args(argv)
+    started = time.perf_counter()
+    games = failures = 0
+    for log in iter_action_logs(args.path):
+        games += 1
+        try:
+            verify_log(log)
+        except ReplayMismatchError as e:
+            failures += 1
+            if failures <= args.max_errors:
+                print(f"seed={log.seed}: {e}")
+    elapsed = time.perf_counter() - started
+    print(f"{games} games verified in {elapsed:.2f}s ({games / elapsed if elapsed else 0:.0f}/s), {failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+"""Shared scaffolding for tests that drive a Part2Engine directly."""
+import random
+from typing import Optional
+
+from engine.cards import CARDS, Suit
+from engine.part2 import Part2Engine
+from engine.state import EngineError, StrategyWrapper
+from engine.strategy_interface import BaseStrategy
+
+
+class Part2Only(BaseStrategy):
+    """Test strategy for a Part2Engine: subclasses implement part2_move and may read the live engine.
+
+    deal_part2() binds ``engine`` before the game starts; ``predictions`` collects whatever the
+    subclass wants to check against the engine's result.
+    """
+
+    engine: Optional[Part2Engine] = None
+
+    def __init__(self):
+        super().__init__()
+        self.predictions = []
+
+    def part1_play(self, state):  # pragma: no cover - Part 2 only
+        raise EngineError("Part 2 test strategy asked to play Part 1")
+
+    def part1_slough(self, state):  # pragma: no cover
+        raise EngineError("Part 2 test strategy asked to play Part 1")
+
+
+def deal_part2(seed, players, instance=None, cards=len(CARDS), first=0) -> Part2Engine:
+    """A Part2Engine over `cards` random cards dealt round-robin, every seat played by `instance`."""
+    rng = random.Random(seed)
+    dealt = rng.sample(list(CARDS), cards)
+    collected = [dealt[i::players] for i in range(players)]
+    seats = [StrategyWrapper(name=f"s{i}", module_name="", instance=instance) for i in range(players)]
+    engine = Part2Engine(seats, collected, first, Suit(rng.randrange(4)), time_limit_ms=0,
+                         replay_enabled=False, isolation="none")
+    if isinstance(instance, Part2Only):
+        instance.engine = engine
+    return engine
@@ -0,0 +1,14 @@
+import pytest
+
+from engine import file_stats
+from engine.stats_writer import get_writer
+
+
+@pytest.fixture(autouse=True)
+def _data_in_tmp(tmp_path, monkeypatch):
+    """Keep stats and replay files written by a test out of the project's data/ directory."""
+    monkeypatch.setenv("SKIT_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(file_stats, "STATS_PATH", tmp_path / "data" / "stats" / "aggregated_stats.json")
+    monkeypatch.setattr(file_stats, "GAME_LOG_PATH", None)
+    yield
+    get_writer().flush()  # queued and buffered games go to this test's directory, not to the default at exit
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from engine.action_log import ActionLog, ReplayMismatchError, iter_action_logs, replay_game, verify_log
+from engine.loader import load_strategies
+from engine.run_game import run_single_game
+from engine.state import GameConfig
+from engine.tournament import run_tournament, TournamentConfig
+
+
+def test_replay_game_from_seed_and_actions():
+    wrappers = load_strategies(Path('strategies'))[:5]
+    res = run_single_game(wrappers, goat_index=2, config=GameConfig(random_seed=77, isolation="none",
+                                                                    enable_replay=False, record_actions=True))
+    log = res["replay_actions"]
+    assert "replay_actions" in res and len(log.to_bytes()) < 1000
+    assert log.result.loser_index == [w.name for w in wrappers].index(res["loser"])
+    assert replay_game(77, log.actions, 5, goat_index=2) == log.result
+    assert verify_log(ActionLog.from_bytes(log.to_bytes())) == log.result
+
+    with pytest.raises(ReplayMismatchError):
+        replay_game(78, log.actions, 5, goat_index=2, expected=log.result)  # different deal
+    with pytest.raises(ReplayMismatchError):
+        replay_game(77, log.actions[:-3], 5, goat_index=2)  # truncated stream
+
+
+def test_tournament_action_logs_verify(tmp_path):
+    wrappers = load_strategies(Path('strategies'))
+    path = tmp_path / "actions.bin"
+    cfg = TournamentConfig(games=6, random_seed=11, action_log_path=str(path), workers=2, isolation="none")
+    results = run_tournament(wrappers, cfg)
+    logs = list(iter_action_logs(path))
+    assert sorted(log.seed for log in logs) == [11 + g for g in range(6)]
+    assert all(verify_log(log) == log.result for log in logs)
+    assert len(logs) == sum(r["losses"] for r in results["leaderboard"])
+
+
+def test_seeds_outside_int64_round_trip():
+    wrappers = load_strategies(Path('strategies'))[:3]
+    seed = (1 << 70) + 5
+    res = run_single_game(wrappers, goat_index=0, config=GameConfig(random_seed=seed, isolation="none",
+                                                                    enable_replay=False, record_actions=True))
+    log = ActionLog.from_bytes(res["replay_actions"].to_bytes())
+    assert log.seed == seed and verify_log(log) == res["replay_actions"].result
+    for s in (0, -1, 1 << 63, -(1 << 63) - 9, -(1 << 90)):
+        assert ActionLog.from_bytes(ActionLog(s, 3, 1, b"\x00").to_bytes()).seed == s
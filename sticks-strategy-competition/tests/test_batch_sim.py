@@ -0,0 +1,40 @@
+import random
+from pathlib import Path
+
+import numpy as np
+
+from engine.action_log import replay_game
+from engine.batch_policies import SimplePolicy, TrumpHoarderPolicy
+from engine.batch_sim import estimate_loss_rates, simulate_games
+from engine.loader import load_strategies
+from engine.run_game import run_single_game
+from engine.state import GameConfig
+
+
+def test_batched_games_replay_through_engines():
+    for players in (2, 4, 6):
+        policies = [SimplePolicy() if i % 2 == 0 else TrumpHoarderPolicy() for i in range(players)]
+        seeds = list(range(500, 560))
+        res = simulate_games(policies, seeds=seeds, goat_index=np.arange(60) % players,
+                             rng=np.random.default_rng(players), record_actions=True)
+        for i, seed in enumerate(seeds):
+            assert not res.aborted[i]
+            replay_game(seed, res.actions[i], players, int(res.goat_index[i]), expected=res.game_result(i))
+
+
+def test_ports_match_scalar_strategies(monkeypatch):
+    monkeypatch.setattr(random, "random", lambda: 0.99)  # scalar strategies never draw the deck top
+    by_name = {w.name: w for w in load_strategies(Path('strategies'))}
+    wrappers = [by_name["simple_strategy"], by_name["trump_hoarder_strategy"]] * 2
+    seeds = list(range(40))
+    res = simulate_games([SimplePolicy(0.0), TrumpHoarderPolicy(0.0)] * 2, seeds=seeds, goat_index=1)
+    for i, seed in enumerate(seeds):
+        scalar = run_single_game(wrappers, goat_index=1, config=GameConfig(
+            random_seed=seed, isolation="none", enable_replay=False, record_actions=True))
+        assert scalar["replay_actions"].result == res.game_result(i)
+
+
+def test_estimate_loss_rates():
+    est = estimate_loss_rates([SimplePolicy(), TrumpHoarderPolicy(), SimplePolicy()], games=600, batch_size=250)
+    assert est["games"] + est["aborted"] == 600
+    assert abs(sum(est["loss_rate"]) - 1) < 1e-9
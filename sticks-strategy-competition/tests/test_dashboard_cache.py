@@ -0,0 +1,36 @@
+from dashboard.app import app
+from dashboard.services import stats_service
+from engine.stats_backend import get_sqlite_backend
+
+
+def _result(loser):
+    return {"loser": loser, "order_out": [n for n in "abc" if n != loser], "wars": 1, "kills": 0, "eats": 0,
+            "trump": None, "player_count": 3}
+
+
+def test_stats_etag_304_and_version_invalidation(tmp_path, monkeypatch):
+    monkeypatch.setenv("SKIT_STATS_BACKEND", "sqlite")
+    monkeypatch.setenv("SKIT_SQLITE_PATH", str(tmp_path / "stats.sqlite3"))
+    monkeypatch.setattr(stats_service, "CACHE_TTL_S", 0)
+    stats_service.clear_statistics_cache()
+    db = get_sqlite_backend()
+    db.record_game(_result("a"))
+    client = app.test_client()
+
+    first = client.get("/stats")
+    assert first.status_code == 200 and first.json["source"] == "sqlite"
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+    assert client.get("/stats", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 200  # index has its own tag
+
+    calls = []
+    monkeypatch.setattr(stats_service, "get_statistics", lambda real=stats_service.get_statistics: calls.append(1) or real())
+    assert client.get("/stats", headers={"If-None-Match": etag}).status_code == 304
+    assert calls == []  # unchanged version: served from cache without recomputing
+
+    db.record_game(_result("b"))
+    fresh = client.get("/stats", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+    assert {r["strategy"]: r["losses"] for r in fresh.json["leaderboard"]}["b"] == 1
+    stats_service.clear_statistics_cache()
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from engine.endgame import EndgameSolver, Position, grade_game, move_action
+from engine.loader import load_strategies
+from engine.run_game import run_single_game
+from engine.state import GameConfig
+from tests._part2_helpers import Part2Only, deal_part2
+
+
+class Solved(Part2Only):
+    """Plays the solver's move every turn and records its predicted loser."""
+
+    def __init__(self, solver):
+        super().__init__()
+        self.solver = solver
+
+    def part2_move(self, state):
+        res = self.solver.solve(Position.from_engine(self.engine, state.player_index))
+        self.predictions.append(res.loser)
+        return move_action(res.move, state.hand_index)
+
+
+def test_solved_line_matches_engine():
+    for seed, (cards, players) in enumerate([(8, 2), (12, 3), (14, 4), (18, 3)]):
+        solver = EndgameSolver(tt_size=500)
+        strat = Solved(solver)
+        engine = deal_part2(seed, players, strat, cards=cards)
+        root = solver.solve(Position.from_engine(engine, 0))
+        loser, *_ = engine.run()
+        assert root.complete and root.loser == loser
+        assert set(strat.predictions) == {loser}
+        assert len(solver.tt) <= 500
+
+
+def test_canonical_key_budget_and_grading():
+    engine = deal_part2(5, 4, cards=16)
+    pos = Position.from_engine(engine, 0)
+    solver = EndgameSolver()
+    assert not solver.solve(pos, max_nodes=1).complete
+    loser = solver.solve(pos).loser
+    rotated = Position(4, pos.trump, 1, pos.out[-1:] + pos.out[:-1], pos.hands[-4:] + pos.hands[:-4], pos.plays)
+    assert rotated.key() == pos.key()
+    hits = solver.hits
+    assert solver.solve(rotated).loser == (loser + 1) % 4 and solver.hits == hits + 1
+    assert {l for _, l in solver.move_values(pos)} >= {loser}
+
+    wrappers = load_strategies(Path('strategies'))[:4]
+    res = run_single_game(wrappers, goat_index=0, config=GameConfig(random_seed=1, isolation="none",
+                                                                    enable_replay=False, record_actions=True))
+    grades = grade_game(1, res["replay_actions"].actions, 4, max_cards=10)
+    assert grades and all(g.cards_left <= 10 for g in grades)
+    assert all(g.loser is not None and g.best_loser is not None for g in grades)
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from dashboard.routes.events import stream_progress
+from engine.events import EventBus, SocketListener, SocketPublisher, get_bus
+from engine.loader import load_strategies
+from engine.tournament import run_tournament, TournamentConfig
+
+
+def test_tournament_publishes_progress():
+    wrappers = load_strategies(Path('strategies'))
+    with get_bus().subscribe(replay_last=False, maxsize=1000) as sub:
+        results = run_tournament(wrappers, TournamentConfig(games=4, random_seed=3, isolation="none", publish_events=True))
+        events = []
+        while (event := sub.get(timeout=0)) is not None:
+            events.append(event)
+    final = events[-1]
+    assert final["finished"] and final["games_done"] == final["games_total"] == 4
+    assert final["games_per_sec"] > 0
+    assert {r["name"]: r["loss_rate"] for r in results["leaderboard"]} == \
+        {name: row["loss_rate"] for name, row in final["strategies"].items()}
+
+
+def test_socket_transport_roundtrip():
+    bus = EventBus()
+    listener = SocketListener(bus, ("127.0.0.1", 0))
+    publisher = SocketPublisher(listener.address)
+    try:
+        with bus.subscribe("tournament") as sub:
+            publisher.publish("tournament", {"games_done": 1})
+            assert sub.get(timeout=5) == {"games_done": 1}
+    finally:
+        publisher.close()
+        listener.close()
+
+
+def test_sse_stream_sends_snapshot_then_deltas():
+    bus = EventBus()
+    rows = {"a": {"games": 1, "losses": 1, "loss_rate": 1.0}, "b": {"games": 1, "losses": 0, "loss_rate": 0.0}}
+    bus.publish("tournament", {"tournament_id": "t1", "games_done": 1, "finished": False, "strategies": rows})
+    stream = stream_progress(bus.subscribe("tournament"), heartbeat_s=0.01)
+
+    kind, data = next(stream).strip().split("\n")
+    assert kind == "event: snapshot" and json.loads(data[len("data: "):])["games_done"] == 1
+
+    rows2 = dict(rows, b={"games": 2, "losses": 1, "loss_rate": 0.5})
+    bus.publish("tournament", {"tournament_id": "t1", "games_done": 2, "finished": False, "strategies": rows2})
+    kind, data = next(stream).strip().split("\n")
+    assert kind == "event: delta"
+    assert json.loads(data[len("data: "):]) == {"tournament_id": "t1", "games_done": 2, "strategies": {"b": rows2["b"]}}
+
+    assert next(stream) == ": keepalive\n\n"
+    stream.close()
+    assert not bus._subs["tournament"]
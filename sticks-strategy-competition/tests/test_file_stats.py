@@ -0,0 +1,107 @@
+import json
+import multiprocessing as mp
+from engine import file_stats
+
+
+def _result(loser, order_out, wars=3):
+    return {"loser": loser, "order_out": order_out, "wars": wars, "kills": 0, "eats": 0, "player_count": len(order_out) + 1}
+
+
+def _record_many(n):
+    for _ in range(n):
+        file_stats.record_game(_result("c", ["a", "b"]))
+    file_stats.flush()
+
+
+def _use_tmp(monkeypatch, tmp_path, every):
+    monkeypatch.setattr(file_stats, "STATS_PATH", tmp_path / "stats.json")
+    monkeypatch.setattr(file_stats, "FLUSH_EVERY", every)
+    monkeypatch.setattr(file_stats, "FLUSH_INTERVAL_S", 3600)
+    file_stats._pending.clear()
+    return tmp_path / "game_log.jsonl"
+
+
+def _by_name(rows):
+    return {r["strategy"]: r for r in rows}
+
+
+def test_record_game_buffers_then_appends_to_log(tmp_path, monkeypatch):
+    log = _use_tmp(monkeypatch, tmp_path, 3)
+    file_stats.record_game(_result("c", ["a", "b"]))
+    file_stats.record_game(_result("a", ["b", "c"]))
+    assert not log.exists()
+    file_stats.record_game(_result("b", ["a", "c"]))
+    assert len(log.read_text().splitlines()) == 1 + 3  # log id header + records
+    file_stats.record_game(_result("c", ["a", "b"]))
+    lb = _by_name(file_stats.load_leaderboard())  # readers see buffered games
+    assert lb["c"]["games"] == 4 and lb["c"]["losses"] == 2
+    seg = _by_name(file_stats.load_segmented_leaderboards()["p3"])
+    assert seg["a"]["avg_finish_position"] == (0 + 2 + 0 + 0) / 4
+    assert len(log.read_text().splitlines()) == 1 + 3  # reads fold the buffer in memory only
+    assert not (tmp_path / "stats.json").exists()  # and never compact
+
+
+def test_compaction_matches_reading_the_full_log(tmp_path, monkeypatch):
+    log = _use_tmp(monkeypatch, tmp_path, 2)
+    for i in range(5):
+        file_stats.record_game(_result("abc"[i % 3], [n for n in "abc" if n != "abc"[i % 3]], wars=i))
+    file_stats.flush()
+    before = file_stats.load_leaderboard()
+    file_stats.compact()
+    assert not log.exists()
+    assert file_stats.load_leaderboard() == before
+    file_stats.record_game(_result("a", ["b", "c"]))
+    file_stats.record_game(_result("a", ["b", "c"]))
+    snapshot = json.loads((tmp_path / "stats.json").read_text())
+    assert snapshot["strategies"]["a"]["games"] == 5  # tail not merged yet
+    assert _by_name(file_stats.load_leaderboard())["a"]["games"] == 7
+
+
+def test_concurrent_writers_do_not_lose_games(tmp_path, monkeypatch):
+    _use_tmp(monkeypatch, tmp_path, 5)
+    monkeypatch.setattr(file_stats, "COMPACT_BYTES", 2000)  # compaction races with appends too
+    ctx = mp.get_context("fork")
+    procs = [ctx.Process(target=_record_many, args=(23,)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert _by_name(file_stats.load_leaderboard())["c"]["losses"] == 4 * 23
+
+
+def test_child_forked_while_lock_is_held_can_record(tmp_path, monkeypatch):
+    import threading
+    _use_tmp(monkeypatch, tmp_path, 1)
+    held, release = threading.Event(), threading.Event()
+
+    def hold():
+        with file_stats._lock:
+            held.set()
+            release.wait(5)
+
+    t = threading.Thread(target=hold)
+    t.start()
+    held.wait(5)
+    child = mp.get_context("fork").Process(target=_record_many, args=(3,))
+    child.start()
+    child.join(5)
+    release.set()
+    t.join()
+    if child.is_alive():  # deadlocked on the inherited lock
+        child.kill()
+        child.join()
+    assert child.exitcode == 0
+    assert _by_name(file_stats.load_leaderboard())["c"]["games"] == 3
+
+
+def test_torn_line_is_terminated_and_skipped(tmp_path, monkeypatch):
+    log = _use_tmp(monkeypatch, tmp_path, 1)
+    file_stats.record_game(_result("c", ["a", "b"]))
+    with open(log, "ab") as fh:
+        fh.write(b'{"loser": "c", "ord')  # writer died mid-append
+    assert _by_name(file_stats.load_leaderboard())["c"]["games"] == 1
+    file_stats.record_game(_result("a", ["b", "c"]))
+    assert _by_name(file_stats.load_leaderboard())["a"]["losses"] == 1
+    file_stats.compact()
+    lb = _by_name(file_stats.load_leaderboard())
+    assert lb["c"]["games"] == 2 and lb["c"]["losses"] == 1
@@ -0,0 +1,45 @@
+import random
+from engine.cards import CARDS, Suit, touching_run
+from engine.hand_index import HandIndex, run_beats
+
+
+def brute_runs(hand):
+    runs = []
+    for s in Suit:
+        vals = sorted(c.p2 for c in hand if c.suit == s)
+        for i in range(len(vals)):
+            for j in range(i, len(vals)):
+                seg = [c for c in hand if c.suit == s and vals[i] <= c.p2 <= vals[j]]
+                if touching_run(seg):
+                    runs.append((s, vals[i], vals[j]))
+    return runs
+
+
+def test_index_queries_match_brute_force():
+    rng = random.Random(3)
+    for _ in range(300):
+        hand = rng.sample(CARDS, rng.randint(1, 24))
+        trump = rng.choice(list(Suit))
+        top, length = rng.randrange(13), rng.randint(1, 4)
+        strength = (rng.random() < 0.3, top, length)
+        idx = HandIndex.from_cards(hand)
+        runs = brute_runs(hand)
+        assert sorted(idx.all_runs()) == sorted(runs)
+        beating = [r for r in runs if run_beats(r, strength, trump)]
+        assert idx.can_beat(strength, trump) == bool(beating)
+        assert sorted(idx.beating_runs(strength, trump)) == sorted(beating)
+        best = idx.best_beating_run(strength, trump)
+        if beating:
+            key = lambda r: (r[0] == trump, r[2], r[2] - r[1])
+            assert key(best) == min(key(r) for r in beating)
+        else:
+            assert best is None
+
+
+def test_run_indices_follow_sorted_hand():
+    hand = sorted(random.Random(5).sample(CARDS, 20), key=lambda c: c.id)
+    idx = HandIndex.from_cards(hand)
+    for suit, lo, hi in idx.all_runs():
+        cards = [hand[i] for i in idx.run_indices(suit, lo, hi)]
+        assert [c.p2 for c in cards] == list(range(lo, hi + 1))
+        assert all(c.suit == suit for c in cards)
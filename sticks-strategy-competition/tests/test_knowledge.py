@@ -0,0 +1,85 @@
+import pickle
+import random
+
+from engine.cards import CARDS
+from engine.knowledge import CardKnowledge, card_mask
+from engine.part1 import Part1Engine
+from engine.part2 import Part2Engine
+from engine.rollout import Part2Rollout
+from engine.state import StrategyWrapper
+from engine.strategy_interface import BaseStrategy
+from engine.actions import Part1PlayAction, Part1PlayType, Part1SloughAction, Part2Action, Part2ActionType
+
+
+class Checker(BaseStrategy):
+    """Plays legal moves and checks every view's knowledge against the engine's true state."""
+
+    engine = None
+
+    def __init__(self):
+        super().__init__()
+        self.checked = 0
+
+    def _check(self, state, hands, piles, table):
+        k = state.knowledge
+        assert k.hand == card_mask(state.hand)
+        assert k.table == card_mask(table)
+        for seat, held in enumerate(k.held):
+            assert held & ~card_mask(piles[seat]) == 0  # known holdings are really there
+        assert k.unseen & (k.hand | k.table | k.dead) == 0
+        assert sum(k.unseen_suit_counts()) == sum(k.unseen_rank_counts()) == bin(k.unseen).count("1")
+        assert k.dead & ~k.seen == 0 and k.dead & k.table == 0
+        assert all(k.dead & card_mask(h) == 0 for h in hands)
+        assert pickle.loads(pickle.dumps(k)) == k
+        self.checked += 1
+
+    def part1_play(self, state):
+        e = self.engine
+        piles = [c for c in e.collected]
+        self._check(state, e.hands, piles, [tp.card for tp in e.current_trick])
+        leading = [i for i, c in enumerate(state.hand) if state.current_trick_plays
+                   and c.p1 == max(tp.card.p1 for tp in state.current_trick_plays)]
+        return Part1PlayAction(Part1PlayType.PLAY_HAND_CARD, leading[0] if leading else 0)
+
+    def part1_slough(self, state):
+        return Part1SloughAction([])
+
+    def part2_move(self, state):
+        e = self.engine
+        self._check(state, e.hands, e.hands, [c for p in e.table_plays for c in p.cards])
+        assert state.knowledge.trump == state.trump
+        rollout = Part2Rollout(state)
+        hands = rollout.determinize(random.Random(self.checked))
+        for seat, held in enumerate(state.knowledge.held):
+            dealt = sum(m << (13 * s) for s, m in enumerate(hands[4 * seat:4 * seat + 4]))
+            assert dealt & held == held and dealt & state.knowledge.dead == 0
+            assert bin(dealt).count("1") == state.player_hand_counts[seat]
+        run = state.hand_index.best_beating_run(state.highest_strength, state.trump)
+        if run is None:
+            return Part2Action(Part2ActionType.EAT)
+        return Part2Action(Part2ActionType.PLAY_RUN, state.hand_index.run_indices(*run))
+
+
+def test_knowledge_tracks_public_cards():
+    for seed in range(4):
+        strat = Checker()
+        seats = [StrategyWrapper(name=f"s{i}", module_name="", instance=strat) for i in range(4)]
+        p1 = Part1Engine(seats, 0, time_limit_ms=0, random_seed=seed, replay_enabled=False, isolation="none")
+        strat.engine = p1
+        collected, winner, trump_card, _ = p1.run()
+        known = p1.knowledge.held
+        assert all(held & ~card_mask(pile) == 0 for held, pile in zip(known, collected))
+        assert known[winner] >> trump_card.id & 1
+        p2 = Part2Engine(seats, collected, winner, trump_card.suit, time_limit_ms=0, replay_enabled=False,
+                         isolation="none", knowledge=p1.knowledge)
+        strat.engine = p2
+        p2.run()
+        assert strat.checked > 20
+        assert p2.knowledge.dead | p2.knowledge.table | sum(card_mask(h) for h in p2.hands) == (1 << 52) - 1
+
+
+def test_card_knowledge_counts():
+    k = CardKnowledge(hand=card_mask(CARDS[:13]), dead=card_mask(CARDS[13:20]), held=(card_mask(CARDS[20:22]),))
+    assert k.unseen_suit_counts() == (0, 4, 13, 13)
+    assert k.unseen_in_suit(1) == 4 and k.unseen_of_value(0) == 2
+    assert k.is_dead(CARDS[15]) and not k.is_dead(CARDS[0])
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from engine.loader import load_strategies
+from engine.replay_archive import ReplayArchive, build_index
+from engine.replay_format import index_path, iter_replays
+from engine.tournament import run_tournament, TournamentConfig
+
+
+def test_tournament_archive_index_lookup(tmp_path):
+    wrappers = load_strategies(Path('strategies'))
+    path = tmp_path / "t.skr"
+    cfg = TournamentConfig(games=8, random_seed=40, enable_replay=True, replay_path=str(path), workers=2,
+                           isolation="none")
+    results = run_tournament(wrappers, cfg)
+    assert results["replay_archive"] == str(path)
+    streamed = {g.game_number: [e.type for e in g] for g in iter_replays(path)}
+
+    with ReplayArchive(path) as archive:
+        assert len(archive) == 8
+        assert [g.game_number for g in archive] == list(range(8))  # finalized: sorted by game number
+        for n in (0, 5, 7):
+            assert [e.type for e in archive.game(n)] == streamed[n]
+        assert archive.by_seed(43).game_number == 3
+
+    index_path(path).unlink()
+    assert build_index(path) == 8  # rebuilt from the archive alone
+    with ReplayArchive(path) as archive:
+        assert [e.type for e in archive.game(6)] == streamed[6]
+
+    run_tournament(wrappers, TournamentConfig(games=3, random_seed=1, enable_replay=True, replay_path=str(path),
+                                              isolation="none"))
+    with ReplayArchive(path) as archive:
+        assert len(archive) == 3  # a new tournament replaces the archive
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from engine.loader import load_strategies
+from engine.replay_format import RECORD_SIZE, iter_replays
+from engine.run_game import run_single_game
+from engine.state import GameConfig
+from engine.tournament import run_tournament, TournamentConfig
+
+
+def _normalized(events):
+    # card lists decode in Card.id order
+    def norm(detail):
+        return {k: sorted(v, key=lambda c: (c["suit"], c["rank"])) if k in ("span", "cards") else v
+                for k, v in detail.items()}
+    return [(e.phase, e.turn, e.player, e.type, norm(e.detail)) for e in events]
+
+
+def test_streamed_replay_matches_in_memory(tmp_path):
+    wrappers = load_strategies(Path('strategies'))[:4]
+    path = tmp_path / "game.skr"
+    memory = run_single_game(wrappers, goat_index=1, config=GameConfig(random_seed=1234, isolation="none"))
+    streamed = run_single_game(wrappers, goat_index=1, config=GameConfig(random_seed=1234, isolation="none",
+                                                                         replay_path=str(path), game_number=7))
+    assert "replay_part1" not in streamed and streamed["replay_file"] == str(path)
+    (game,) = list(iter_replays(path))
+    assert (game.seed, game.game_number, game.goat_index, game.num_players) == (1234, 7, 1, 4)
+    expected = memory["replay_part1"] + memory["replay_part2"]
+    assert _normalized(game) == _normalized(expected)
+    assert path.stat().st_size == RECORD_SIZE * (len(expected) + 1)
+
+
+def test_parallel_tournament_streams_every_game(tmp_path):
+    wrappers = load_strategies(Path('strategies'))
+    path = tmp_path / "tournament.skr"
+    cfg = TournamentConfig(games=6, random_seed=5, enable_replay=True, replay_path=str(path), workers=2,
+                           isolation="none")
+    results = run_tournament(wrappers, cfg)
+    games = sorted(iter_replays(path), key=lambda g: g.game_number)
+    assert [g.game_number for g in games] == list(range(6))
+    assert [g.seed for g in games] == [5 + i for i in range(6)]
+    losers = [list(g.events("part2"))[-1].detail["loser"] for g in games]
+    assert len(losers) == sum(r["losses"] for r in results["leaderboard"])
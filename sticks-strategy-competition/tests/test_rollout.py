@@ -0,0 +1,51 @@
+import random
+import time
+
+import pytest
+
+from engine.actions import Part2Action, Part2ActionType
+from engine.rollout import Part2Rollout
+from engine.state import IllegalActionError
+from tests._part2_helpers import Part2Only, deal_part2
+
+
+class Cheapest(Part2Only):
+    """Plays like the default rollout policy and checks rollouts against the real game."""
+
+    def part2_move(self, state):
+        rollout = Part2Rollout(state)
+        hands = [0] * (4 * len(state.player_out))
+        for seat, hand in enumerate(self.engine.hands):
+            for c in hand:
+                hands[4 * seat + c.suit] |= 1 << c.p2
+        self.predictions.append(rollout.play_out(hands))  # full information: must match the engine
+        run = state.hand_index.best_beating_run(state.highest_strength, state.trump)
+        if run is None:
+            return Part2Action(Part2ActionType.EAT)
+        return Part2Action(Part2ActionType.PLAY_RUN, state.hand_index.run_indices(*run))
+
+
+def test_full_information_rollouts_match_engine():
+    for seed in range(8):
+        players = 3 + seed % 3
+        strat = Cheapest()
+        engine = deal_part2(seed, players, strat, first=seed % players)
+        loser, *_ = engine.run()
+        assert strat.predictions and set(strat.predictions) == {loser}
+
+
+def test_rollout_statistics_and_validation():
+    engine = deal_part2(3, 4)
+    state = engine.build_state(0)
+    rollout = Part2Rollout(state)
+    assert rollout.hidden == 39 and len(rollout.pool) == 39
+    lead = Part2Action(Part2ActionType.PLAY_RUN, [0])
+    started = time.perf_counter()
+    stats = rollout.compare([lead, None], n=200, rng=random.Random(1))
+    assert time.perf_counter() - started < 5
+    assert all(s.rollouts == 200 and sum(s.losses) + s.truncated == 200 for s in stats)
+    assert rollout.compare([lead], n=50, rng=random.Random(9))[0].losses == \
+        rollout.compare([lead], n=50, rng=random.Random(9))[0].losses
+    assert rollout.evaluate(lead, n=10_000, time_budget_ms=20).rollouts < 10_000
+    with pytest.raises(IllegalActionError):
+        rollout.move(Part2Action(Part2ActionType.PLAY_RUN, [0, 0]))
@@ -0,0 +1,176 @@
+import os
+import time
+import pytest
+from engine.sandbox import call_strategy
+from engine.state import StrategyWrapper, TimeoutEngineError, StrategyExecutionError
+
+
+class EchoStrategy:
+    def __init__(self):
+        self.memory = {}
+        self.calls = 0
+
+    def part1_play(self, state):
+        self.calls += 1
+        return (os.getpid(), self.calls, state)
+
+    def part1_slough(self, state):
+        time.sleep(1.0)
+
+    def part2_move(self, state):
+        raise ValueError("boom")
+
+
+def test_worker_is_reused_between_calls():
+    w = StrategyWrapper(name="echo", module_name="echo_mod", instance=EchoStrategy())
+    pid1, calls1, payload = call_strategy(w, "part1_play", "s1", time_limit_ms=1000)
+    pid2, calls2, _ = call_strategy(w, "part1_play", "s2", time_limit_ms=1000)
+    assert payload == "s1"
+    assert pid1 == pid2 != os.getpid()
+    assert (calls1, calls2) == (1, 2)
+    w.worker.close()
+
+
+def test_timeout_respawns_worker_and_errors_surface():
+    w = StrategyWrapper(name="echo", module_name="echo_mod", instance=EchoStrategy())
+    pid1, _, _ = call_strategy(w, "part1_play", None, time_limit_ms=1000)
+    with pytest.raises(TimeoutEngineError):
+        call_strategy(w, "part1_slough", None, time_limit_ms=20)
+    with pytest.raises(StrategyExecutionError):
+        call_strategy(w, "part2_move", None, time_limit_ms=1000)
+    pid2, calls, _ = call_strategy(w, "part1_play", None, time_limit_ms=1000)
+    assert pid2 != pid1
+    assert calls == 1  # fresh worker after the kill
+    w.worker.close()
+
+
+class CountingStrategy:
+    def __init__(self):
+        self.memory = {"seen": 0, "log": []}
+
+    def part1_play(self, state):
+        self.memory["seen"] += 1
+        state.memory["log"].append(state.hand)
+        return self.memory["seen"]
+
+    def part1_slough(self, state):
+        state.memory["blob"] = "x" * 10_000
+        return None
+
+
+def test_memory_survives_calls_and_syncs_back():
+    from engine.sandbox import begin_game
+    from engine.state import Part2StateView
+    from engine.cards import Suit
+    w = StrategyWrapper(name="count", module_name="count_mod", instance=CountingStrategy())
+    state = Part2StateView(hand=["a"], trump=Suit.CLUBS, table_plays=[], player_out=[], player_hand_counts=[], memory=w.memory)
+    assert call_strategy(w, "part1_play", state, time_limit_ms=1000) == 1
+    assert call_strategy(w, "part1_play", state, time_limit_ms=1000) == 2
+    assert w.memory == {"seen": 2, "log": [["a"], ["a"]]}
+    with pytest.raises(StrategyExecutionError):
+        call_strategy(w, "part1_slough", state, time_limit_ms=1000, max_memory_bytes=1000)
+    begin_game(w)
+    assert w.memory == {"seen": 0, "log": []}
+    w.worker.close()
+
+
+def test_in_process_isolation_modes():
+    from engine.sandbox import begin_game
+    w = StrategyWrapper(name="echo", module_name="echo_mod", instance=EchoStrategy())
+    pid, calls, _ = call_strategy(w, "part1_play", None, isolation="none")
+    assert (pid, calls) == (os.getpid(), 1)
+    with pytest.raises(StrategyExecutionError):
+        call_strategy(w, "part2_move", None, isolation="none")
+    with pytest.raises(TimeoutEngineError):
+        call_strategy(w, "part1_slough", None, time_limit_ms=20, isolation="none", soft_time_limit=True)
+    with pytest.raises(TimeoutEngineError):
+        call_strategy(w, "part1_slough", None, time_limit_ms=20, isolation="thread")
+
+    c = StrategyWrapper(name="count", module_name="count_mod", instance=CountingStrategy())
+    call_strategy(c, "part1_play", type("S", (), {"memory": c.memory, "hand": "h"})(), isolation="none")
+    assert c.memory == {"seen": 1, "log": ["h"]} and c.instance.memory is c.memory
+    begin_game(c, isolation="none")
+    assert c.memory == {"seen": 0, "log": []}
+
+
+class ReaderStrategy:
+    def __init__(self):
+        self.memory = {"table": [1, 2, 3], "n": 0}
+
+    def part1_play(self, state):
+        return sum(self.memory["table"])
+
+    def part1_slough(self, state):
+        self.memory["table"].append(4)
+
+
+def test_read_only_memory_is_not_shipped_back():
+    w = StrategyWrapper(name="reader", module_name="reader_mod", instance=ReaderStrategy())
+    assert call_strategy(w, "part1_play", None, time_limit_ms=1000) == 6
+    before = w.memory["table"]
+    assert call_strategy(w, "part1_play", None, time_limit_ms=1000) == 6
+    assert w.memory["table"] is before  # unchanged bytes: nothing re-sent
+    call_strategy(w, "part1_slough", None, time_limit_ms=1000)
+    assert w.memory["table"] == [1, 2, 3, 4] and w.memory["table"] is not before
+    w.worker.close()
+
+
+class DiceStrategy:
+    def __init__(self):
+        self.memory = {}
+
+    def part1_play(self, state):
+        import random
+        return [random.random() for _ in range(3)]
+
+    def part1_slough(self, state):
+        time.sleep(0.2)
+
+
+def test_in_process_runner_keeps_its_own_random_state():
+    import random
+    from engine.sandbox import begin_game
+    w = StrategyWrapper(name="dice", module_name="dice_mod", instance=DiceStrategy())
+    random.seed(99)
+    expected = [random.random() for _ in range(2)]
+    random.seed(99)
+    begin_game(w, seed="7:0", isolation="none")
+    rolls = call_strategy(w, "part1_play", None, isolation="none")
+    assert [random.random() for _ in range(2)] == expected  # engine stream untouched
+    begin_game(w, seed="7:0", isolation="none")
+    assert call_strategy(w, "part1_play", None, isolation="none") == rolls
+
+
+def test_thread_runner_is_dead_after_timeout():
+    from engine.sandbox import begin_game
+    w = StrategyWrapper(name="dice", module_name="dice_mod", instance=DiceStrategy())
+    with pytest.raises(TimeoutEngineError):
+        call_strategy(w, "part1_slough", None, time_limit_ms=20, isolation="thread")
+    with pytest.raises(StrategyExecutionError):
+        call_strategy(w, "part1_play", None, isolation="thread")
+    time.sleep(0.3)
+    begin_game(w, isolation="thread")
+    assert len(call_strategy(w, "part1_play", None, isolation="thread")) == 3
+
+
+class HoarderStrategy:
+    def __init__(self):
+        self.memory = {"kept": 1}
+
+    def part1_play(self, state):
+        blob = self.memory.setdefault("blob", [])
+        if state == "store":
+            self.memory["kept"] = 2
+            blob.append("x" * 100_000)
+        return len(blob)
+
+
+def test_failed_call_rolls_worker_memory_back():
+    w = StrategyWrapper(name="hoard", module_name="hoard_mod", instance=HoarderStrategy())
+    with pytest.raises(StrategyExecutionError):
+        call_strategy(w, "part1_play", "store", time_limit_ms=1000, max_memory_bytes=10_000)
+    assert w.memory == {"kept": 1}
+    assert call_strategy(w, "part1_play", None, time_limit_ms=1000, max_memory_bytes=10_000) == 0
+    assert call_strategy(w, "part1_play", None, time_limit_ms=1000, max_memory_bytes=10_000) == 0
+    assert w.memory == {"kept": 1, "blob": []}
+    w.worker.close()
@@ -0,0 +1,253 @@
+import json
+import threading
+import pytest
+from engine import singlestore_repo
+from engine.singlestore_repo import ConnectionPool
+
+
+class FakeCursor:
+    rowcount = 0  # INSERT IGNORE of the backfill claim: already done
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if not self.conn.alive:
+            raise singlestore_repo.s2.OperationalError("gone away")
+        self.conn.server.statements.append(sql.split()[0])
+
+    def fetchone(self):
+        return (1,)
+
+    def fetchall(self):
+        return list(self.conn.server.rows)
+
+
+class FakeServer:
+    """Stand-in for the database: counts connections and statements."""
+
+    def __init__(self):
+        self.connects = 0
+        self.statements = []
+        self.rows = []
+        self.lock = threading.Lock()
+
+    def connect(self, *args, **kwargs):
+        with self.lock:
+            self.connects += 1
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.alive = True
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def is_connected(self):
+        return self.alive
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.alive = False
+
+
+def _select(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1")
+        return cur.fetchone()
+
+
+def test_pool_reuses_and_replaces_dead_connections(monkeypatch):
+    server = FakeServer()
+    pool = ConnectionPool(server.connect, max_size=2)
+    assert pool.run(_select) == (1,)
+    assert pool.run(_select) == (1,)
+    assert server.connects == 1
+    conn, _ = pool._idle[0]
+    conn.alive = False  # server dropped it while idle
+    monkeypatch.setattr(singlestore_repo, "HEALTH_CHECK_IDLE_S", 0)
+    assert pool.run(_select) == (1,)
+    assert server.connects == 2
+    pool._idle[0][0].alive = False
+    monkeypatch.setattr(singlestore_repo, "HEALTH_CHECK_IDLE_S", 3600)
+    with pytest.raises(singlestore_repo.s2.OperationalError):
+        pool.run(_select)  # writes are not retried
+    assert pool.run(_select, retry=True) == (1,) and server.connects == 3
+
+
+def test_pool_is_bounded():
+    server = FakeServer()
+    pool = ConnectionPool(server.connect, max_size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(held)
+    assert pool.acquire() is held
+
+
+def test_get_repo_is_cached_and_schema_checked_once(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(singlestore_repo.s2, "connect", server.connect)
+    monkeypatch.setenv("SINGLESTORE_URI", "singlestoredb://user@localhost/db")
+    singlestore_repo.reset_repo_cache()
+    try:
+        repo = singlestore_repo.get_repo()
+        assert repo is not None and singlestore_repo.get_repo() is repo
+        repo.record_game({"loser": "c", "order_out": ["a", "b"], "wars": 1, "kills": 0, "eats": 2, "trump": None},
+                         seed=1, goat_index=0)
+        assert server.connects == 1
+        assert server.statements.count("CREATE") == 4
+        # backfill claim, then one game row + one upsert per aggregate table
+        assert server.statements.count("INSERT") == 1 + 3
+    finally:
+        singlestore_repo.reset_repo_cache()
+
+
+def test_record_games_batches_statements(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(singlestore_repo.s2, "connect", server.connect)
+    monkeypatch.setenv("SINGLESTORE_URI", "singlestoredb://user@localhost/db")
+    monkeypatch.setattr(singlestore_repo, "BATCH_ROWS", 8)
+    singlestore_repo.reset_repo_cache()
+    try:
+        repo = singlestore_repo.get_repo()
+        server.statements.clear()
+        games = [{"loser": "abcde"[i % 5], "order_out": [n for n in "abcde" if n != "abcde"[i % 5]],
+                  "wars": i, "kills": 1, "eats": 0, "trump": "SPADES", "seed": i, "goat_index": 0} for i in range(20)]
+        repo.record_games(games)
+        # 20 game rows in chunks of 8 plus one upsert per aggregate table for the 5 strategies
+        assert server.statements == ["INSERT"] * 5
+    finally:
+        singlestore_repo.reset_repo_cache()
+
+
+def test_segmented_leaderboards_from_player_count_table(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(singlestore_repo.s2, "connect", server.connect)
+    monkeypatch.setenv("SINGLESTORE_URI", "singlestoredb://user@localhost/db")
+    singlestore_repo.reset_repo_cache()
+    try:
+        repo = singlestore_repo.get_repo()
+        server.rows = [(3, "a", 2, 1, 3, 1.0, 0.0, 0.0), (3, "b", 2, 0, 1, 1.0, 0.0, 0.0), (5, "a", 1, 0, 0, 0.5, 0.0, 0.0)]
+        seg = repo.fetch_segmented_leaderboards()
+        assert sorted(seg) == ["p3", "p5"]
+        assert [r["strategy"] for r in seg["p3"]] == ["b", "a"]
+        assert seg["p5"][0]["avg_wars"] == 0.5
+    finally:
+        singlestore_repo.reset_repo_cache()
+
+
+class TableCursor(FakeCursor):
+    """Understands just the statements the repo issues, against in-memory tables."""
+
+    def execute(self, sql, params=None):
+        tables, words = self.conn.server.tables, sql.split()
+        self.conn.server.statements.append(words[0])
+        self.result, self.rowcount = [], 0
+        if sql.startswith("CREATE TABLE"):
+            tables.setdefault(words[5], {})
+        elif sql.startswith("INSERT IGNORE INTO stats_backfills"):
+            self.rowcount = int(params[0] not in tables["stats_backfills"])
+            tables["stats_backfills"][params[0]] = True
+        elif sql.startswith("DELETE FROM"):
+            tables[words[2]].clear()
+        elif sql.startswith("INSERT INTO aggregated_stats_by_player_count") and "SELECT" in sql:
+            seg = tables["aggregated_stats_by_player_count"]
+            for _, _, loser, wars, kills, eats, _, order in tables["game_records"].values():
+                players = json.loads(order) + [loser]
+                pc = len(players)
+                for pos, name in enumerate(players):
+                    counters = seg.setdefault((pc, name), [0] * 6)
+                    for j, v in enumerate((1, pos == pc - 1, pos, wars / pc, kills / pc, eats / pc)):
+                        counters[j] += v
+        elif sql.startswith("INSERT INTO game_records"):
+            for i in range(0, len(params), 8):
+                tables["game_records"][len(tables["game_records"]) + 1] = params[i:i + 8]
+        elif sql.startswith("INSERT INTO aggregated_stats"):
+            name = words[2].split("(")[0]
+            width = 8 if name.endswith("player_count") else 7
+            for i in range(0, len(params), width):
+                row = params[i:i + width]
+                counters = tables[name].setdefault(tuple(row[:width - 6]), [0] * 6)
+                for j, v in enumerate(row[width - 6:]):
+                    counters[j] += v
+        elif sql.startswith("SELECT strategy"):
+            self.result = [(*k, *v) for k, v in tables["aggregated_stats"].items()]
+        elif sql.startswith("SELECT player_count"):
+            self.result = [(*k, *v) for k, v in sorted(tables["aggregated_stats_by_player_count"].items())]
+        else:
+            self.result = [(1,)]
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+
+class TableServer(FakeServer):
+    def __init__(self):
+        super().__init__()
+        self.tables = {}
+
+    def connect(self, *args, **kwargs):
+        conn = super().connect()
+        conn.cursor = lambda: TableCursor(conn)
+        return conn
+
+
+def _games(counts, offset=0):
+    names = "abcde"
+    return [{"loser": names[(i + offset) % n], "order_out": [x for x in names[:n] if x != names[(i + offset) % n]],
+             "wars": i, "kills": 1, "eats": 2, "trump": None} for i, n in enumerate(counts)]
+
+
+def test_player_count_table_is_rebuilt_once_from_game_records(monkeypatch):
+    server = TableServer()
+    monkeypatch.setattr(singlestore_repo.s2, "connect", server.connect)
+    monkeypatch.setenv("SINGLESTORE_URI", "singlestoredb://user@localhost/db")
+    singlestore_repo.reset_repo_cache()
+    try:
+        repo = singlestore_repo.get_repo()
+        repo.record_games(_games([3, 4, 5, 3, 4, 3, 5, 4, 3, 3]))
+        # a deployment from before the table existed: no segment rows, no claim
+        del server.tables["aggregated_stats_by_player_count"], server.tables["stats_backfills"]
+        singlestore_repo.reset_repo_cache()
+        repo = singlestore_repo.get_repo()
+        # games recorded by an upgraded process before the rebuild ran are not counted twice
+        repo.record_games(_games([4, 3, 5], offset=1))
+        server.tables["stats_backfills"].clear()
+        singlestore_repo.reset_repo_cache()
+        repo = singlestore_repo.get_repo()
+        seg = repo.fetch_segmented_leaderboards()
+        assert sorted(seg) == ["p3", "p4", "p5"]
+        overall = repo.fetch_leaderboard()
+        assert sum(r["games"] for r in overall) == 3 * 6 + 4 * 4 + 5 * 3
+        for row in overall:
+            parts = [r for rows in seg.values() for r in rows if r["strategy"] == row["strategy"]]
+            assert sum(r["games"] for r in parts) == row["games"]
+            assert sum(r["losses"] for r in parts) == row["losses"]
+            assert sum(r["avg_finish_position"] * r["games"] for r in parts) == pytest.approx(
+                row["avg_finish_position"] * row["games"])
+        server.statements.clear()
+        singlestore_repo.reset_repo_cache()
+        singlestore_repo.get_repo()  # claimed already: no second rebuild
+        assert "DELETE" not in server.statements
+        assert repo.fetch_segmented_leaderboards() == seg
+    finally:
+        singlestore_repo.reset_repo_cache()
@@ -0,0 +1,60 @@
+import threading
+from engine.sqlite_stats import SQLiteStatsBackend
+from engine.stats_backend import StatsBackend
+
+
+def _result(loser, order_out, wars=4, seed=None):
+    return {"loser": loser, "order_out": order_out, "wars": wars, "kills": 1, "eats": 2, "trump": "HEARTS",
+            "player_count": len(order_out) + 1, "seed": seed, "goat_index": 0}
+
+
+def test_sqlite_backend_aggregates_and_segments(tmp_path):
+    db = SQLiteStatsBackend(tmp_path / "stats.sqlite3")
+    assert isinstance(db, StatsBackend)
+    db.record_games([_result("c", ["a", "b"], seed=1), _result("a", ["b", "c", "d"], seed=2)])
+    db.record_game(_result("c", ["b", "a"], seed=3))
+    lb = {r["strategy"]: r for r in db.fetch_leaderboard()}
+    assert lb["c"]["games"] == 3 and lb["c"]["losses"] == 2
+    assert lb["d"]["games"] == 1 and lb["d"]["avg_finish_position"] == 2
+    assert lb["a"]["avg_wars"] == (4 / 3 + 4 / 4 + 4 / 3) / 3
+    seg = db.fetch_segmented_leaderboards()
+    assert sorted(seg) == ["p3", "p4"]
+    assert {r["strategy"]: r["games"] for r in seg["p4"]} == {"a": 1, "b": 1, "c": 1, "d": 1}
+    recent = db.fetch_recent_games(limit=2)
+    assert [g["seed"] for g in recent] == [3, 2]
+    assert recent[0]["players"] == ["b", "a", "c"]
+
+
+def test_sqlite_backend_concurrent_writers(tmp_path):
+    path = tmp_path / "stats.sqlite3"
+
+    def write():
+        db = SQLiteStatsBackend(path)
+        for _ in range(10):
+            db.record_games([_result("c", ["a", "b"])] * 5)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lb = {r["strategy"]: r for r in SQLiteStatsBackend(path).fetch_leaderboard()}
+    assert lb["c"]["losses"] == 4 * 10 * 5
+
+
+def test_get_backend_rejects_unknown_kind_and_warns_on_missing_singlestore(monkeypatch, caplog):
+    import pytest
+    from engine import stats_backend
+    monkeypatch.setenv("SKIT_STATS_BACKEND", "sqllite")
+    with pytest.raises(ValueError):
+        stats_backend.get_backend()
+    monkeypatch.setattr(stats_backend, "get_ss_repo", lambda: None)
+    monkeypatch.setattr(stats_backend, "_fallback_warned_at", None)
+    monkeypatch.setenv("SKIT_STATS_BACKEND", "auto")
+    with caplog.at_level("WARNING", logger="engine.stats_backend"):
+        assert stats_backend.get_backend() is stats_backend.FILE_BACKEND
+        assert not caplog.records
+        monkeypatch.setenv("SKIT_STATS_BACKEND", "singlestore")
+        assert stats_backend.get_backend() is stats_backend.FILE_BACKEND
+        assert stats_backend.get_backend() is stats_backend.FILE_BACKEND
+    assert len(caplog.records) == 1  # rate-limited
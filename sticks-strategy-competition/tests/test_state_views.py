@@ -0,0 +1,38 @@
+import dataclasses
+from pathlib import Path
+import pytest
+from engine.loader import load_strategies
+from engine.part1 import Part1Engine
+from engine.part2 import Part2Engine
+from engine.state import TablePlay
+
+
+def test_part1_views_are_immutable_and_shared():
+    wrappers = load_strategies(Path('strategies'))[:3]
+    engine = Part1Engine(wrappers, goat_index=0, time_limit_ms=100, random_seed=3)
+    engine.deal()
+    a, b = engine.build_state(0), engine.build_state(1)
+    assert isinstance(a.hand, tuple) and isinstance(a.allowed_slough_indices, tuple)
+    assert a.current_trick_plays is b.current_trick_plays
+    assert a.players_card_counts is b.players_card_counts
+    assert engine.build_state(0).hand is a.hand  # unchanged hand -> same snapshot
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        a.hand = ()
+    engine.hands[0].pop()
+    assert len(engine.build_state(0).hand) == len(a.hand) - 1
+
+
+def test_part2_table_plays_are_read_only():
+    wrappers = load_strategies(Path('strategies'))[:3]
+    p1 = Part1Engine(wrappers, goat_index=0, time_limit_ms=100, random_seed=3)
+    collected, winner, trump_card, _ = p1.run()
+    engine = Part2Engine(wrappers, collected, winner, trump_card.suit, time_limit_ms=100)
+    engine._table_add(TablePlay(0, engine.remove_cards_from_hand(0, [0])))
+    state = engine.build_state(1)
+    play = state.table_plays[0]
+    assert play["player_index"] == 0 and isinstance(play["cards"], tuple) and len(play["cards"]) == 1
+    with pytest.raises(AttributeError):
+        play.cards = ()
+    with pytest.raises(TypeError):
+        play["cards"] = []
+    assert engine.build_state(2).table_plays is state.table_plays
@@ -0,0 +1,69 @@
+import threading
+from engine import file_stats
+from engine.stats_writer import StatsWriter
+
+
+def _result(i):
+    return {"loser": "c", "order_out": ["a", "b"], "wars": i, "kills": 0, "eats": 0, "trump": None, "player_count": 3}
+
+
+class SlowRepo:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.gate = threading.Event()
+        self.fail = fail
+
+    def record_games(self, results):
+        self.gate.wait(5)
+        if self.fail:
+            raise ConnectionError("db down")
+        self.batches.append(list(results))
+
+
+def test_writer_batches_and_applies_backpressure():
+    repo = SlowRepo()
+    writer = StatsWriter(get_backend=lambda: repo, maxsize=2, batch_size=3)
+    done = threading.Event()
+
+    def produce():
+        for i in range(8):
+            writer.submit(_result(i))
+        done.set()
+
+    threading.Thread(target=produce, daemon=True).start()
+    assert not done.wait(0.3)  # queue full while the repo is stalled
+    repo.gate.set()
+    assert done.wait(5)
+    writer.flush()
+    assert [r["wars"] for b in repo.batches for r in b] == list(range(8))
+    assert all(len(b) <= 3 for b in repo.batches)
+    writer.close()
+
+
+def test_writer_spills_to_file_when_db_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_stats, "STATS_PATH", tmp_path / "stats.json")
+    file_stats._pending.clear()
+    repo = SlowRepo(fail=True)
+    repo.gate.set()
+    writer = StatsWriter(get_backend=lambda: repo)
+    for i in range(4):
+        writer.submit(_result(i))
+    writer.close()
+    lb = {r["strategy"]: r for r in file_stats.load_leaderboard()}
+    assert lb["c"]["losses"] == 4
+
+
+def test_writer_counts_and_logs_games_no_store_accepts(monkeypatch, caplog):
+    def broken(result):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(file_stats, "record_game", broken)
+    repo = SlowRepo(fail=True)
+    repo.gate.set()
+    writer = StatsWriter(get_backend=lambda: repo, batch_size=3)
+    for i in range(5):
+        writer.submit(_result(i))
+    with caplog.at_level("ERROR", logger="engine.stats_writer"):
+        assert writer.close() == 5
+    assert "File stats fallback failed for a batch of" in caplog.text
+    assert "dropped 5 game(s)" in caplog.text
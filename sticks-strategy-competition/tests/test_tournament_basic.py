@@ -18,3 +18,11 @@ def test_tournament_runs_and_collects_stats():
     for r in lb:
         assert 'loss_rate' in r and 'avg_finish_position' in r
         assert 0 <= r['loss_rate'] <= 1
+
+
+def test_parallel_tournament_matches_serial():
+    wrappers = load_strategies(Path('strategies'))
+    serial = run_tournament(wrappers, TournamentConfig(games=6, random_seed=7, time_limit_ms=200))
+    parallel = run_tournament(wrappers, TournamentConfig(games=6, random_seed=7, time_limit_ms=200, workers=2))
+    assert parallel['leaderboard'] == serial['leaderboard']
+    assert parallel['segmented'] == serial['segmented']